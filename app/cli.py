@@ -0,0 +1,204 @@
+import json
+import signal
+import threading
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from app.utils.ranking import refresh_scores
+from app.utils.ingredients import backfill_ingredients
+from app.utils.facets import rebuild_facet_counts
+from app.utils.similarity import similarity_index
+from app.utils.recommendations import build_recommendations
+from app.utils.ratings import check_rating_summaries
+from app.utils.activity_feed import rebuild_inbox
+from app.utils.purge import purge_deleted
+from app.utils.jobs import job_queue
+from app.utils.seed import SCALES, SEED_PASSWORD, Dataset, load
+from app.utils.passwords import password_hasher
+from app.models.user import User
+from app.extensions import db
+
+feed_cli = AppGroup('feed', help="Maintain the recipe feed rankings.")
+
+@feed_cli.command('refresh')
+@click.option('--full', is_flag=True, help="Rescore every recipe instead of only those with new activity.")
+def refresh_feed(full):
+    """Fold new ratings, comments and bookmarks into recipe_scores"""
+    stats = refresh_scores(full=full)
+    click.echo(f"Rescored {stats['recipes_rescored']} recipes{' (full refresh)' if full else ''}")
+
+@feed_cli.command('facets')
+def refresh_facets():
+    """Rebuild the recipe_facet_counts table behind GET /api/recipes?facets=..."""
+    written = rebuild_facet_counts()
+    click.echo(f"Counted {written} facet combinations")
+
+@feed_cli.command('inbox')
+def refresh_feed_inbox():
+    """Refill the feed_items inboxes behind GET /api/my-feed; run before setting MY_FEED_FANOUT=true"""
+    written = rebuild_inbox()
+    click.echo(f"Delivered {written} feed items")
+
+ingredients_cli = AppGroup('ingredients', help="Maintain the normalized recipe_ingredients index.")
+
+@ingredients_cli.command('backfill')
+@click.option('--batch-size', default=500, show_default=True, help="Recipes per committed batch.")
+def backfill_recipe_ingredients(batch_size):
+    """Re-extract ingredient names for every recipe"""
+    processed = backfill_ingredients(batch_size=batch_size)
+    click.echo(f"Indexed ingredients for {processed} recipes")
+
+similarity_cli = AppGroup('similarity', help="Maintain the vectors behind GET /api/recipes/<id>/similar.")
+
+@similarity_cli.command('build')
+@click.option('--batch-size', default=5000, show_default=True, help="Recipes vectorized per batch.")
+def build_similarity_index(batch_size):
+    """Rebuild the TF-IDF vectors for every recipe"""
+    indexed = similarity_index.build(batch_size=batch_size)
+    click.echo(f"Indexed {indexed} recipes into {similarity_index.directory}")
+
+recommendations_cli = AppGroup('recommendations', help="Maintain the related_recipes table behind /api/users/me/recommendations.")
+
+@recommendations_cli.command('build')
+@click.option('--chunk-size', default=10000, show_default=True, help="Ratings or bookmarks read per query.")
+@click.option('--item-chunk', default=1000, show_default=True, help="Recipes whose neighbours are computed per matrix product.")
+def build_related_recipes(chunk_size, item_chunk):
+    """Recompute item-item neighbours from all ratings and bookmarks"""
+    stats = build_recommendations(chunk_size=chunk_size, item_chunk=item_chunk)
+    click.echo(f"Stored {stats['pairs']} related pairs for {stats['recipes']} recipes "
+               f"from {stats['interactions']} interactions by {stats['users']} users")
+
+ratings_cli = AppGroup('ratings', help="Maintain the rating_summaries rollup table.")
+
+@ratings_cli.command('check')
+@click.option('--fix', is_flag=True, help="Rewrite rollups that disagree with the ratings table.")
+@click.option('--batch-size', default=1000, show_default=True, help="Recipes recounted per batch.")
+def check_ratings(fix, batch_size):
+    """Recount every recipe's ratings and compare them with its rollup row"""
+    mismatched = check_rating_summaries(batch_size=batch_size, fix=fix)
+    if not mismatched:
+        click.echo("All rating rollups match")
+        return
+    preview = ', '.join(str(recipe_id) for recipe_id in mismatched[:20])
+    click.echo(f"{len(mismatched)} rollups {'fixed' if fix else 'out of date'}: {preview}{' ...' if len(mismatched) > 20 else ''}")
+    if not fix:
+        raise SystemExit(1)
+
+purge_cli = AppGroup('purge', help="Remove soft-deleted recipes and groups for good.")
+
+@purge_cli.command('run')
+@click.option('--grace-seconds', default=None, type=int, help="Only purge rows deleted at least this long ago [default: PURGE_GRACE_SECONDS].")
+@click.option('--batch-size', default=None, type=int, help="Rows deleted per statement [default: PURGE_BATCH_SIZE].")
+def purge_soft_deleted(grace_seconds, batch_size):
+    """Delete soft-deleted recipes and groups with their children and images"""
+    config = current_app.config
+    stats = purge_deleted(
+        config['PURGE_GRACE_SECONDS'] if grace_seconds is None else grace_seconds,
+        batch_size or config['PURGE_BATCH_SIZE']
+    )
+    click.echo(f"Purged {stats['recipes_purged']} recipes and {stats['groups_purged']} groups")
+
+jobs_cli = AppGroup('jobs', help="Run and inspect background jobs (JOBS_BACKEND=database).")
+
+@jobs_cli.command('worker')
+@click.option('--burst', is_flag=True, help="Exit once no job is due instead of polling forever.")
+@click.option('--poll-interval', default=None, type=float, help="Seconds to wait when idle [default: JOBS_POLL_INTERVAL].")
+def run_job_worker(burst, poll_interval):
+    """Claim and run jobs from the jobs table; start as many workers as you like"""
+    stop = threading.Event()
+    # Finish the running job, then exit
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    processed = job_queue.work(
+        current_app._get_current_object(), burst=burst,
+        poll_interval=poll_interval or current_app.config['JOBS_POLL_INTERVAL'], stop=stop
+    )
+    click.echo(f"Ran {processed} jobs")
+
+@jobs_cli.command('enqueue')
+@click.argument('name')
+@click.option('--arg', 'args', multiple=True, metavar='KEY=VALUE', help="Keyword argument; VALUE is parsed as JSON when it can be.")
+def enqueue_job(name, args):
+    """Queue a registered job for the workers"""
+    if current_app.config['JOBS_BACKEND'] != 'database':
+        raise click.UsageError("Set JOBS_BACKEND=database; local jobs run inside the app process")
+    if name not in job_queue.names:
+        raise click.UsageError(f"Unknown job {name!r}. Jobs: {', '.join(job_queue.names)}")
+    kwargs = {}
+    for arg in args:
+        key, _, value = arg.partition('=')
+        try:
+            kwargs[key] = json.loads(value)
+        except ValueError:
+            kwargs[key] = value
+    job_queue.enqueue(name, kwargs)
+    db.session.commit()
+    click.echo(f"Queued {name}")
+
+@jobs_cli.command('stats')
+def job_stats():
+    """Count queued, running and failed jobs by name"""
+    if current_app.config['JOBS_BACKEND'] != 'database':
+        raise click.UsageError("Set JOBS_BACKEND=database; local jobs are not stored")
+    rows = job_queue.backend.stats()
+    if not rows:
+        click.echo("No jobs queued")
+    for row in rows:
+        oldest = f", oldest due {row['oldest_seconds']}s ago" if row['status'] == 'queued' else ''
+        click.echo(f"{row['name']:<28} {row['status']:<8} {row['count']:>7}{oldest}")
+
+@click.command('seed')
+@click.option('--users', type=int, help="Users to create.")
+@click.option('--groups', type=int, help="Groups; each user joins up to five, popular ones more often.")
+@click.option('--recipes', type=int, help="Recipes; about a third are shared with one of the author's groups.")
+@click.option('--ratings', type=int, help="Ratings (at most one per user and recipe).")
+@click.option('--comments', type=int, help="Comments.")
+@click.option('--bookmarks', type=int, help="Bookmarks (at most one per user and recipe).")
+@click.option('--scale', default=1.0, show_default=True,
+              help=f"Multiplier for every count not given ({', '.join(f'{name} {count}' for name, count in SCALES.items())}).")
+@click.option('--seed', 'seed_value', default=42, show_default=True, help="Same seed and counts, same rows.")
+@click.option('--now', type=click.DateTime(), help="Date the generated year of activity ends [default: the current time].")
+@click.option('--batch-size', default=10000, show_default=True, help="Rows per INSERT or COPY, committed one by one.")
+@click.option('--reset', is_flag=True, help="Drop and recreate every table first.")
+@click.option('--yes', is_flag=True, help="Do not ask before --reset drops the tables.")
+def seed_database(seed_value, now, batch_size, reset, yes, scale, **counts):
+    """Fill the database with synthetic users, recipes and activity with Zipf-skewed popularity"""
+    counts = {name: counts[name] if counts[name] is not None else max(1, int(count * scale))
+              for name, count in SCALES.items()}
+    if reset:
+        if not yes:
+            click.confirm(f"Drop every table in {db.engine.url.render_as_string(hide_password=True)}?", abort=True)
+        db.drop_all()
+        db.create_all()
+    elif db.session.query(User.id).first() is not None:
+        raise click.UsageError("The database already has users and seeded ids would collide; pass --reset to start empty")
+
+    dataset = Dataset(counts, seed_value, password_hasher.hash(SEED_PASSWORD), now)
+    reported = {'at': 0}
+
+    def progress(table, rows, seconds):
+        if seconds - reported['at'] >= 5:
+            reported['at'] = seconds
+            click.echo(f"  {table}: {rows} rows ({seconds:.0f}s)")
+
+    started = time.perf_counter()
+    written = load(dataset.tables(), batch_size=batch_size, progress=progress)
+    elapsed = time.perf_counter() - started
+    for table, rows in written.items():
+        click.echo(f"{table:<20} {rows:>10}")
+    total = sum(written.values())
+    click.echo(f"Seeded {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    click.echo(f"Log in as seed_user_1 / {SEED_PASSWORD}. Scores and facets fill on the next "
+               "background refresh, or run `flask feed refresh --full` and `flask feed facets`")
+
+def init_cli(app):
+    app.cli.add_command(feed_cli)
+    app.cli.add_command(ingredients_cli)
+    app.cli.add_command(similarity_cli)
+    app.cli.add_command(recommendations_cli)
+    app.cli.add_command(ratings_cli)
+    app.cli.add_command(purge_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(seed_database)
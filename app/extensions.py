@@ -1,12 +1,61 @@
+import sqlite3
+
+import click
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_marshmallow import Marshmallow
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
 
+
+class _LazyMigrateGroup(click.Group):
+    """`flask db` placeholder that swaps in the real Flask-Migrate group when invoked"""
+
+    def __init__(self, migrate, app):
+        super().__init__(name=migrate.command, help="Perform database migrations.")
+        self.migrate = migrate
+        self.app = app
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        return self.migrate.load(self.app).make_context(info_name, args, parent=parent, **extra)
+
+
+class LazyMigrate:
+    """Flask-Migrate wrapper; Alembic costs ~100ms to import and only the CLI needs it"""
+
+    def __init__(self, directory='migrations', command='db'):
+        self.directory = directory
+        self.command = command
+        self.db = None
+        self._migrate = None
+
+    def init_app(self, app, db):
+        self.db = db
+        app.cli.add_command(_LazyMigrateGroup(self, app), name=self.command)
+
+    def load(self, app):
+        """Import Flask-Migrate and register it on the app, returning the real command group"""
+        if self._migrate is None:
+            from flask_migrate import Migrate
+            self._migrate = Migrate(directory=self.directory, command=self.command)
+        if 'migrate' not in app.extensions:
+            self._migrate.init_app(app, self.db)
+        return app.cli.commands[self.command]
+
+
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores foreign keys, ON DELETE CASCADE included, unless each connection asks"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
 db = SQLAlchemy()
-migrate = Migrate()
+migrate = LazyMigrate()
 jwt = JWTManager()
 ma = Marshmallow()
 bcrypt = Bcrypt()
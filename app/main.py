@@ -1,25 +1,46 @@
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from .extensions import db, migrate, jwt, ma, bcrypt, cors
 from .config import Config
 from .routes import init_routes
+from .utils.events import event_hub
+from .utils.passwords import password_hasher
+from .utils.rate_limit import rate_limiter
+from .utils.auth import init_auth
+from .utils.query_stats import init_query_stats
+from .utils.metrics import init_metrics
+from .utils.profiler import profiler
+from .utils.ranking import init_ranking
+from .utils.facets import init_facets
+from .utils.similarity import similarity_index
+from .utils.recommendations import init_recommendations
+from .utils.soft_delete import init_soft_delete
+from .utils.purge import init_purge
+from .utils.jobs import job_queue
+from .cli import init_cli
 
 # Import models so they are available to migrations
-from .models.user import User
-from .models.recipe import Recipe
-from .models.group import Group
-from .models.group_member import GroupMember
-from .models.rating import Rating
+from . import models
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
+
+    # Behind a proxy remote_addr is the proxy itself; take the client from X-Forwarded-For
+    # so per-IP rate limits see real clients
+    proxies = app.config.get('TRUSTED_PROXY_COUNT', 0)
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
 
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    init_auth(app)
     ma.init_app(app)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
+    rate_limiter.init_app(app)
     cors.init_app(app, origins=[
         "http://localhost:3000",
         "http://localhost:3001",
@@ -29,8 +50,20 @@ def create_app():
         "https://front-end-recipe-room-phase-5-zzxt.vercel.app",
         "https://front-end-recipe-room-phase-5-xern.vercel.app"
     ], supports_credentials=True)
+    event_hub.init_app(app)
+    init_query_stats(app)
+    init_metrics(app)
+    profiler.init_app(app)
+    init_ranking(app)
+    init_facets(app)
+    similarity_index.init_app(app)
+    init_recommendations(app)
+    init_soft_delete(app)
+    init_purge(app)
+    job_queue.init_app(app)
 
     # Register blueprints
     init_routes(app)
+    init_cli(app)
 
     return app
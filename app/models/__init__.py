@@ -1,8 +1,17 @@
-# Models are imported directly where needed to avoid circular imports
-# from .user import User
-# from .recipe import Recipe
-# from .rating import Rating
-# from .group import Group
-# from .group_member import GroupMember
+# Every model is imported here so the mapper registry is complete (relationships between
+# models are declared by name) whichever module is imported first. Models only depend on
+# app.extensions, so this cannot create an import cycle.
+from .user import User
+from .recipe import Recipe
+from .rating import Rating
+from .group import Group
+from .group_member import GroupMember
 from .comment import Comment
-
+from .bookmark import Bookmark
+from .recipe_score import RecipeScore, DirtyRecipeScore, ScoreWatermark
+from .recipe_ingredient import RecipeIngredient
+from .recipe_facet_count import RecipeFacetCount
+from .related_recipe import RelatedRecipe
+from .rating_summary import RatingSummary
+from .feed_item import FeedItem
+from .job import Job
@@ -5,7 +5,13 @@ class Bookmark(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable=False)
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
 
     user = db.relationship('User', back_populates='bookmarks')
     recipe = db.relationship('Recipe', back_populates='bookmarks')
+
+    __table_args__ = (
+        db.Index('ix_bookmarks_recipe_id', 'recipe_id'),
+    )
+
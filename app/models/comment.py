@@ -8,7 +8,12 @@ class Comment(db.Model):
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable=False)
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), nullable=False)
 
     user = db.relationship('User', backref='comments')
     recipe = db.relationship('Recipe', back_populates='comments')
+
+    __table_args__ = (
+        # A recipe's comments, newest first; /api/my-feed joins recipes to comments through it
+        db.Index('ix_comments_recipe_created_at', 'recipe_id', 'created_at', 'id'),
+    )
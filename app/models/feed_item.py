@@ -0,0 +1,23 @@
+from app.extensions import db
+
+class FeedItem(db.Model):
+    """A group recipe or comment fanned out to one member's /api/my-feed inbox.
+
+    Only written when MY_FEED_FANOUT is on (see app.utils.activity_feed). No foreign keys:
+    rows are derived from group_members, recipes and comments and deleted alongside them.
+    """
+    __tablename__ = 'feed_items'
+
+    user_id = db.Column(db.Integer, primary_key = True)
+    kind = db.Column(db.String(10), primary_key = True)  # 'recipe' or 'comment'
+    item_id = db.Column(db.Integer, primary_key = True)
+    created_at = db.Column(db.DateTime, nullable = False)
+    group_id = db.Column(db.Integer, nullable = False)
+    recipe_id = db.Column(db.Integer, nullable = False)
+
+    __table_args__ = (
+        # Matches the feed order, so a page is one backward range scan of the user's rows
+        db.Index('ix_feed_items_user_created_at', 'user_id', 'created_at', 'kind', 'item_id'),
+        db.Index('ix_feed_items_group_user', 'group_id', 'user_id'),
+        db.Index('ix_feed_items_recipe_id', 'recipe_id'),
+    )
@@ -7,9 +7,12 @@ class Group(db.Model):
     name = db.Column(db.String(100), nullable = False)
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default = db.func.current_timestamp())
+    # Set by DELETE; the row is hidden from every query at once and purged later (app.utils.purge)
+    deleted_at = db.Column(db.DateTime, index = True)
 
     # Relationships
-    members = db.relationship('GroupMember', backref='group', lazy=True, cascade='all, delete-orphan')
+    # passive_deletes: the database's ON DELETE CASCADE removes members, not one DELETE per row
+    members = db.relationship('GroupMember', backref='group', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
     def to_dict(self):
         return {
@@ -5,7 +5,7 @@ class GroupMember(db.Model):
 
     id = db.Column(db.Integer, primary_key = True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable = False)
-    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable = False)
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id', ondelete='CASCADE'), nullable = False)
     is_admin = db.Column(db.Boolean, default = False)
     joined_at = db.Column(db.DateTime, default = db.func.current_timestamp())
 
@@ -15,6 +15,7 @@ class GroupMember(db.Model):
     # Unique constraint to prevent duplicate memberships
     __table_args__ = (
         db.UniqueConstraint('user_id', 'group_id', name='unique_group_membership'),
+        db.Index('ix_group_members_group_id', 'group_id'),
     )
 
     def to_dict(self):
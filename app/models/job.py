@@ -0,0 +1,26 @@
+from app.extensions import db
+
+class Job(db.Model):
+    """A background job queued with JOBS_BACKEND=database and run by `flask jobs worker`.
+
+    Rows are deleted once the job succeeds; those left behind are waiting ('queued'), being
+    run ('running', until locked_at + JOBS_LEASE_SECONDS) or out of attempts ('failed').
+    """
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key = True)
+    name = db.Column(db.String(100), nullable = False)
+    args = db.Column(db.JSON, nullable = False)
+    status = db.Column(db.String(10), nullable = False, default = 'queued')
+    attempts = db.Column(db.Integer, nullable = False, default = 0)
+    max_attempts = db.Column(db.Integer, nullable = False)
+    run_at = db.Column(db.DateTime, nullable = False)
+    locked_at = db.Column(db.DateTime)
+    locked_by = db.Column(db.String(100))
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, server_default = db.func.now())
+
+    __table_args__ = (
+        # Workers claim the oldest due job of a status
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
@@ -6,8 +6,12 @@ class Rating(db.Model):
     id = db.Column(db.Integer, primary_key = True)
     value = db.Column(db.Integer, nullable = False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable = False)
-    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable = False)
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), nullable = False)
     created_at = db.Column(db.DateTime, default = db.func.current_timestamp())
 
     user = db.relationship('User', backref='ratings')
-    recipe = db.relationship('Recipe', back_populates='ratings')
\ No newline at end of file
+    recipe = db.relationship('Recipe', back_populates='ratings')
+
+    __table_args__ = (
+        db.Index('ix_ratings_recipe_id', 'recipe_id'),
+    )
@@ -0,0 +1,20 @@
+from app.extensions import db
+
+class RatingSummary(db.Model):
+    """Per-recipe rating histogram, updated with each rating by app.utils.ratings"""
+    __tablename__ = 'rating_summaries'
+
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key = True)
+    stars_1 = db.Column(db.Integer, nullable = False, default = 0)
+    stars_2 = db.Column(db.Integer, nullable = False, default = 0)
+    stars_3 = db.Column(db.Integer, nullable = False, default = 0)
+    stars_4 = db.Column(db.Integer, nullable = False, default = 0)
+    stars_5 = db.Column(db.Integer, nullable = False, default = 0)
+    rating_count = db.Column(db.Integer, nullable = False, default = 0)
+    rating_sum = db.Column(db.Integer, nullable = False, default = 0)
+    updated_at = db.Column(db.DateTime, default = db.func.current_timestamp(), onupdate = db.func.current_timestamp())
+
+    recipe = db.relationship('Recipe', back_populates='rating_summary')
+
+    def histogram(self):
+        return {str(stars): getattr(self, f'stars_{stars}') for stars in range(1, 6)}
@@ -14,12 +14,27 @@ class Recipe(db.Model):
 
     created_at = db.Column(db.DateTime, default = db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default = db.func.current_timestamp(), onupdate = db.func.current_timestamp())  
+    # Set by DELETE; the row is hidden from every query at once and purged later (app.utils.purge)
+    deleted_at = db.Column(db.DateTime)
 
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable = False)
-    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=True) 
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id', ondelete='SET NULL'), nullable=True) 
 
     user = db.relationship('User', backref='recipes')
-    group = db.relationship('Group', backref='recipes')
-    bookmarks = db.relationship('Bookmark', back_populates='recipe', cascade='all, delete-orphan')
-    ratings = db.relationship('Rating', back_populates='recipe', cascade='all, delete-orphan')
-    comments = db.relationship('Comment', back_populates='recipe', cascade='all, delete-orphan')
+    # passive_deletes: children go with ON DELETE CASCADE (SET NULL for a group's recipes) in
+    # the database, so deleting a recipe or group is one statement however many rows hang off it
+    group = db.relationship('Group', backref=db.backref('recipes', passive_deletes=True))
+    bookmarks = db.relationship('Bookmark', back_populates='recipe', cascade='all, delete-orphan', passive_deletes=True)
+    ratings = db.relationship('Rating', back_populates='recipe', cascade='all, delete-orphan', passive_deletes=True)
+    comments = db.relationship('Comment', back_populates='recipe', cascade='all, delete-orphan', passive_deletes=True)
+    ingredient_names = db.relationship('RecipeIngredient', back_populates='recipe', cascade='all, delete-orphan', passive_deletes=True)
+    score = db.relationship('RecipeScore', back_populates='recipe', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+    rating_summary = db.relationship('RatingSummary', back_populates='recipe', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+
+    __table_args__ = (
+        db.Index('ix_recipes_created_at_id', 'created_at', 'id'),
+        db.Index('ix_recipes_country', 'country'),
+        db.Index('ix_recipes_serving_size', 'serving_size'),
+        db.Index('ix_recipes_group_created_at', 'group_id', 'created_at', 'id'),
+        db.Index('ix_recipes_deleted_at', 'deleted_at'),
+    )
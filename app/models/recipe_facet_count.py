@@ -0,0 +1,12 @@
+from app.extensions import db
+
+class RecipeFacetCount(db.Model):
+    """Recipe counts per combination of facet values, rebuilt by app.utils.facets"""
+    __tablename__ = 'recipe_facet_counts'
+
+    id = db.Column(db.Integer, primary_key = True)
+    country = db.Column(db.String(50))
+    serving_size = db.Column(db.Integer)
+    group_id = db.Column(db.Integer)
+    rating_bucket = db.Column(db.Integer)
+    recipe_count = db.Column(db.Integer, nullable = False)
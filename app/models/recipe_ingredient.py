@@ -0,0 +1,15 @@
+from app.extensions import db
+
+class RecipeIngredient(db.Model):
+    """Normalized ingredient names extracted from Recipe.ingredients (see app.utils.ingredients)"""
+    __tablename__ = 'recipe_ingredients'
+
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key = True)
+    name = db.Column(db.String(100), primary_key = True)
+
+    recipe = db.relationship('Recipe', back_populates='ingredient_names')
+
+    # Inverted index: ingredient name -> recipes
+    __table_args__ = (
+        db.Index('ix_recipe_ingredients_name_recipe', 'name', 'recipe_id'),
+    )
@@ -0,0 +1,44 @@
+from app.extensions import db
+
+class RecipeScore(db.Model):
+    """Precomputed ranking inputs for the recipe feed, maintained by app.utils.ranking"""
+    __tablename__ = 'recipe_scores'
+
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key = True)
+    rating_count = db.Column(db.Integer, nullable = False, default = 0)
+    rating_sum = db.Column(db.Integer, nullable = False, default = 0)
+    comment_count = db.Column(db.Integer, nullable = False, default = 0)
+    bookmark_count = db.Column(db.Integer, nullable = False, default = 0)
+    top_score = db.Column(db.Float, nullable = False, default = 0)
+    trending_score = db.Column(db.Float, nullable = False, default = 0)
+    refreshed_at = db.Column(db.DateTime, default = db.func.current_timestamp())
+
+    recipe = db.relationship('Recipe', back_populates='score')
+
+    # Keyset pagination walks these indexes from the top
+    __table_args__ = (
+        db.Index('ix_recipe_scores_trending', 'trending_score', 'recipe_id'),
+        db.Index('ix_recipe_scores_top', 'top_score', 'recipe_id'),
+    )
+
+
+class DirtyRecipeScore(db.Model):
+    """A recipe whose ratings, comments or bookmarks changed since its score was computed.
+
+    Appended in the same transaction as the change and deleted by the refresh that rescored
+    it, so nothing is missed whatever order transactions commit in, deletes included.
+    """
+    __tablename__ = 'dirty_recipe_scores'
+
+    id = db.Column(db.Integer, primary_key = True)
+    recipe_id = db.Column(db.Integer, nullable = False)
+    marked_at = db.Column(db.DateTime, default = db.func.current_timestamp())
+
+
+class ScoreWatermark(db.Model):
+    """Progress markers of background rebuilds, such as the facet counts' last rebuild time"""
+    __tablename__ = 'score_watermarks'
+
+    source = db.Column(db.String(50), primary_key = True)
+    last_id = db.Column(db.Integer, nullable = False, default = 0)
+    updated_at = db.Column(db.DateTime, default = db.func.current_timestamp(), onupdate = db.func.current_timestamp())
@@ -0,0 +1,13 @@
+from app.extensions import db
+
+class RelatedRecipe(db.Model):
+    """Top-k "also liked" neighbours of each recipe, rebuilt by app.utils.recommendations.
+
+    No foreign keys: the table is derived and replaced wholesale, and readers join recipes,
+    so a deleted recipe simply drops out until the next build.
+    """
+    __tablename__ = 'related_recipes'
+
+    recipe_id = db.Column(db.Integer, primary_key = True)
+    related_recipe_id = db.Column(db.Integer, primary_key = True)
+    score = db.Column(db.Float, nullable = False)
@@ -1,5 +1,5 @@
 from app.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.passwords import password_hasher
 from datetime import datetime
 
 class User(db.Model):
@@ -15,7 +15,10 @@ class User(db.Model):
     bookmarks = db.relationship('Bookmark', back_populates='user', cascade='all, delete-orphan')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)    
\ No newline at end of file
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
@@ -3,10 +3,16 @@ from .recipe_routes import recipe_bp
 from .group_routes import group_bp
 from .comment_routes import comment_bp
 from .bookmark_routes import bookmark_bp
+from .stream_routes import stream_bp
+from .admin_routes import admin_bp
+from .user_routes import user_bp
 
 def init_routes(app):
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(recipe_bp, url_prefix='/api')
     app.register_blueprint(group_bp, url_prefix='/api')
     app.register_blueprint(comment_bp)
-    app.register_blueprint(bookmark_bp, url_prefix='/api')
\ No newline at end of file
+    app.register_blueprint(bookmark_bp, url_prefix='/api')
+    app.register_blueprint(stream_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(user_bp, url_prefix='/api')
@@ -0,0 +1,29 @@
+import os
+from flask import Blueprint, jsonify, request, send_from_directory, abort
+from app.utils.decorators import admin_required
+from app.utils.profiler import PROFILE_EXTENSIONS, profiler
+
+admin_bp = Blueprint('admin', __name__)
+
+# ------------------ SLOWEST PROFILED REQUESTS ------------------ #
+@admin_bp.route('/profiles', methods=['GET'])
+@admin_required
+def get_slowest_requests():
+    """Get the slowest recent requests seen by this worker, with SQL and Python breakdowns"""
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    return jsonify({
+        "enabled": profiler.enabled,
+        "sample_rate": profiler.sample_rate,
+        "python_profiler": profiler.mode(),
+        "pid": os.getpid(),
+        "requests": profiler.slowest(limit)
+    }), 200
+
+# ------------------ DOWNLOAD PROFILE ------------------ #
+@admin_bp.route('/profiles/<path:filename>', methods=['GET'])
+@admin_required
+def download_profile(filename):
+    """Download a saved .prof file for pstats or snakeviz, or a .folded one for flame graphs"""
+    if not profiler.enabled or not filename.endswith(PROFILE_EXTENSIONS):
+        abort(404)
+    return send_from_directory(profiler.directory, filename, as_attachment=True)
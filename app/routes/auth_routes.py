@@ -1,18 +1,24 @@
 from flask import Blueprint, jsonify, request  
 from app.models.user import User
 from app.extensions import db
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, current_user
 from app.utils.cloudinary_upload import upload_profile_image
+from app.utils.passwords import PasswordHasherBusy
+from app.utils.decorators import rate_limit, client_ip, login_username, query_budget, validate_json
+from app.schemas.user_schema import UserSchema
+from app.utils.auth import CurrentUser, user_cache, invalidate_user
 
 auth_bp = Blueprint('auth', __name__)
 
-@auth_bp.route('/register', methods = ['POST'])
-def register():
-    data = request.get_json()
-    required = ['username', 'email', 'password']
-    if not all(field in data for field in required):
-        return jsonify({"error": "Missing required fields"}), 400
+@auth_bp.errorhandler(PasswordHasherBusy)
+def handle_hasher_busy(error):
+    response = jsonify({"error": "Server is busy, please try again shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
+@auth_bp.route('/register', methods = ['POST'])
+@validate_json(UserSchema, only=('username', 'email', 'password'))
+def register(data):
     if User.query.filter_by(username = data['username']).first():
         return jsonify({"error": "Username already exists"}), 400
     
@@ -37,17 +43,23 @@ def register():
     }), 201
 
 @auth_bp.route('/login' , methods =['POST'] )
-def login():
-    data = request.get_json()
-    required = ['username', 'password']
-    if not all(field in data for field in required):
-        return jsonify({"error": "Missing username or password"}), 400
-
+@rate_limit('login-ip', 'LOGIN_RATE_LIMIT_PER_IP', client_ip)
+@rate_limit('login-user', 'LOGIN_RATE_LIMIT_PER_USERNAME', login_username)
+@validate_json(UserSchema, only=('username', 'password'))
+def login(data):
     user = User.query.filter_by(username=data['username']).first()
 
     if not user or not user.check_password(data['password']):
         return jsonify({"error": "Incorrect username or password"}), 401
 
+    # Transparently upgrade hashes made with an older scheme or cost
+    if user.password_needs_rehash():
+        user.set_password(data['password'])
+        db.session.commit()
+
+    # Warm the identity cache so the first authenticated request skips the user lookup
+    user_cache.set(user.id, CurrentUser(user))
+
     access_token = create_access_token(identity=str(user.id))
     return jsonify({
         "message": "Login successful",
@@ -66,7 +78,7 @@ def login():
 @jwt_required()
 def upload_user_profile_image():
     """Upload and update user's profile image"""
-    user_id = int(get_jwt_identity())
+    user_id = current_user.id
     user = User.query.get_or_404(user_id)
     
     # Check if file is present in request
@@ -88,6 +100,7 @@ def upload_user_profile_image():
         # Update user's profile image URL
         user.profile_image = result['url']
         db.session.commit()
+        invalidate_user(user_id)
         
         return jsonify({
             "message": "Profile image uploaded successfully",
@@ -107,13 +120,12 @@ def upload_user_profile_image():
 # ------------------ UPDATE USER PROFILE ------------------ #
 @auth_bp.route('/profile', methods=['PUT'])
 @jwt_required()
-def update_profile():
+@validate_json(UserSchema, only=('username', 'email', 'profile_image'), partial=True)
+def update_profile(data):
     """Update user profile information"""
-    user_id = int(get_jwt_identity())
+    user_id = current_user.id
     user = User.query.get_or_404(user_id)
     
-    data = request.get_json()
-    
     # Update fields if provided
     if 'username' in data:
         # Check if username is already taken by another user
@@ -134,15 +146,10 @@ def update_profile():
     
     try:
         db.session.commit()
+        invalidate_user(user_id)
         return jsonify({
             "message": "Profile updated successfully",
-            "user": {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "profile_image": user.profile_image,
-                "created_at": user.created_at.isoformat() if user.created_at else None
-            }
+            "user": CurrentUser(user).to_dict()
         }), 200
     except Exception as e:
         db.session.rollback()
@@ -150,16 +157,8 @@ def update_profile():
 
 # ------------------ GET USER PROFILE ------------------ #
 @auth_bp.route('/profile', methods=['GET'])
+@query_budget(1)
 @jwt_required()
 def get_profile():
     """Get current user's profile information"""
-    user_id = int(get_jwt_identity())
-    user = User.query.get_or_404(user_id)
-    
-    return jsonify({
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "profile_image": user.profile_image,
-        "created_at": user.created_at.isoformat() if user.created_at else None
-    }), 200
\ No newline at end of file
+    return jsonify(current_user.to_dict()), 200
\ No newline at end of file
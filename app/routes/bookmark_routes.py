@@ -1,9 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.bookmark import Bookmark
 from app.models.recipe import Recipe
 from app.schemas.bookmark_schema import BookmarkSchema
+from app.utils.decorators import validate_json
+from app.utils.recommendations import recommendation_cache
 
 bookmark_bp = Blueprint('bookmarks', __name__)
 bookmark_schema = BookmarkSchema()
@@ -11,13 +13,10 @@ bookmark_list_schema = BookmarkSchema(many=True)
 
 @bookmark_bp.route('/bookmarks', methods=['POST'])
 @jwt_required()
-def create_bookmark():
-    data = request.get_json()
+@validate_json(BookmarkSchema, only=('recipe_id',))
+def create_bookmark(data):
     user_id = int(get_jwt_identity())
-    recipe_id = data.get('recipe_id')
-
-    if not recipe_id:
-        return jsonify({"error": "Missing recipe_id"}), 400
+    recipe_id = data['recipe_id']
 
     recipe = Recipe.query.get(recipe_id)
     if not recipe:
@@ -30,6 +29,7 @@ def create_bookmark():
     bookmark = Bookmark(user_id=user_id, recipe_id=recipe_id)
     db.session.add(bookmark)
     db.session.commit()
+    recommendation_cache.invalidate(user_id)
     return bookmark_schema.jsonify(bookmark), 201
 
 
@@ -37,7 +37,8 @@ def create_bookmark():
 @jwt_required()
 def get_user_bookmarks():
     user_id = int(get_jwt_identity())
-    bookmarks = Bookmark.query.filter_by(user_id=user_id).all()
+    # Joined to recipes so bookmarks of deleted recipes are hidden until they are purged
+    bookmarks = Bookmark.query.join(Recipe).filter(Bookmark.user_id == user_id).all()
     return bookmark_list_schema.jsonify(bookmarks), 200
 
 
@@ -52,4 +53,5 @@ def delete_bookmark(id):
 
     db.session.delete(bookmark)
     db.session.commit()
+    recommendation_cache.invalidate(user_id)
     return jsonify({"message": "Bookmark deleted"}), 200
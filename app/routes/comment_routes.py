@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.comment import Comment
+from app.models.recipe import Recipe
 from app.schemas.comment_schema import CommentSchema
+from app.utils.decorators import validate_json
+from app.utils.events import publish_recipe_event
+from app.utils.activity_feed import queue_fan_out, fan_out_comment, remove_comment_items
 
 comment_bp = Blueprint('comments', __name__, url_prefix='/api/comments')
 
@@ -11,28 +15,31 @@ comments_schema = CommentSchema(many=True)
 
 @comment_bp.route('/', methods=['POST'])
 @jwt_required()
-def create_comment():
-    data = request.get_json()
+@validate_json(CommentSchema, only=('text', 'recipe_id'))
+def create_comment(data):
     user_id = int(get_jwt_identity())
-
-    if not data or not data.get('text') or not data.get('recipe_id'):
-        return jsonify({
-            "error": "Both 'text' and 'recipe_id' are required"
-        }), 400
+    # Loaded by a query, so a deleted recipe is a 404 like a missing one
+    recipe = Recipe.query.get_or_404(data['recipe_id'])
 
     new_comment = Comment(
         text=data['text'],
         user_id=user_id,
-        recipe_id=data['recipe_id']
+        recipe=recipe
     )
     db.session.add(new_comment)
+    db.session.flush()
+    queue_fan_out(fan_out_comment, comment_id=new_comment.id)
     db.session.commit()
 
-    return jsonify(comment_schema.dump(new_comment)), 201
+    payload = comment_schema.dump(new_comment)
+    publish_recipe_event(recipe, 'comment_created', payload)
+
+    return jsonify(payload), 201
 
 @comment_bp.route('/<int:recipe_id>', methods=['GET'])
 def get_comments_for_recipe(recipe_id):
-    comments = Comment.query.filter_by(recipe_id=recipe_id).all()
+    # Joined to recipes so comments of deleted recipes are hidden until they are purged
+    comments = Comment.query.join(Recipe).filter(Comment.recipe_id == recipe_id).all()
     return jsonify(comments_schema.dump(comments)), 200
 
 @comment_bp.route('/<int:comment_id>', methods=['DELETE'])
@@ -44,24 +51,30 @@ def delete_comment(comment_id):
     if comment.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
 
+    recipe = comment.recipe
+    remove_comment_items(comment_id)
     db.session.delete(comment)
     db.session.commit()
+
+    if recipe:
+        publish_recipe_event(recipe, 'comment_deleted', {'id': comment_id, 'recipe_id': recipe.id})
     return jsonify({'message': 'Comment deleted'}), 200
 
 @comment_bp.route('/<int:comment_id>', methods=['PUT'])
 @jwt_required()
-def update_comment(comment_id):
-    data = request.get_json()
+@validate_json(CommentSchema, only=('text',))
+def update_comment(comment_id, data):
     user_id = int(get_jwt_identity())
     comment = Comment.query.get_or_404(comment_id)
 
     if comment.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
 
-    if not data or not data.get('text'):
-        return jsonify({'error': "'text' field is required for update"}), 400
-
     comment.text = data['text']
     db.session.commit()
 
-    return jsonify(comment_schema.dump(comment)), 200
+    payload = comment_schema.dump(comment)
+    if comment.recipe:
+        publish_recipe_event(comment.recipe, 'comment_updated', payload)
+
+    return jsonify(payload), 200
@@ -4,6 +4,12 @@ from app.models.group import Group
 from app.models.group_member import GroupMember
 from app.models.user import User
 from app.extensions import db
+from app.utils.auth import has_group_role, ROLE_ADMIN, invalidate_membership, invalidate_group_memberships
+from app.utils.activity_feed import my_feed_page, queue_fan_out, member_joined, member_left
+from app.utils.soft_delete import soft_delete
+from app.utils.decorators import query_budget, validate_json
+from app.schemas.group_schema import GroupSchema, GroupMemberSchema
+from app.utils.ranking import decode_cursor
 from sqlalchemy.exc import IntegrityError
 
 group_bp = Blueprint('group', __name__)
@@ -44,21 +50,16 @@ def get_groups():
 # ------------------ CREATE GROUP ------------------ #
 @group_bp.route('/groups', methods=['POST'])
 @jwt_required()
-def create_group():
+@validate_json(GroupSchema, only=('name', 'description'))
+def create_group(data):
     """Create a new group with the current user as admin"""
     user_id = int(get_jwt_identity())
-    data = request.get_json()
-
-    # Validate required fields
-    required_fields = ['name']
-    if not all(field in data for field in required_fields):
-        return jsonify({"error": "Missing required fields"}), 400
 
     try:
         # Create the group
         new_group = Group(
             name=data['name'],
-            description=data.get('description', '')
+            description=data.get('description') or ''
         )
 
         db.session.add(new_group)
@@ -73,6 +74,7 @@ def create_group():
 
         db.session.add(admin_member)
         db.session.commit()
+        invalidate_membership(user_id, new_group.id)
 
         return jsonify({
             "message": "Group created successfully",
@@ -132,23 +134,16 @@ def get_single_group(group_id):
 # ------------------ UPDATE GROUP ------------------ #
 @group_bp.route('/groups/<int:group_id>', methods=['PUT'])
 @jwt_required()
-def update_group(group_id):
+@validate_json(GroupSchema, only=('name', 'description'), partial=True)
+def update_group(group_id, data):
     """Update group information (admin only)"""
     user_id = int(get_jwt_identity())
     group = Group.query.get_or_404(group_id)
 
     # Check if user is admin of this group
-    member = GroupMember.query.filter_by(
-        user_id=user_id, 
-        group_id=group_id, 
-        is_admin=True
-    ).first()
-    
-    if not member:
+    if not has_group_role(user_id, group_id, ROLE_ADMIN):
         return jsonify({"error": "Unauthorized - Admin access required"}), 403
 
-    data = request.get_json()
-    
     # Update group fields
     if 'name' in data:
         group.name = data['name']
@@ -174,18 +169,14 @@ def delete_group(group_id):
     group = Group.query.get_or_404(group_id)
 
     # Check if user is admin of this group
-    member = GroupMember.query.filter_by(
-        user_id=user_id, 
-        group_id=group_id, 
-        is_admin=True
-    ).first()
-    
-    if not member:
+    if not has_group_role(user_id, group_id, ROLE_ADMIN):
         return jsonify({"error": "Unauthorized - Admin access required"}), 403
 
     try:
-        db.session.delete(group)
+        # Hidden at once; memberships are purged in the background
+        soft_delete(group)
         db.session.commit()
+        invalidate_group_memberships(group_id)
         return jsonify({"message": "Group deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -216,7 +207,9 @@ def join_group(group_id):
         )
 
         db.session.add(new_member)
+        queue_fan_out(member_joined, user_id=user_id, group_id=group_id)
         db.session.commit()
+        invalidate_membership(user_id, group_id)
 
         return jsonify({
             "message": "Successfully joined the group",
@@ -246,8 +239,10 @@ def leave_group(group_id):
         return jsonify({"error": "You are not a member of this group"}), 400
 
     try:
+        member_left(user_id, group_id)
         db.session.delete(member)
         db.session.commit()
+        invalidate_membership(user_id, group_id)
         return jsonify({"message": "Successfully left the group"}), 200
     except Exception as e:
         db.session.rollback()
@@ -256,18 +251,13 @@ def leave_group(group_id):
 # ------------------ MANAGE MEMBER ADMIN STATUS ------------------ #
 @group_bp.route('/groups/<int:group_id>/members/<int:member_user_id>/admin', methods=['PUT'])
 @jwt_required()
-def toggle_admin_status(group_id, member_user_id):
+@validate_json(GroupMemberSchema, only=('is_admin',))
+def toggle_admin_status(group_id, member_user_id, data):
     """Promote/demote a member to/from admin (admin only)"""
     user_id = int(get_jwt_identity())
     
     # Check if current user is admin of this group
-    admin_member = GroupMember.query.filter_by(
-        user_id=user_id, 
-        group_id=group_id, 
-        is_admin=True
-    ).first()
-    
-    if not admin_member:
+    if not has_group_role(user_id, group_id, ROLE_ADMIN):
         return jsonify({"error": "Unauthorized - Admin access required"}), 403
 
     # Find the member to modify
@@ -279,12 +269,12 @@ def toggle_admin_status(group_id, member_user_id):
     if not target_member:
         return jsonify({"error": "User is not a member of this group"}), 404
 
-    data = request.get_json()
-    is_admin = data.get('is_admin', False)
+    is_admin = data.get('is_admin') or False
 
     try:
         target_member.is_admin = is_admin
         db.session.commit()
+        invalidate_membership(member_user_id, group_id)
         
         action = "promoted to admin" if is_admin else "demoted from admin"
         return jsonify({
@@ -303,13 +293,7 @@ def remove_member(group_id, member_user_id):
     user_id = int(get_jwt_identity())
     
     # Check if current user is admin of this group
-    admin_member = GroupMember.query.filter_by(
-        user_id=user_id, 
-        group_id=group_id, 
-        is_admin=True
-    ).first()
-    
-    if not admin_member:
+    if not has_group_role(user_id, group_id, ROLE_ADMIN):
         return jsonify({"error": "Unauthorized - Admin access required"}), 403
 
     # Find the member to remove
@@ -326,8 +310,10 @@ def remove_member(group_id, member_user_id):
         return jsonify({"error": "Use leave endpoint to remove yourself from the group"}), 400
 
     try:
+        member_left(member_user_id, group_id)
         db.session.delete(target_member)
         db.session.commit()
+        invalidate_membership(member_user_id, group_id)
         return jsonify({"message": "Member removed from group successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -340,7 +326,7 @@ def get_my_groups():
     """Get all groups that the current user is a member of"""
     user_id = int(get_jwt_identity())
     
-    memberships = GroupMember.query.filter_by(user_id=user_id).all()
+    memberships = GroupMember.query.join(Group).filter(GroupMember.user_id == user_id).all()
     
     result = []
     for membership in memberships:
@@ -355,4 +341,32 @@ def get_my_groups():
             "joined_at": membership.joined_at
         })
     
-    return jsonify(result), 200
\ No newline at end of file
+    return jsonify(result), 200
+
+# ------------------ GET USER'S FEED ------------------ #
+MY_FEED_INCLUDES = {'comments'}
+
+@group_bp.route('/my-feed', methods=['GET'])
+@jwt_required()
+@query_budget(2)  # user lookup on a cold user cache, then one query
+def get_my_feed():
+    """Get recent recipes, and optionally comments, from all of the user's groups, newest first"""
+    user_id = int(get_jwt_identity())
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    include = {name for name in request.args.get('include', '').split(',') if name}
+    if include - MY_FEED_INCLUDES:
+        return jsonify({"error": f"Unknown include: {', '.join(sorted(include - MY_FEED_INCLUDES))}"}), 400
+
+    try:
+        cursor = request.args.get('cursor')
+        items, next_cursor = my_feed_page(
+            user_id, limit, decode_cursor(cursor, size=3) if cursor else None, include_comments='comments' in include
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "item_count": len(items),
+        "items": items,
+        "next_cursor": next_cursor
+    }), 200
@@ -3,27 +3,73 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import or_
 from app.models.recipe import Recipe
 from app.models.rating import Rating
-from app.models.group_member import GroupMember
+from app.models.rating_summary import RatingSummary
 from app.extensions import db
 from app.utils.cloudinary_upload import upload_recipe_image
-# from app.schemas.recipe_schema import RecipeSchema
+from app.utils.events import publish_recipe_event
+from app.utils.auth import has_group_role
+from app.utils.decorators import query_budget, validate_json, optional_user_id
+from app.utils.ranking import FEED_SORTS, decode_cursor, feed_page, group_feed_page
+from app.utils.facets import FACETS, parse_filters, filtered_recipes, facet_counts
+from app.utils.ingredients import sync_recipe_ingredients, parse_ingredient_terms, find_by_ingredients, matched_names
+from app.utils.similarity import similarity_index
+from app.utils.recommendations import recommendation_cache
+from app.utils.ratings import valid_rating, record_rating, distribution
+from app.utils.activity_feed import queue_fan_out, fan_out_recipe
+from app.utils.soft_delete import soft_delete
+from app.schemas.recipe_schema import RecipeSchema
+from app.schemas.rating_schema import RatingSchema
 
 recipe_bp = Blueprint('recipe', __name__)
 
 # ------------------ GET GROUP RECIPES ------------------ #
 @recipe_bp.route('/groups/<int:group_id>/recipes', methods=['GET'])
 @jwt_required()
+@query_budget(2)  # user lookup on a cold user cache, then one query
 def get_group_recipes(group_id):
-    """Get all recipes shared in a specific group"""
+    """Get recipes shared in a group, newest first, one keyset page at a time"""
     user_id = int(get_jwt_identity())
-    
-    # Verify user is a member of the group
-    member = GroupMember.query.filter_by(user_id=user_id, group_id=group_id).first()
-    if not member:
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+
+    try:
+        cursor = request.args.get('cursor')
+        cards, next_cursor = group_feed_page(user_id, group_id, limit, decode_cursor(cursor) if cursor else None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # The same query checks membership: no row at all means the user is not a member
+    if cards is None:
         return jsonify({"error": "You must be a member of this group to view its recipes"}), 403
-    
-    recipes = Recipe.query.filter_by(group_id=group_id).all()
-    
+
+    return jsonify({
+        "group_id": group_id,
+        "recipe_count": len(cards),
+        "recipes": cards,
+        "next_cursor": next_cursor
+    }), 200
+
+# ------------------ GET ALL RECIPES ------------------ #
+@recipe_bp.route('/recipes', methods=['GET'])
+@query_budget(3)
+def get_recipes():
+    """Get recipes matching the filters, optionally with facet counts for a filter sidebar"""
+    try:
+        filters = parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    facets = [name for name in request.args.get('facets', '').split(',') if name]
+    unknown = [name for name in facets if name not in FACETS]
+    if unknown:
+        return jsonify({"error": f"Unknown facets: {', '.join(unknown)}"}), 400
+
+    query = filtered_recipes(filters).order_by(Recipe.id)
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        query = query.limit(min(max(limit, 0), 100)).offset(max(request.args.get('offset', 0, type=int), 0))
+
+    recipes = query.all() if limit != 0 else []
+
     result = []
     for recipe in recipes:
         result.append({
@@ -40,69 +86,152 @@ def get_group_recipes(group_id):
             "user_id": recipe.user_id,
             "group_id": recipe.group_id
         })
-    
+
+    # Without facets the response stays a bare list for existing clients
+    if not facets:
+        return jsonify(result), 200
+
     return jsonify({
-        "group_id": group_id,
-        "recipe_count": len(result),
-        "recipes": result
+        "recipes": result,
+        "facets": facet_counts(filters, facets)
     }), 200
 
-# ------------------ GET ALL RECIPES ------------------ #
-@recipe_bp.route('/recipes', methods=['GET'])
-def get_recipes():
-    country = request.args.get('country')
-    min_rating = request.args.get('min_rating', type=float)
-    serving_size = request.args.get('serving_size', type=int)
+# ------------------ RECIPE FEED ------------------ #
+@recipe_bp.route('/recipes/feed', methods=['GET'])
+@query_budget(1)
+def get_recipe_feed():
+    """Get recipes ranked as trending, top rated or newest, one keyset page at a time"""
+    sort = request.args.get('sort', 'trending')
+    if sort not in FEED_SORTS:
+        return jsonify({"error": f"sort must be one of: {', '.join(FEED_SORTS)}"}), 400
 
-    query = Recipe.query
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    try:
+        cursor = request.args.get('cursor')
+        rows, next_cursor = feed_page(sort, limit, decode_cursor(cursor) if cursor else None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    if country:
-        query = query.filter(Recipe.country == country)
+    result = []
+    for recipe, score in rows:
+        result.append({
+            "id": recipe.id,
+            "title": recipe.title,
+            "description": recipe.description,
+            "country": recipe.country,
+            "serving_size": recipe.serving_size,
+            "image_url": recipe.image_url,
+            "created_at": recipe.created_at,
+            "user_id": recipe.user_id,
+            "group_id": recipe.group_id,
+            "average_rating": round(score.rating_sum / score.rating_count, 2) if score and score.rating_count else None,
+            "rating_count": score.rating_count if score else 0,
+            "comment_count": score.comment_count if score else 0,
+            "bookmark_count": score.bookmark_count if score else 0
+        })
+
+    return jsonify({
+        "sort": sort,
+        "recipes": result,
+        "next_cursor": next_cursor
+    }), 200
+
+# ------------------ SEARCH BY INGREDIENTS ------------------ #
+@recipe_bp.route('/recipes/by-ingredients', methods=['GET'])
+@query_budget(2)
+def get_recipes_by_ingredients():
+    """Find recipes containing the given ingredients, optionally tolerating a few missing ones"""
+    try:
+        include = parse_ingredient_terms(request.args.getlist('include'))
+        exclude = parse_ingredient_terms(request.args.getlist('exclude'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    if min_rating:
-        query = query.join(Rating).group_by(Recipe.id).having(db.func.avg(Rating.value) >= min_rating)
+    if not include:
+        return jsonify({"error": "Provide at least one ingredient in include"}), 400
 
-    if serving_size:
-        query = query.filter(Recipe.serving_size == serving_size)
+    max_missing = max(request.args.get('max_missing', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    offset = max(request.args.get('offset', 0, type=int), 0)
 
-    recipes = query.all()
+    rows = find_by_ingredients(include, exclude, max_missing, limit, offset)
+    found = matched_names([recipe.id for recipe, _, _ in rows], include)
 
     result = []
-    for recipe in recipes:
+    for recipe, matched, total in rows:
         result.append({
             "id": recipe.id,
             "title": recipe.title,
             "description": recipe.description,
-            "ingredients": recipe.ingredients,
-            "instructions": recipe.instructions,
             "country": recipe.country,
             "serving_size": recipe.serving_size,
             "image_url": recipe.image_url,
-            "created_at": recipe.created_at,
-            "updated_at": recipe.updated_at,
             "user_id": recipe.user_id,
-            "group_id": recipe.group_id
+            "group_id": recipe.group_id,
+            "matched_ingredients": sorted(found[recipe.id]),
+            "missing_ingredients": sorted(include - found[recipe.id]),
+            "other_ingredient_count": total - matched
         })
 
-    return jsonify(result), 200
+    return jsonify({
+        "include": sorted(include),
+        "exclude": sorted(exclude),
+        "max_missing": max_missing,
+        "recipes": result
+    }), 200
+
+# ------------------ SIMILAR RECIPES ------------------ #
+@recipe_bp.route('/recipes/<int:recipe_id>/similar', methods=['GET'])
+@query_budget(2)
+def get_similar_recipes(recipe_id):
+    """Get the recipes most like this one by title, description and ingredients"""
+    recipe = Recipe.query.get_or_404(recipe_id)
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+
+    if not similarity_index.available():
+        return jsonify({"error": "Similar recipes are not available yet"}), 503
+
+    matches = similarity_index.similar(recipe, limit)
+    recipes = {r.id: r for r in Recipe.query.filter(Recipe.id.in_([match_id for match_id, _ in matches]))} if matches else {}
+
+    result = []
+    for match_id, score in matches:
+        match = recipes.get(match_id)
+        if match is None:
+            continue
+        result.append({
+            "id": match.id,
+            "title": match.title,
+            "description": match.description,
+            "country": match.country,
+            "serving_size": match.serving_size,
+            "image_url": match.image_url,
+            "user_id": match.user_id,
+            "group_id": match.group_id,
+            "similarity": round(score, 4)
+        })
+
+    return jsonify({
+        "recipe_id": recipe_id,
+        "recipes": result
+    }), 200
 
 # ------------------ CREATE RECIPE ------------------ #
+RECIPE_FIELDS = (
+    'title', 'description', 'ingredients', 'instructions', 'country', 'image_url', 'serving_size', 'group_id'
+)
+
 @recipe_bp.route('/recipes', methods=['POST'])
 @jwt_required()
-def create_recipe():
+@validate_json(RecipeSchema, only=RECIPE_FIELDS)
+def create_recipe(data):
     user_id = int(get_jwt_identity()) 
-    data = request.get_json()
-
-    required_fields = ['title', 'description', 'ingredients', 'instructions']
-    if not all(field in data for field in required_fields):
-        return jsonify({"error": "Missing required fields"}), 400
 
     try:
         # If group_id is provided, validate user is member of that group
-        group_id = data.get('group_id')
+        group_id = data.get('group_id') or None
         if group_id:
-            member = GroupMember.query.filter_by(user_id=user_id, group_id=group_id).first()
-            if not member:
+            if not has_group_role(user_id, group_id):
                 return jsonify({"error": "You must be a member of the group to share recipes there"}), 403
 
         new_recipe = Recipe(
@@ -118,7 +247,12 @@ def create_recipe():
         )
 
         db.session.add(new_recipe)
+        sync_recipe_ingredients(new_recipe)
+        if group_id:
+            db.session.flush()
+            queue_fan_out(fan_out_recipe, recipe_id=new_recipe.id)
         db.session.commit()
+        similarity_index.update(new_recipe)
 
         return jsonify({
             "message": "Recipe created successfully",
@@ -130,29 +264,25 @@ def create_recipe():
         return jsonify({"error": str(e)}), 500
 
 # ------------------ GET SINGLE RECIPE ------------------ #
-@recipe_bp.route('/recipes/<int:recipe_id>', methods=['GET'])
-def get_single_recipe(recipe_id):
-    recipe = Recipe.query.get_or_404(recipe_id)
-
-    # Get current user id if JWT is present
-    user_id = None
-    try:
-        user_id = int(get_jwt_identity())
-    except Exception:
-        pass
-
-    # Calculate average rating
-    ratings = Rating.query.filter_by(recipe_id=recipe_id).all()
-    average_rating = round(sum(r.value for r in ratings) / len(ratings), 2) if ratings else None
-
-    # Get current user's rating
-    user_rating = None
-    if user_id:
-        user_rating_obj = Rating.query.filter_by(recipe_id=recipe_id, user_id=user_id).first()
-        if user_rating_obj:
-            user_rating = user_rating_obj.value
-
-    return jsonify({
+MAX_BATCH_RECIPES = 100
+
+def load_recipe_details(recipe_ids, user_id=None):
+    """Recipes with their rating rollups, and the caller's own ratings, in at most two queries"""
+    rows = {
+        recipe.id: (recipe, summary)
+        for recipe, summary in db.session.query(Recipe, RatingSummary).outerjoin(
+            RatingSummary, RatingSummary.recipe_id == Recipe.id
+        ).filter(Recipe.id.in_(recipe_ids))
+    }
+    user_ratings = {}
+    if user_id and rows:
+        user_ratings = dict(db.session.query(Rating.recipe_id, Rating.value).filter(
+            Rating.user_id == user_id, Rating.recipe_id.in_(list(rows))
+        ))
+    return rows, user_ratings
+
+def recipe_detail(recipe, summary, user_rating):
+    return {
         "id": recipe.id,
         "title": recipe.title,
         "description": recipe.description,
@@ -165,28 +295,69 @@ def get_single_recipe(recipe_id):
         "updated_at": recipe.updated_at,
         "user_id": recipe.user_id,
         "group_id": recipe.group_id,
-        "average_rating": average_rating,
+        "average_rating": round(summary.rating_sum / summary.rating_count, 2) if summary and summary.rating_count else None,
+        "rating_count": summary.rating_count if summary else 0,
         "user_rating": user_rating
+    }
+
+@recipe_bp.route('/recipes/<int:recipe_id>', methods=['GET'])
+@query_budget(3)
+def get_single_recipe(recipe_id):
+    # Current user id if a valid JWT is present, for their own rating
+    user_id = optional_user_id()
+
+    rows, user_ratings = load_recipe_details([recipe_id], user_id)
+    if recipe_id not in rows:
+        return jsonify({"error": "Recipe not found"}), 404
+
+    recipe, summary = rows[recipe_id]
+    return jsonify(recipe_detail(recipe, summary, user_ratings.get(recipe_id))), 200
+
+# ------------------ GET RECIPES BY ID ------------------ #
+@recipe_bp.route('/recipes/batch', methods=['GET', 'POST'])
+@query_budget(3)
+def get_recipes_batch():
+    """Get several recipes by id in one request, in the order requested"""
+    if request.method == 'POST':
+        raw_ids = (request.get_json(silent=True) or {}).get('ids')
+    else:
+        raw_ids = [value for value in request.args.get('ids', '').split(',') if value.strip()]
+
+    try:
+        if not isinstance(raw_ids, list) or any(isinstance(value, bool) for value in raw_ids):
+            raise ValueError
+        recipe_ids = list(dict.fromkeys(int(value) for value in raw_ids))
+    except (TypeError, ValueError):
+        return jsonify({"error": "ids must be a list of recipe ids"}), 400
+    if not recipe_ids or len(recipe_ids) > MAX_BATCH_RECIPES:
+        return jsonify({"error": f"Request between 1 and {MAX_BATCH_RECIPES} recipe ids"}), 400
+
+    rows, user_ratings = load_recipe_details(recipe_ids, optional_user_id())
+
+    return jsonify({
+        "recipes": [
+            recipe_detail(*rows[recipe_id], user_ratings.get(recipe_id))
+            for recipe_id in recipe_ids if recipe_id in rows
+        ],
+        "missing_ids": [recipe_id for recipe_id in recipe_ids if recipe_id not in rows]
     }), 200
 
 # ------------------ UPDATE RECIPE ------------------ #
 @recipe_bp.route('/recipes/<int:recipe_id>', methods=['PUT'])
 @jwt_required()
-def update_recipe(recipe_id):
+@validate_json(RecipeSchema, only=RECIPE_FIELDS, partial=True)
+def update_recipe(recipe_id, data):
     user_id = int(get_jwt_identity())
     recipe = Recipe.query.get_or_404(recipe_id)
 
     if recipe.user_id != user_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    data = request.get_json()
-    
     # If updating group_id, validate user is member of that group
     new_group_id = data.get('group_id')
     if new_group_id is not None and new_group_id != recipe.group_id:
         if new_group_id != 0:  
-            member = GroupMember.query.filter_by(user_id=user_id, group_id=new_group_id).first()
-            if not member:
+            if not has_group_role(user_id, new_group_id):
                 return jsonify({"error": "You must be a member of the group to share recipes there"}), 403
     
     recipe.title = data.get('title', recipe.title)
@@ -201,7 +372,14 @@ def update_recipe(recipe_id):
     if 'group_id' in data:
         recipe.group_id = data['group_id'] if data['group_id'] != 0 else None 
 
+    if 'ingredients' in data:
+        sync_recipe_ingredients(recipe)
+    if 'group_id' in data:
+        queue_fan_out(fan_out_recipe, recipe_id=recipe.id)
+
     db.session.commit()
+    if any(field in data for field in ('title', 'description', 'ingredients')):
+        similarity_index.update(recipe)
     return jsonify({"message": "Recipe updated successfully"}), 200
 
 # ------------------ DELETE RECIPE ------------------ #
@@ -214,20 +392,17 @@ def delete_recipe(recipe_id):
     if recipe.user_id != user_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    db.session.delete(recipe)
+    # Hidden at once; ratings, comments, bookmarks and the image are purged in the background
+    soft_delete(recipe)
     db.session.commit()
+    similarity_index.remove(recipe_id)
     return jsonify({"message": "Recipe deleted successfully"}), 200
 # ------------------ RATE RECIPE ------------------ #
 @recipe_bp.route('/recipes/<int:recipe_id>/rate', methods=['POST'])
 @jwt_required()
-def rate_recipe(recipe_id):
+@validate_json(RatingSchema, only=('value',))
+def rate_recipe(recipe_id, data):
     user_id = int(get_jwt_identity())
-    data = request.get_json()
-
-    required_fields = ['value']
-    if not all(field in data for field in required_fields):
-        return jsonify({"error": "Missing required fields"}), 400
-
     recipe = Recipe.query.get_or_404(recipe_id)
 
     # Check if the user has already rated this recipe
@@ -242,10 +417,52 @@ def rate_recipe(recipe_id):
     )
 
     db.session.add(new_rating)
+    record_rating(recipe_id, new_rating.value)
     db.session.commit()
+    recommendation_cache.invalidate(user_id)
+
+    stats = distribution(recipe_id, db.session.get(RatingSummary, recipe_id))
+    publish_recipe_event(recipe, 'rating_created', {
+        "recipe_id": recipe_id,
+        "user_id": user_id,
+        "value": new_rating.value,
+        "average_rating": stats["average_rating"],
+        "rating_count": stats["rating_count"]
+    })
 
     return jsonify({"message": "Recipe rated successfully"}), 201
 
+# ------------------ REMOVE RATING ------------------ #
+@recipe_bp.route('/recipes/<int:recipe_id>/rate', methods=['DELETE'])
+@jwt_required()
+def remove_rating(recipe_id):
+    """Withdraw the current user's rating of a recipe"""
+    user_id = int(get_jwt_identity())
+    rating = Rating.query.filter_by(user_id=user_id, recipe_id=recipe_id).first()
+    if not rating:
+        return jsonify({"error": "You have not rated this recipe"}), 404
+
+    db.session.delete(rating)
+    if valid_rating(rating.value):
+        record_rating(recipe_id, rating.value, delta=-1)
+    db.session.commit()
+    recommendation_cache.invalidate(user_id)
+
+    return jsonify({"message": "Rating removed"}), 200
+
+# ------------------ RATING DISTRIBUTION ------------------ #
+@recipe_bp.route('/recipes/<int:recipe_id>/ratings/distribution', methods=['GET'])
+@query_budget(1)
+def get_rating_distribution(recipe_id):
+    """Get the 1-5 star histogram, count, average and Bayesian score of a recipe"""
+    row = db.session.query(Recipe.id, RatingSummary).outerjoin(
+        RatingSummary, RatingSummary.recipe_id == Recipe.id
+    ).filter(Recipe.id == recipe_id).first()
+    if row is None:
+        return jsonify({"error": "Recipe not found"}), 404
+
+    return jsonify(distribution(recipe_id, row[1])), 200
+
 # ------------------ UPLOAD RECIPE IMAGE ------------------ #
 @recipe_bp.route('/recipes/<int:recipe_id>/upload-image', methods=['POST'])
 @jwt_required()
@@ -295,6 +512,7 @@ def upload_recipe_image_endpoint(recipe_id):
 
 # ------------------ SEARCH RECIPES ------------------ #
 @recipe_bp.route('/recipes/search', methods=['GET'])
+@query_budget(1)
 def search_recipes():
     query_param = request.args.get('query', '').strip()
 
@@ -0,0 +1,50 @@
+from flask import Blueprint, Response, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.recipe import Recipe
+from app.models.group import Group
+from app.utils.auth import has_group_role
+from app.utils.events import event_hub, recipe_channel, group_channel, format_sse
+
+stream_bp = Blueprint('stream', __name__)
+
+def event_stream(channel):
+    """Build a text/event-stream response fed by the event hub"""
+    subscription = event_hub.subscribe(channel)
+    heartbeat = event_hub.heartbeat_seconds
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                message = subscription.get(timeout=heartbeat)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(message)
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+# ------------------ RECIPE EVENT STREAM ------------------ #
+@stream_bp.route('/recipes/<int:recipe_id>/stream', methods=['GET'])
+def stream_recipe_events(recipe_id):
+    """Stream new comments and ratings for a recipe"""
+    Recipe.query.get_or_404(recipe_id)
+    return event_stream(recipe_channel(recipe_id))
+
+# ------------------ GROUP EVENT STREAM ------------------ #
+@stream_bp.route('/groups/<int:group_id>/stream', methods=['GET'])
+@jwt_required()
+def stream_group_events(group_id):
+    """Stream comment and rating activity on recipes shared in a group (members only)"""
+    user_id = int(get_jwt_identity())
+    Group.query.get_or_404(group_id)
+
+    if not has_group_role(user_id, group_id):
+        return jsonify({"error": "You must be a member of this group to follow its activity"}), 403
+
+    return event_stream(group_channel(group_id))
@@ -0,0 +1,22 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.decorators import query_budget
+from app.utils.recommendations import MAX_RECOMMENDATIONS, recommend_for_user
+
+user_bp = Blueprint('users', __name__)
+
+# ------------------ RECOMMENDATIONS ------------------ #
+@user_bp.route('/users/me/recommendations', methods=['GET'])
+@jwt_required()
+@query_budget(4)  # user lookup on a cold user cache, then at most 3 on a recommendation cache miss
+def get_my_recommendations():
+    """Get recipes liked by people who liked the same recipes as the current user"""
+    user_id = int(get_jwt_identity())
+    limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_RECOMMENDATIONS)
+
+    result = recommend_for_user(user_id, limit)
+    return jsonify({
+        "user_id": user_id,
+        "source": result["source"],
+        "recipes": result["recipes"]
+    }), 200
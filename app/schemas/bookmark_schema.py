@@ -1,6 +1,7 @@
 from app.extensions import ma
 from app.models.bookmark import Bookmark
 from app.schemas.recipe_schema import RecipeSchema
+from app.schemas.validators import RECORD_ID
 from marshmallow import fields
 
 class BookmarkSchema(ma.SQLAlchemySchema):
@@ -10,5 +11,5 @@ class BookmarkSchema(ma.SQLAlchemySchema):
 
     id = ma.auto_field()
     user_id = ma.auto_field()
-    recipe_id = ma.auto_field()
+    recipe_id = ma.auto_field(validate=RECORD_ID)
     recipe = fields.Nested(RecipeSchema)
\ No newline at end of file
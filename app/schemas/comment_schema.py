@@ -2,10 +2,13 @@
 
 from app.extensions import ma
 from app.models.comment import Comment
-from marshmallow import fields
+from marshmallow import fields, validate
 
 from app.schemas.user_schema import UserSchema
 from app.schemas.recipe_schema import RecipeSchema
+from app.schemas.validators import RECORD_ID
+
+MAX_COMMENT_LENGTH = 2000
 
 class CommentSchema(ma.SQLAlchemySchema):
     class Meta:
@@ -13,10 +16,10 @@ class CommentSchema(ma.SQLAlchemySchema):
         load_instance = True
 
     id = ma.auto_field()
-    text = ma.auto_field()
+    text = ma.auto_field(validate=validate.Length(min=1, max=MAX_COMMENT_LENGTH))
     created_at = ma.auto_field()
     user_id = ma.auto_field()
-    recipe_id = ma.auto_field()
+    recipe_id = ma.auto_field(validate=RECORD_ID)
 
     user = fields.Nested(UserSchema, only=['id', 'username'])
     recipe = fields.Nested(RecipeSchema, only=['id', 'title'])
@@ -0,0 +1,28 @@
+from marshmallow import validate
+
+from app.extensions import ma
+from app.models.group import Group
+from app.models.group_member import GroupMember
+
+MAX_GROUP_DESCRIPTION_LENGTH = 2000
+
+class GroupSchema(ma.SQLAlchemySchema):
+    class Meta:
+        model = Group
+        load_instance = True
+
+    id = ma.auto_field()
+    name = ma.auto_field(validate=validate.Length(min=1, max=100))
+    description = ma.auto_field(validate=validate.Length(max=MAX_GROUP_DESCRIPTION_LENGTH))
+    created_at = ma.auto_field()
+
+class GroupMemberSchema(ma.SQLAlchemySchema):
+    class Meta:
+        model = GroupMember
+        load_instance = True
+
+    id = ma.auto_field()
+    user_id = ma.auto_field()
+    group_id = ma.auto_field()
+    is_admin = ma.auto_field()
+    joined_at = ma.auto_field()
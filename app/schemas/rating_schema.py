@@ -0,0 +1,19 @@
+from marshmallow import validate
+
+from app.extensions import ma
+from app.models.rating import Rating
+from app.utils.ratings import STARS
+
+class RatingSchema(ma.SQLAlchemySchema):
+    class Meta:
+        model = Rating
+        load_instance = True
+
+    id = ma.auto_field()
+    # strict: "5" and 4.0 are rejected like any other non-integer
+    value = ma.auto_field(strict=True, validate=validate.Range(
+        min=min(STARS), max=max(STARS), error="Rating value must be a whole number from 1 to 5"
+    ))
+    user_id = ma.auto_field()
+    recipe_id = ma.auto_field()
+    created_at = ma.auto_field()
@@ -1,5 +1,13 @@
+from marshmallow import validate
+
 from app.extensions import ma
 from app.models.recipe import Recipe
+from app.schemas.validators import MAX_ID
+
+MAX_DESCRIPTION_LENGTH = 5000
+MAX_INGREDIENTS_LENGTH = 10000
+MAX_INSTRUCTIONS_LENGTH = 20000
+MAX_SERVING_SIZE = 1000
 
 class RecipeSchema(ma.SQLAlchemySchema):
     class Meta:
@@ -7,14 +15,15 @@ class RecipeSchema(ma.SQLAlchemySchema):
         load_instance = True
 
     id = ma.auto_field()
-    title = ma.auto_field()
-    description = ma.auto_field()
-    ingredients = ma.auto_field()
-    instructions = ma.auto_field()
-    serving_size = ma.auto_field()
+    title = ma.auto_field(validate=validate.Length(min=1, max=100))
+    description = ma.auto_field(validate=validate.Length(max=MAX_DESCRIPTION_LENGTH))
+    ingredients = ma.auto_field(validate=validate.Length(max=MAX_INGREDIENTS_LENGTH))
+    instructions = ma.auto_field(validate=validate.Length(max=MAX_INSTRUCTIONS_LENGTH))
+    serving_size = ma.auto_field(validate=validate.Range(min=1, max=MAX_SERVING_SIZE))
     image_url = ma.auto_field()
     country = ma.auto_field()
     created_at = ma.auto_field()
     updated_at = ma.auto_field()
     user_id = ma.auto_field()
-    group_id = ma.auto_field()
+    # 0 takes a recipe out of its group
+    group_id = ma.auto_field(validate=validate.Range(min=0, max=MAX_ID))
@@ -1,13 +1,18 @@
+from marshmallow import fields, validate
+
 from app.extensions import ma
 from app.models.user import User
 
+MAX_PASSWORD_LENGTH = 1024
+
 class UserSchema(ma.SQLAlchemySchema):
     class Meta:
         model = User
         load_instance = True
 
     id = ma.auto_field()
-    username = ma.auto_field()
-    email = ma.auto_field()
+    username = ma.auto_field(validate=validate.Length(min=1, max=80))
+    email = ma.auto_field(validate=[validate.Length(max=100), validate.Email()])
     profile_image = ma.auto_field()
     created_at = ma.auto_field()
+    password = fields.String(required=True, load_only=True, validate=validate.Length(min=1, max=MAX_PASSWORD_LENGTH))
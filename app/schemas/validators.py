@@ -0,0 +1,6 @@
+from marshmallow import validate
+
+# Largest value of a Postgres INTEGER column; bigger ids would only fail inside the database
+MAX_ID = 2 ** 31 - 1
+
+RECORD_ID = validate.Range(min=1, max=MAX_ID)
@@ -0,0 +1,218 @@
+from flask import current_app
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.comment import Comment
+from app.models.group import Group
+from app.models.group_member import GroupMember
+from app.models.feed_item import FeedItem
+from app.utils.ranking import created_at_cursor, encode_cursor
+from app.utils.jobs import job_queue
+
+# Within one timestamp recipes sort before comments ('recipe' > 'comment', descending)
+KINDS = ('recipe', 'comment')
+FEED_ITEM_COLUMNS = ['user_id', 'created_at', 'kind', 'item_id', 'group_id', 'recipe_id']
+
+
+def fanout_enabled():
+    return current_app.config.get('MY_FEED_FANOUT', False)
+
+
+def _feed_cursor(cursor):
+    value, kind, last_id = cursor
+    if kind not in KINDS:
+        raise ValueError("Invalid cursor")
+    created_at, last_id = created_at_cursor((value, last_id))
+    return created_at, kind, last_id
+
+
+def _after(created_at_column, id_column, kind, cursor):
+    """Keyset condition for the rows of one kind that sort after the cursor.
+
+    The kind is constant per query branch, so the tie on created_at resolves in Python and
+    each branch keeps a plain range condition its (…, created_at, id) index can use.
+    """
+    created_at, cursor_kind, last_id = cursor
+    if kind < cursor_kind:
+        return created_at_column <= created_at
+    if kind > cursor_kind:
+        return created_at_column < created_at
+    return or_(created_at_column < created_at, and_(created_at_column == created_at, id_column < last_id))
+
+
+def _pull_query(user_id, include_comments, cursor):
+    """Merge the user's groups at read time: group_members joined to recipes (and comments)"""
+    recipes = db.select(
+        db.literal('recipe').label('kind'), Recipe.id.label('item_id'), Recipe.id.label('recipe_id'),
+        Recipe.group_id, Recipe.user_id, Recipe.created_at, Recipe.title,
+        Recipe.description.label('text'), Recipe.image_url
+    ).join(GroupMember, GroupMember.group_id == Recipe.group_id).join(
+        Group, Group.id == GroupMember.group_id
+    ).where(GroupMember.user_id == user_id)
+    if cursor is not None:
+        recipes = recipes.where(_after(Recipe.created_at, Recipe.id, 'recipe', cursor))
+    if not include_comments:
+        return recipes
+
+    comments = db.select(
+        db.literal('comment').label('kind'), Comment.id.label('item_id'), Comment.recipe_id,
+        Recipe.group_id, Comment.user_id, Comment.created_at, Recipe.title,
+        Comment.text.label('text'), Recipe.image_url
+    ).select_from(Comment).join(Recipe, Recipe.id == Comment.recipe_id).join(
+        GroupMember, GroupMember.group_id == Recipe.group_id
+    ).join(Group, Group.id == GroupMember.group_id).where(GroupMember.user_id == user_id)
+    if cursor is not None:
+        comments = comments.where(_after(Comment.created_at, Comment.id, 'comment', cursor))
+    both = db.union_all(recipes, comments).subquery()
+    return db.select(*both.c)
+
+
+def _inbox_query(user_id, include_comments, cursor):
+    """Read the user's fanned-out feed_items rows, one range scan of their inbox index.
+
+    Rows of soft-deleted recipes and groups stay until the purge job; the joins hide them.
+    """
+    query = db.select(
+        FeedItem.kind, FeedItem.item_id, FeedItem.recipe_id, FeedItem.group_id,
+        db.case((FeedItem.kind == 'comment', Comment.user_id), else_=Recipe.user_id).label('user_id'),
+        FeedItem.created_at, Recipe.title,
+        db.case((FeedItem.kind == 'comment', Comment.text), else_=Recipe.description).label('text'),
+        Recipe.image_url
+    ).join(Recipe, Recipe.id == FeedItem.recipe_id).join(Group, Group.id == FeedItem.group_id).outerjoin(
+        Comment, and_(FeedItem.kind == 'comment', Comment.id == FeedItem.item_id)
+    ).where(FeedItem.user_id == user_id)
+    if not include_comments:
+        query = query.where(FeedItem.kind == 'recipe')
+    if cursor is not None:
+        created_at, kind, last_id = cursor
+        query = query.where(or_(
+            FeedItem.created_at < created_at,
+            and_(FeedItem.created_at == created_at, or_(
+                FeedItem.kind < kind, and_(FeedItem.kind == kind, FeedItem.item_id < last_id)
+            ))
+        ))
+    return query
+
+
+def my_feed_page(user_id, limit, cursor=None, include_comments=False):
+    """One page of recent recipes (and comments) across every group the user belongs to.
+
+    Newest first, keyset-paginated on (created_at, kind, id). With MY_FEED_FANOUT the page
+    is read from the user's feed_items inbox instead of merging all of their groups.
+    """
+    if cursor is not None:
+        cursor = _feed_cursor(cursor)
+    query = (_inbox_query if fanout_enabled() else _pull_query)(user_id, include_comments, cursor)
+    columns = query.selected_columns
+    rows = db.session.execute(
+        query.order_by(columns.created_at.desc(), columns.kind.desc(), columns.item_id.desc()).limit(limit + 1)
+    ).all()
+
+    items = [{
+        "type": row.kind,
+        "id": row.item_id,
+        "recipe_id": row.recipe_id,
+        "group_id": row.group_id,
+        "user_id": row.user_id,
+        "created_at": row.created_at,
+        "title": row.title,
+        "text": row.text,
+        "image_url": row.image_url
+    } for row in rows[:limit]]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor([last["created_at"].isoformat(), last["type"], last["id"]])
+    return items, next_cursor
+
+
+# Fan-out on write. Every helper is a no-op unless MY_FEED_FANOUT is on, so pull mode pays
+# nothing. Deliveries that grow with the group's size are background jobs: pass them to
+# queue_fan_out (flush new rows first so their ids exist). Removals run in the caller's
+# transaction. Every job reads membership when it runs and skips items a member already has,
+# so jobs that overlap (a comment and a join backfill), retries and re-runs are harmless.
+
+def _recipe_rows(*conditions):
+    # INSERT ... SELECT is not an ORM select, so soft-deleted rows are filtered out by hand
+    return db.select(
+        GroupMember.user_id, Recipe.created_at, db.literal('recipe'), Recipe.id, Recipe.group_id, Recipe.id
+    ).join(GroupMember, GroupMember.group_id == Recipe.group_id).where(Recipe.deleted_at.is_(None), *conditions)
+
+
+def _comment_rows(*conditions):
+    return db.select(
+        GroupMember.user_id, Comment.created_at, db.literal('comment'), Comment.id, Recipe.group_id, Recipe.id
+    ).select_from(Comment).join(Recipe, Recipe.id == Comment.recipe_id).join(
+        GroupMember, GroupMember.group_id == Recipe.group_id
+    ).where(Recipe.deleted_at.is_(None), *conditions)
+
+
+INSERT_IGNORING_CONFLICTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def _insert(rows):
+    insert = INSERT_IGNORING_CONFLICTS.get(db.session.get_bind().dialect.name)
+    if insert is not None:
+        statement = insert(FeedItem).from_select(FEED_ITEM_COLUMNS, rows).on_conflict_do_nothing()
+    else:
+        # Anti-join on the primary key for databases without ON CONFLICT
+        rows = rows.subquery()
+        statement = db.insert(FeedItem).from_select(FEED_ITEM_COLUMNS, db.select(rows).where(~db.exists().where(
+            FeedItem.user_id == rows.c[0], FeedItem.kind == rows.c[2], FeedItem.item_id == rows.c[3]
+        )))
+    db.session.execute(statement)
+
+
+def queue_fan_out(job, **kwargs):
+    """Queue a fan-out job to run once the caller commits"""
+    if fanout_enabled():
+        job.delay(**kwargs)
+
+
+@job_queue.job('feed.fan_out_recipe')
+def fan_out_recipe(recipe_id):
+    """(Re)deliver a recipe and its comments to its group's members, e.g. after a group change"""
+    if not fanout_enabled():
+        return
+    db.session.execute(db.delete(FeedItem).where(FeedItem.recipe_id == recipe_id))
+    _insert(_recipe_rows(Recipe.id == recipe_id))
+    _insert(_comment_rows(Recipe.id == recipe_id))
+
+
+@job_queue.job('feed.fan_out_comment')
+def fan_out_comment(comment_id):
+    if not fanout_enabled():
+        return
+    _insert(_comment_rows(Comment.id == comment_id))
+
+
+def remove_comment_items(comment_id):
+    if fanout_enabled():
+        db.session.execute(db.delete(FeedItem).where(FeedItem.kind == 'comment', FeedItem.item_id == comment_id))
+
+
+@job_queue.job('feed.member_joined')
+def member_joined(user_id, group_id):
+    """Backfill a new member's inbox with everything already shared in the group"""
+    if not fanout_enabled():
+        return
+    _insert(_recipe_rows(GroupMember.user_id == user_id, Recipe.group_id == group_id))
+    _insert(_comment_rows(GroupMember.user_id == user_id, Recipe.group_id == group_id))
+
+
+def member_left(user_id, group_id):
+    if fanout_enabled():
+        db.session.execute(db.delete(FeedItem).where(FeedItem.group_id == group_id, FeedItem.user_id == user_id))
+
+
+@job_queue.job('feed.inbox')
+def rebuild_inbox():
+    """Refill feed_items from scratch; run before turning MY_FEED_FANOUT on. Returns the row count"""
+    db.session.execute(db.delete(FeedItem))
+    _insert(_recipe_rows(Recipe.group_id.isnot(None)))
+    _insert(_comment_rows(Recipe.group_id.isnot(None)))
+    db.session.commit()
+    return db.session.query(db.func.count()).select_from(FeedItem).scalar()
@@ -0,0 +1,112 @@
+from flask import jsonify
+from app.extensions import db, jwt
+from app.models.user import User
+from app.models.group import Group
+from app.models.group_member import GroupMember
+from app.utils.cache import TTLCache, MISSING
+
+ROLE_ADMIN = 'admin'
+ROLE_MEMBER = 'member'
+
+# Per-process cache of JWT identity -> user snapshot
+user_cache = TTLCache()
+
+# Per-process cache of (user_id, group_id) -> role for members only. Invalidation reaches only
+# the local process, so other workers may let a removed member through for up to the TTL;
+# admin checks and non-members always go to the database.
+membership_cache = TTLCache(maxsize=10000, ttl=30)
+
+
+class CurrentUser:
+    """Read-only snapshot of a user row that is safe to share between requests"""
+
+    __slots__ = ('id', 'username', 'email', 'profile_image', 'created_at')
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.profile_image = user.profile_image
+        self.created_at = user.created_at
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "email": self.email,
+            "profile_image": self.profile_image,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
+
+def load_user_snapshot(user_id):
+    user = db.session.get(User, user_id)
+    return CurrentUser(user) if user else None
+
+
+def invalidate_user(user_id):
+    """Forget the cached snapshot after the user row changes"""
+    user_cache.invalidate(int(user_id))
+
+
+def get_group_role(user_id, group_id, fresh=False):
+    """Return 'admin', 'member' or None for the user's role in a group.
+
+    A cached role may be up to MEMBERSHIP_CACHE_TTL seconds old; fresh=True always reads
+    the database. Only roles of members are cached, so a user who just joined is never
+    turned away.
+    """
+    key = (int(user_id), int(group_id))
+    role = MISSING if fresh else membership_cache.get(key, MISSING)
+    if role is MISSING:
+        # Joined to groups so a soft-deleted group has no members
+        is_admin = db.session.query(GroupMember.is_admin).join(Group).filter(
+            GroupMember.user_id == key[0],
+            GroupMember.group_id == key[1]
+        ).scalar()
+        role = None if is_admin is None else (ROLE_ADMIN if is_admin else ROLE_MEMBER)
+        if role is None:
+            membership_cache.invalidate(key)
+        else:
+            membership_cache.set(key, role)
+    return role
+
+
+def has_group_role(user_id, group_id, role=ROLE_MEMBER):
+    """Authorization check shared by every group-scoped route; admins also count as members.
+
+    Admin checks bypass the cache, so a demoted or removed admin loses their rights at once
+    in every worker.
+    """
+    current_role = get_group_role(user_id, group_id, fresh=role == ROLE_ADMIN)
+    if role == ROLE_ADMIN:
+        return current_role == ROLE_ADMIN
+    return current_role is not None
+
+
+def invalidate_membership(user_id, group_id):
+    """Forget a cached role after a membership row changes"""
+    membership_cache.invalidate((int(user_id), int(group_id)))
+
+
+def invalidate_group_memberships(group_id):
+    """Forget every cached role for a group, e.g. when it is deleted"""
+    group_id = int(group_id)
+    membership_cache.invalidate_where(lambda key: key[1] == group_id)
+
+
+def init_auth(app):
+    user_cache.configure(app.config.get('USER_CACHE_SIZE', 1024), app.config.get('USER_CACHE_TTL', 60))
+    membership_cache.configure(
+        app.config.get('MEMBERSHIP_CACHE_SIZE', 10000),
+        app.config.get('MEMBERSHIP_CACHE_TTL', 30)
+    )
+
+    @jwt.user_lookup_loader
+    def resolve_current_user(jwt_header, jwt_data):
+        user_id = int(jwt_data['sub'])
+        return user_cache.get_or_load(user_id, lambda: load_user_snapshot(user_id))
+
+    @jwt.user_lookup_error_loader
+    def user_not_found(jwt_header, jwt_data):
+        return jsonify({"error": "User not found"}), 404
@@ -1,18 +1,31 @@
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
-from cloudinary.utils import cloudinary_url
 import os
+import threading
 from werkzeug.utils import secure_filename
 import uuid
+from app.utils.metrics import observe_upload
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
-    api_key=os.getenv('CLOUDINARY_API_KEY'),
-    api_secret=os.getenv('CLOUDINARY_API_SECRET'),
-    secure=True
-)
+_cloudinary = None
+_cloudinary_lock = threading.Lock()
+
+def get_cloudinary():
+    """Import and configure the Cloudinary SDK on first use; it pulls in urllib3 and certifi"""
+    global _cloudinary
+    if _cloudinary is None:
+        with _cloudinary_lock:
+            if _cloudinary is None:
+                import cloudinary
+                import cloudinary.uploader
+                import cloudinary.utils
+
+                # Configure Cloudinary
+                cloudinary.config(
+                    cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
+                    api_key=os.getenv('CLOUDINARY_API_KEY'),
+                    api_secret=os.getenv('CLOUDINARY_API_SECRET'),
+                    secure=True
+                )
+                _cloudinary = cloudinary
+    return _cloudinary
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
@@ -53,16 +66,17 @@ def upload_profile_image(file, user_id):
         unique_filename = f"profile_{user_id}_{uuid.uuid4().hex}_{filename}"
         
         # Upload to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            file,
-            public_id=f"recipe_room/profiles/{unique_filename}",
-            folder="recipe_room/profiles",
-            transformation=[
-                {'width': 400, 'height': 400, 'crop': 'fill', 'gravity': 'face'},
-                {'quality': 'auto', 'fetch_format': 'auto'}
-            ],
-            allowed_formats=['jpg', 'png', 'jpeg', 'gif', 'webp']
-        )
+        with observe_upload('upload_profile_image'):
+            upload_result = get_cloudinary().uploader.upload(
+                file,
+                public_id=f"recipe_room/profiles/{unique_filename}",
+                folder="recipe_room/profiles",
+                transformation=[
+                    {'width': 400, 'height': 400, 'crop': 'fill', 'gravity': 'face'},
+                    {'quality': 'auto', 'fetch_format': 'auto'}
+                ],
+                allowed_formats=['jpg', 'png', 'jpeg', 'gif', 'webp']
+            )
         
         return True, {
             'url': upload_result['secure_url'],
@@ -90,16 +104,17 @@ def upload_recipe_image(file, user_id, recipe_title=""):
         unique_filename = f"recipe_{user_id}_{safe_title}_{uuid.uuid4().hex}_{filename}"
         
         # Upload to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            file,
-            public_id=f"recipe_room/recipes/{unique_filename}",
-            folder="recipe_room/recipes",
-            transformation=[
-                {'width': 800, 'height': 600, 'crop': 'fill'},
-                {'quality': 'auto', 'fetch_format': 'auto'}
-            ],
-            allowed_formats=['jpg', 'png', 'jpeg', 'gif', 'webp']
-        )
+        with observe_upload('upload_recipe_image'):
+            upload_result = get_cloudinary().uploader.upload(
+                file,
+                public_id=f"recipe_room/recipes/{unique_filename}",
+                folder="recipe_room/recipes",
+                transformation=[
+                    {'width': 800, 'height': 600, 'crop': 'fill'},
+                    {'quality': 'auto', 'fetch_format': 'auto'}
+                ],
+                allowed_formats=['jpg', 'png', 'jpeg', 'gif', 'webp']
+            )
         
         return True, {
             'url': upload_result['secure_url'],
@@ -116,7 +131,8 @@ def upload_recipe_image(file, user_id, recipe_title=""):
 def delete_image(public_id):
     """Delete an image from Cloudinary"""
     try:
-        result = cloudinary.uploader.destroy(public_id)
+        with observe_upload('delete_image'):
+            result = get_cloudinary().uploader.destroy(public_id)
         if result.get('result') == 'ok':
             return True, "Image deleted successfully"
         else:
@@ -128,9 +144,9 @@ def get_optimized_url(public_id, transformation=None):
    
     try:
         if transformation:
-            url, _ = cloudinary_url(public_id, **transformation)
+            url, _ = get_cloudinary().utils.cloudinary_url(public_id, **transformation)
         else:
-            url, _ = cloudinary_url(public_id, quality="auto", fetch_format="auto")
+            url, _ = get_cloudinary().utils.cloudinary_url(public_id, quality="auto", fetch_format="auto")
         return url
     except Exception as e:
         return None
@@ -0,0 +1,215 @@
+import itertools
+import json
+import logging
+import queue
+import select
+import threading
+import time
+
+from sqlalchemy import text
+
+logger = logging.getLogger('app.events')
+
+PG_NOTIFY_CHANNEL = 'recipe_room_events'
+# NOTIFY payloads must be shorter than 8000 bytes
+PG_NOTIFY_MAX_BYTES = 8000
+# What an oversized event keeps, so clients know what to re-fetch
+EVENT_ID_FIELDS = ('id', 'recipe_id', 'user_id')
+
+
+class Subscription:
+    """A single listener attached to one hub channel"""
+
+    def __init__(self, channel, maxsize):
+        self.channel = channel
+        self._queue = queue.Queue(maxsize=maxsize)
+        # Publishers dispatch concurrently; without it two could drop one message and both put
+        self._lock = threading.Lock()
+
+    def put(self, message):
+        """Queue a message, dropping the oldest one if the client is too slow"""
+        with self._lock:
+            while True:
+                try:
+                    self._queue.put_nowait(message)
+                    return
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def get(self, timeout=None):
+        """Wait for the next message, returns None on timeout"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class MemoryBackend:
+    """Delivers events to subscribers of the current process only"""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, message):
+        self.hub.dispatch(message)
+
+    def start(self):
+        pass
+
+
+def notify_payload(message):
+    """JSON for pg_notify; an event too big for NOTIFY keeps only its ids and is marked `truncated`"""
+    payload = json.dumps(message, default=str, ensure_ascii=False)
+    if len(payload.encode('utf-8')) < PG_NOTIFY_MAX_BYTES:
+        return payload
+    data = {key: value for key, value in message['data'].items() if key in EVENT_ID_FIELDS}
+    return json.dumps(dict(message, data=dict(data, truncated=True)), default=str, ensure_ascii=False)
+
+
+def libpq_url(url):
+    """A SQLAlchemy URL such as postgresql+psycopg2://... in the form psycopg2.connect accepts"""
+    return url.set(drivername='postgresql').render_as_string(hide_password=False)
+
+
+class PostgresBackend:
+    """Fans events out to every worker through Postgres LISTEN/NOTIFY"""
+
+    def __init__(self, hub, engine_getter):
+        self.hub = hub
+        self._engine_getter = engine_getter
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def publish(self, message):
+        # The listener thread of this process delivers the event locally as well
+        with self._engine_getter().begin() as conn:
+            conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": PG_NOTIFY_CHANNEL, "payload": notify_payload(message)}
+            )
+
+    def start(self):
+        # Started lazily so forked workers each get their own listener
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._listen_forever, daemon=True)
+                self._thread.start()
+
+    def _listen_forever(self):
+        backoff = 1
+        while True:
+            try:
+                self._listen()
+                backoff = 1
+            except Exception:
+                logger.exception("Event listener lost its connection, retrying in %ss", backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def _listen(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        conn = psycopg2.connect(libpq_url(self._engine_getter().url))
+        try:
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {PG_NOTIFY_CHANNEL}")
+            while True:
+                if select.select([conn], [], [], 5) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    self.hub.dispatch(json.loads(notify.payload))
+        finally:
+            conn.close()
+
+
+class EventHub:
+    """In-process pub/sub hub feeding the Server-Sent Events endpoints"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.backend = MemoryBackend(self)
+        self.queue_size = 100
+        self.heartbeat_seconds = 15
+
+    def init_app(self, app):
+        from app.extensions import db
+
+        self.queue_size = app.config.get('EVENTS_QUEUE_SIZE', 100)
+        self.heartbeat_seconds = app.config.get('EVENTS_HEARTBEAT_SECONDS', 15)
+
+        if app.config.get('EVENTS_BACKEND') == 'postgres':
+            self.backend = PostgresBackend(self, lambda: db.engine)
+        else:
+            self.backend = MemoryBackend(self)
+
+        app.extensions['event_hub'] = self
+
+    def subscribe(self, channel):
+        self.backend.start()
+        subscription = Subscription(channel, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            listeners = self._subscribers.get(subscription.channel)
+            if listeners:
+                listeners.discard(subscription)
+                if not listeners:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    def publish(self, channel, event, data):
+        """Publish an event; never lets a delivery failure break the caller"""
+        message = {"channel": channel, "event": event, "data": data}
+        try:
+            self.backend.publish(message)
+        except Exception:
+            logger.exception("Could not publish %s on %s", event, channel)
+
+    def dispatch(self, message):
+        """Deliver a message to the subscribers of its channel in this process"""
+        with self._lock:
+            listeners = list(self._subscribers.get(message.get("channel"), ()))
+        if not listeners:
+            return
+        message = dict(message, id=next(self._ids))
+        for subscription in listeners:
+            subscription.put(message)
+
+
+event_hub = EventHub()
+
+
+def recipe_channel(recipe_id):
+    return f"recipe:{recipe_id}"
+
+
+def group_channel(group_id):
+    return f"group:{group_id}"
+
+
+def publish_recipe_event(recipe, event, data):
+    """Publish an event on the recipe's channel and on its group's channel"""
+    event_hub.publish(recipe_channel(recipe.id), event, data)
+    if recipe.group_id:
+        event_hub.publish(group_channel(recipe.group_id), event, data)
+
+
+def format_sse(message):
+    """Format a hub message using the text/event-stream wire format"""
+    payload = json.dumps(message["data"], default=str)
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {payload}\n\n"
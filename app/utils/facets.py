@@ -0,0 +1,235 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import String, literal, union_all
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.rating import Rating
+from app.models.recipe_score import RecipeScore, ScoreWatermark
+from app.models.recipe_facet_count import RecipeFacetCount
+from app.utils.cache import TTLCache
+from app.utils.jobs import job_queue
+
+# Facet counts for a given filter combination; sidebars re-request the same few combinations
+facet_cache = TTLCache(maxsize=2048, ttl=30)
+
+UNRATED = 'unrated'
+NO_GROUP = 'none'
+
+# Whole-star average from the recipe_scores summary, so bucketing never aggregates ratings
+# per request. It trails new ratings by at most FEED_REFRESH_INTERVAL.
+RATING_BUCKET = db.case(
+    (RecipeScore.rating_count > 0, RecipeScore.rating_sum // RecipeScore.rating_count),
+    else_=None
+)
+
+FACETS = {
+    'country': Recipe.country,
+    'serving_size': Recipe.serving_size,
+    'rating_bucket': RATING_BUCKET,
+    'group_id': Recipe.group_id,
+}
+# The same dimensions in the pre-aggregated recipe_facet_counts table
+CUBE_FACETS = {
+    'country': RecipeFacetCount.country,
+    'serving_size': RecipeFacetCount.serving_size,
+    'rating_bucket': RecipeFacetCount.rating_bucket,
+    'group_id': RecipeFacetCount.group_id,
+}
+CUBE_WATERMARK = 'facet_counts'
+_cube_ready = False
+NUMERIC_FACETS = ('serving_size', 'rating_bucket', 'group_id')
+MAX_FILTER_VALUES = 50
+
+
+def _values(raw, cast=str):
+    """`Italy` or `in:Italy,Kenya` -> a list of values"""
+    items = raw[3:].split(',') if raw.startswith('in:') else [raw]
+    items = [item.strip() for item in items if item.strip()]
+    if not items or len(items) > MAX_FILTER_VALUES:
+        raise ValueError(f"Filters take between 1 and {MAX_FILTER_VALUES} values")
+    return [cast(item) for item in items]
+
+
+def _range(raw):
+    """`4`, `2..6`, `4..` or `..4` -> (low, high) with None for an open end"""
+    low, separator, high = raw.partition('..')
+    if not separator:
+        return int(raw), int(raw)
+    return (int(low) if low else None), (int(high) if high else None)
+
+
+def _nullable_int(null_token):
+    def cast(value):
+        return None if value == null_token else int(value)
+    return cast
+
+
+def parse_filters(args):
+    """Read the filter query parameters of GET /api/recipes; raises ValueError on bad input"""
+    filters = {}
+    try:
+        if args.get('country'):
+            filters['country'] = _values(args['country'])
+        if args.get('serving_size'):
+            raw = args['serving_size']
+            filters['serving_size'] = ('in', _values(raw, int)) if raw.startswith('in:') else ('range', _range(raw))
+        if args.get('rating_bucket'):
+            filters['rating_bucket'] = _values(args['rating_bucket'], _nullable_int(UNRATED))
+        if args.get('group_id'):
+            filters['group_id'] = _values(args['group_id'], _nullable_int(NO_GROUP))
+        if args.get('min_rating') and float(args['min_rating']):
+            filters['min_rating'] = float(args['min_rating'])
+    except ValueError as e:
+        raise ValueError(f"Invalid filter value: {e}")
+    return filters
+
+
+def _in_or_null(column, values):
+    present = [value for value in values if value is not None]
+    clauses = [column.in_(present)] if present else []
+    if len(present) != len(values):
+        clauses.append(column.is_(None))
+    return db.or_(*clauses)
+
+
+def filter_clauses(filters, columns=FACETS, skip=None):
+    """WHERE clauses for every filter except `skip` (a facet ignores its own selection)"""
+    clauses = []
+    for name, value in filters.items():
+        if name == skip:
+            continue
+        if name == 'country':
+            clauses.append(columns['country'].in_(value))
+        elif name == 'serving_size':
+            kind, spec = value
+            if kind == 'in':
+                clauses.append(columns['serving_size'].in_(spec))
+            else:
+                low, high = spec
+                if low is not None:
+                    clauses.append(columns['serving_size'] >= low)
+                if high is not None:
+                    clauses.append(columns['serving_size'] <= high)
+        elif name in ('rating_bucket', 'group_id'):
+            clauses.append(_in_or_null(columns[name], value))
+        elif name == 'min_rating':
+            average = db.select(db.func.avg(Rating.value)).where(Rating.recipe_id == Recipe.id).scalar_subquery()
+            clauses.append(average >= value)
+    return clauses
+
+
+def needs_scores(filters, facets=()):
+    return 'rating_bucket' in filters or 'rating_bucket' in facets
+
+
+def filtered_recipes(filters):
+    query = Recipe.query
+    if needs_scores(filters):
+        query = query.outerjoin(RecipeScore, RecipeScore.recipe_id == Recipe.id)
+    return query.filter(*filter_clauses(filters))
+
+
+def _cache_key(filters, facets):
+    frozen = tuple(sorted((name, repr(value)) for name, value in filters.items()))
+    return frozen, tuple(facets)
+
+
+def cube_ready():
+    """Whether recipe_facet_counts has been built at least once"""
+    global _cube_ready
+    if not _cube_ready:
+        _cube_ready = db.session.get(ScoreWatermark, CUBE_WATERMARK) is not None
+    return _cube_ready
+
+
+def _facet_selects(filters, facets):
+    """Grouped count per facet from the pre-aggregated table when it can answer the filters"""
+    use_cube = 'min_rating' not in filters and cube_ready()
+    selects = []
+    for name in facets:
+        if use_cube:
+            column = CUBE_FACETS[name]
+            select = db.select(
+                literal(name).label('facet'),
+                db.cast(column, String).label('value'),
+                db.func.sum(RecipeFacetCount.recipe_count).label('count')
+            ).where(*filter_clauses(filters, CUBE_FACETS, skip=name))
+        else:
+            column = FACETS[name]
+            select = db.select(
+                literal(name).label('facet'),
+                db.cast(column, String).label('value'),
+                db.func.count().label('count')
+            ).select_from(Recipe)
+            if needs_scores(filters, (name,)):
+                select = select.outerjoin(RecipeScore, RecipeScore.recipe_id == Recipe.id)
+            select = select.where(*filter_clauses(filters, skip=name))
+        selects.append(select.group_by(column))
+    return selects
+
+
+def facet_counts(filters, facets):
+    """Counts per value for each requested facet, from one UNION ALL of grouped queries"""
+    key = _cache_key(filters, facets)
+    cached = facet_cache.get(key)
+    if cached is not None:
+        return cached
+
+    counts = {name: [] for name in facets}
+    for facet, value, count in db.session.execute(union_all(*_facet_selects(filters, facets))):
+        if value is not None and facet in NUMERIC_FACETS:
+            value = int(float(value))
+        if value is None and facet == 'rating_bucket':
+            value = UNRATED
+        counts[facet].append({"value": value, "count": int(count)})
+    for values in counts.values():
+        values.sort(key=lambda item: (-item["count"], str(item["value"])))
+
+    facet_cache.set(key, counts)
+    return counts
+
+
+@job_queue.job('feed.facets')
+def rebuild_facet_counts(min_age_seconds=0):
+    """Recount recipes per facet combination with one INSERT ... SELECT.
+
+    The watermark row is locked first so concurrent workers rebuild one at a time, and a
+    worker skips the rebuild when another one finished less than `min_age_seconds` ago.
+    Returns the number of combinations written, or None when skipped.
+    """
+    global _cube_ready
+    watermark = db.session.query(ScoreWatermark).filter_by(source=CUBE_WATERMARK).with_for_update().first()
+    if watermark is None:
+        watermark = ScoreWatermark(source=CUBE_WATERMARK, last_id=0)
+        db.session.add(watermark)
+    elif min_age_seconds and watermark.updated_at and \
+            datetime.utcnow() - watermark.updated_at < timedelta(seconds=min_age_seconds):
+        db.session.rollback()
+        return None
+
+    combinations = db.select(
+        Recipe.country, Recipe.serving_size, Recipe.group_id, RATING_BUCKET, db.func.count()
+    ).select_from(Recipe).outerjoin(
+        RecipeScore, RecipeScore.recipe_id == Recipe.id
+    ).where(
+        # Fed to INSERT ... SELECT, which the soft-delete criteria don't reach
+        Recipe.deleted_at.is_(None)
+    ).group_by(Recipe.country, Recipe.serving_size, Recipe.group_id, RATING_BUCKET)
+
+    db.session.execute(db.delete(RecipeFacetCount))
+    db.session.execute(db.insert(RecipeFacetCount).from_select(
+        ['country', 'serving_size', 'group_id', 'rating_bucket', 'recipe_count'], combinations
+    ))
+    written = db.session.query(db.func.count(RecipeFacetCount.id)).scalar()
+    watermark.last_id = written
+    watermark.updated_at = datetime.utcnow()
+    db.session.commit()
+
+    _cube_ready = True
+    facet_cache.clear()
+    return written
+
+
+def init_facets(app):
+    facet_cache.configure(app.config.get('FACET_CACHE_SIZE', 2048), app.config.get('FACET_CACHE_TTL', 30))
@@ -0,0 +1,165 @@
+import re
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.recipe_ingredient import RecipeIngredient
+from app.utils.jobs import job_queue
+
+# Recipes list one ingredient per line, sometimes comma or semicolon separated
+_SPLIT = re.compile(r"[\n;,•]+|\s+-\s+|\s+and\s+")
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+_QUANTITY = re.compile(r"(\d+([./]\d+)?|[¼½¾⅓⅔⅛])+(\s*-\s*(\d+([./]\d+)?))?")
+_NON_WORD = re.compile(r"[^a-z\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+UNITS = {
+    'cup', 'cups', 'c', 'tablespoon', 'tablespoons', 'tbsp', 'tbs', 'teaspoon', 'teaspoons', 'tsp',
+    'g', 'gram', 'grams', 'kg', 'kilogram', 'kilograms', 'mg', 'ml', 'milliliter', 'milliliters',
+    'l', 'liter', 'liters', 'litre', 'litres', 'oz', 'ounce', 'ounces', 'lb', 'lbs', 'pound', 'pounds',
+    'pint', 'pints', 'quart', 'quarts', 'clove', 'cloves', 'pinch', 'pinches', 'dash', 'slice',
+    'slices', 'can', 'cans', 'tin', 'tins', 'package', 'packages', 'pack', 'bunch', 'bunches',
+    'handful', 'handfuls', 'piece', 'pieces', 'sprig', 'sprigs', 'stick', 'sticks', 'head', 'heads'
+}
+DESCRIPTORS = {
+    'a', 'an', 'of', 'and', 'or', 'to', 'for', 'the', 'about', 'some', 'taste', 'optional', 'plus',
+    'fresh', 'freshly', 'dried', 'chopped', 'finely', 'roughly', 'diced', 'minced', 'sliced', 'thinly',
+    'grated', 'ground', 'crushed', 'peeled', 'large', 'medium', 'small', 'whole', 'raw', 'cooked',
+    'boneless', 'skinless', 'softened', 'melted', 'beaten', 'cubed', 'shredded', 'halved', 'rinsed',
+    'drained', 'frozen', 'ripe', 'extra', 'virgin', 'warm', 'cold', 'hot', 'room', 'temperature',
+    # Cuts and parts, so 'chicken breasts' is found by a search for 'chicken'
+    'breast', 'breasts', 'thigh', 'thighs', 'drumstick', 'drumsticks', 'fillet', 'fillets',
+    'leaf', 'leaves', 'floret', 'florets'
+}
+# Plurals that the suffix rules below would get wrong
+IRREGULAR = {
+    'leaves': 'leaf', 'potatoes': 'potato', 'tomatoes': 'tomato', 'molasses': 'molasses',
+    'hummus': 'hummus', 'couscous': 'couscous', 'asparagus': 'asparagus', 'noodles': 'noodle',
+    'chickpeas': 'chickpea', 'lentils': 'lentil', 'oats': 'oat'
+}
+MAX_QUERY_TERMS = 20
+
+
+def singularize(word):
+    if word in IRREGULAR:
+        return IRREGULAR[word]
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith(('ches', 'shes', 'sses', 'xes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')) and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def normalize_ingredient(text):
+    """Reduce one ingredient line to a canonical name, e.g. '2 cups chopped Tomatoes' -> 'tomato'"""
+    text = _PARENTHETICAL.sub(' ', text.lower())
+    text = _QUANTITY.sub(' ', text)
+    text = _NON_WORD.sub(' ', text)
+    words = [word for word in _WHITESPACE.split(text) if word and word not in UNITS and word not in DESCRIPTORS]
+    if not words:
+        return None
+    # Only the head noun is plural in names like 'green onions' or 'cherry tomatoes'
+    words[-1] = singularize(words[-1])
+    return ' '.join(words)[:100]
+
+
+def extract_ingredients(blob):
+    """Split a free-text ingredients field into a set of normalized ingredient names"""
+    names = set()
+    for line in _SPLIT.split(blob or ''):
+        name = normalize_ingredient(line)
+        if name:
+            names.add(name)
+    return names
+
+
+def parse_ingredient_terms(values):
+    """Normalize `?include=chicken,rice` style query values; repeated parameters are merged"""
+    terms = set()
+    for value in values:
+        for term in value.split(','):
+            name = normalize_ingredient(term)
+            if name:
+                terms.add(name)
+    if len(terms) > MAX_QUERY_TERMS:
+        raise ValueError(f"At most {MAX_QUERY_TERMS} ingredients can be given per filter")
+    return terms
+
+
+def sync_recipe_ingredients(recipe):
+    """Replace a recipe's rows in recipe_ingredients; call before committing the recipe"""
+    if recipe.id is None:
+        db.session.flush()
+    RecipeIngredient.query.filter_by(recipe_id=recipe.id).delete(synchronize_session=False)
+    db.session.add_all(
+        RecipeIngredient(recipe_id=recipe.id, name=name)
+        for name in sorted(extract_ingredients(recipe.ingredients))
+    )
+
+
+@job_queue.job('ingredients.backfill')
+def backfill_ingredients(batch_size=500):
+    """Rebuild recipe_ingredients for every recipe, one committed batch at a time"""
+    last_id, processed = 0, 0
+    while True:
+        batch = db.session.query(Recipe.id, Recipe.ingredients).filter(
+            Recipe.id > last_id
+        ).order_by(Recipe.id).limit(batch_size).all()
+        if not batch:
+            return processed
+
+        recipe_ids = [recipe_id for recipe_id, _ in batch]
+        RecipeIngredient.query.filter(RecipeIngredient.recipe_id.in_(recipe_ids)).delete(synchronize_session=False)
+        rows = [
+            {"recipe_id": recipe_id, "name": name}
+            for recipe_id, blob in batch
+            for name in sorted(extract_ingredients(blob))
+        ]
+        if rows:
+            db.session.execute(db.insert(RecipeIngredient), rows)
+        db.session.commit()
+
+        processed += len(batch)
+        last_id = recipe_ids[-1]
+
+
+def find_by_ingredients(include, exclude=(), max_missing=0, limit=20, offset=0):
+    """Recipes containing at least len(include) - max_missing of `include` and none of `exclude`.
+
+    One grouped pass over the candidate recipes' ingredient rows: candidates come from the
+    (name, recipe_id) index, and each candidate's rows from the primary key.
+    Returns (recipe, matched, total) tuples, best match first.
+    """
+    include, exclude = sorted(include), sorted(exclude)
+    matched = db.func.sum(db.case((RecipeIngredient.name.in_(include), 1), else_=0))
+    total = db.func.count()
+    candidates = db.session.query(RecipeIngredient.recipe_id).filter(RecipeIngredient.name.in_(include))
+
+    stats = db.session.query(
+        RecipeIngredient.recipe_id.label('recipe_id'),
+        matched.label('matched'),
+        total.label('total')
+    ).filter(
+        RecipeIngredient.recipe_id.in_(candidates)
+    ).group_by(RecipeIngredient.recipe_id).having(matched >= max(len(include) - max_missing, 1))
+    if exclude:
+        stats = stats.having(db.func.sum(db.case((RecipeIngredient.name.in_(exclude), 1), else_=0)) == 0)
+    stats = stats.subquery()
+
+    return db.session.query(Recipe, stats.c.matched, stats.c.total).join(
+        stats, stats.c.recipe_id == Recipe.id
+    ).order_by(
+        stats.c.matched.desc(), (stats.c.total - stats.c.matched).asc(), Recipe.id.desc()
+    ).limit(limit).offset(offset).all()
+
+
+def matched_names(recipe_ids, include):
+    """Which of the requested ingredients each recipe contains"""
+    found = {recipe_id: set() for recipe_id in recipe_ids}
+    if recipe_ids:
+        for recipe_id, name in db.session.query(RecipeIngredient.recipe_id, RecipeIngredient.name).filter(
+            RecipeIngredient.recipe_id.in_(recipe_ids), RecipeIngredient.name.in_(sorted(include))
+        ):
+            found[recipe_id].add(name)
+    return found
@@ -0,0 +1,291 @@
+import functools
+import heapq
+import itertools
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.job import Job
+from app.utils.metrics import JOB_DURATION, JOB_QUEUE_DELAY
+
+logger = logging.getLogger('app.jobs')
+
+# Local jobs queued inside a transaction wait here until it commits
+PENDING_LOCAL_JOBS = 'pending_local_jobs'
+
+
+class JobFunction:
+    """A function registered with @job_queue.job: call it to run inline, .delay() to queue it"""
+
+    def __init__(self, queue, name, fn, max_attempts):
+        functools.update_wrapper(self, fn)
+        self.queue = queue
+        self.name = name
+        self.fn = fn
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+    def delay(self, **kwargs):
+        """Queue a run with JSON-serializable keyword arguments; it runs once the caller commits"""
+        self.queue.enqueue(self.name, kwargs, max_attempts=self.max_attempts)
+
+
+class LocalBackend:
+    """Runs jobs on threads of the process that queued them.
+
+    Needs no worker and no table, but jobs still queued when the process exits are lost.
+    """
+
+    def __init__(self, queue, app, threads):
+        self.queue = queue
+        self.app = app
+        self.thread_count = threads
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._threads = []
+
+    def enqueue(self, name, args, max_attempts, run_at):
+        # Like a jobs row, the job belongs to the caller's transaction and runs once it commits
+        session = db.session()
+        if not session.in_transaction():
+            session.begin()
+        session.info.setdefault(PENDING_LOCAL_JOBS, []).append(
+            (run_at, next(self._sequence), name, args, 1, max_attempts)
+        )
+
+    def push(self, entry):
+        self.start()
+        with self._condition:
+            heapq.heappush(self._heap, entry)
+            self._condition.notify()
+
+    def start(self):
+        # Started lazily so forked gunicorn workers each get their own threads
+        with self._condition:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.thread_count:
+                thread = threading.Thread(target=self._work_forever, name='jobs', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _next_due(self):
+        with self._condition:
+            while True:
+                now = datetime.utcnow()
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)
+                timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+                self._condition.wait(timeout)
+
+    def _work_forever(self):
+        while True:
+            run_at, sequence, name, args, attempt, max_attempts = self._next_due()
+            with self.app.app_context():
+                error = self.queue.execute(name, args, attempt, max_attempts, run_at)
+            if error and attempt < max_attempts:
+                retry_at = datetime.utcnow() + timedelta(seconds=self.queue.retry_delay(attempt))
+                self.push((retry_at, sequence, name, args, attempt + 1, max_attempts))
+
+
+class DatabaseBackend:
+    """Stores jobs in the jobs table, where `flask jobs worker` processes claim them.
+
+    A job row is part of the caller's transaction, so a job queued by a request that rolls
+    back never runs, and one queued by a request that commits is never lost.
+    """
+
+    def __init__(self, queue, lease_seconds):
+        self.queue = queue
+        self.lease_seconds = lease_seconds
+
+    def enqueue(self, name, args, max_attempts, run_at):
+        db.session.add(Job(name=name, args=args, max_attempts=max_attempts, run_at=run_at))
+
+    def claim(self, worker_id):
+        """Take the oldest due job, or one whose worker died (its lease ran out); None if idle.
+
+        SKIP LOCKED lets any number of workers poll the table without queueing up behind
+        each other's row locks.
+        """
+        now = datetime.utcnow()
+        due = db.select(Job.id).where(db.or_(
+            db.and_(Job.status == 'queued', Job.run_at <= now),
+            db.and_(Job.status == 'running', Job.locked_at <= now - timedelta(seconds=self.lease_seconds),
+                    Job.attempts < Job.max_attempts)
+        )).order_by(Job.run_at).limit(1).with_for_update(skip_locked=True).scalar_subquery()
+        row = db.session.execute(
+            db.update(Job).where(Job.id == due).values(
+                status='running', locked_at=now, locked_by=worker_id, attempts=Job.attempts + 1
+            ).returning(Job.id, Job.name, Job.args, Job.attempts, Job.max_attempts, Job.run_at),
+            execution_options={'synchronize_session': False}
+        ).first()
+        db.session.commit()
+        return row
+
+    def finish(self, row, worker_id, error):
+        """Delete a finished job, or put a failed one back with backoff until it runs out of attempts"""
+        mine = db.and_(Job.id == row.id, Job.locked_by == worker_id)
+        if error is None:
+            statement = db.delete(Job).where(mine)
+        elif row.attempts < row.max_attempts:
+            retry_at = datetime.utcnow() + timedelta(seconds=self.queue.retry_delay(row.attempts))
+            statement = db.update(Job).where(mine).values(
+                status='queued', run_at=retry_at, locked_at=None, locked_by=None, last_error=error
+            )
+        else:
+            statement = db.update(Job).where(mine).values(status='failed', last_error=error)
+        db.session.execute(statement, execution_options={'synchronize_session': False})
+        db.session.commit()
+
+    def fail_abandoned(self):
+        """Give up on jobs whose worker died during their last attempt"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        db.session.execute(db.update(Job).where(
+            Job.status == 'running', Job.locked_at <= cutoff, Job.attempts >= Job.max_attempts
+        ).values(status='failed', last_error='Worker stopped during the last attempt'),
+            execution_options={'synchronize_session': False})
+        db.session.commit()
+
+    def stats(self):
+        """Job counts by name and status, with the age in seconds of the oldest due job of each"""
+        now = datetime.utcnow()
+        rows = db.session.execute(
+            db.select(Job.name, Job.status, db.func.count(), db.func.min(Job.run_at))
+            .group_by(Job.name, Job.status).order_by(Job.name, Job.status)
+        ).all()
+        return [
+            {"name": name, "status": status, "count": count,
+             "oldest_seconds": max(0, round((now - oldest).total_seconds())) if oldest else None}
+            for name, status, count, oldest in rows
+        ]
+
+
+class JobQueue:
+    """Registry of background jobs and the backend that runs them (JOBS_BACKEND)"""
+
+    def __init__(self):
+        self._jobs = {}
+        self.backend = None
+        self.max_attempts = 5
+        self.backoff_seconds = 10
+        self.backoff_max_seconds = 3600
+
+    def init_app(self, app):
+        self.max_attempts = app.config.get('JOBS_MAX_ATTEMPTS', 5)
+        self.backoff_seconds = app.config.get('JOBS_BACKOFF_SECONDS', 10)
+        self.backoff_max_seconds = app.config.get('JOBS_BACKOFF_MAX_SECONDS', 3600)
+
+        if app.config.get('JOBS_BACKEND') == 'database':
+            self.backend = DatabaseBackend(self, app.config.get('JOBS_LEASE_SECONDS', 600))
+        else:
+            self.backend = LocalBackend(self, app, app.config.get('JOBS_LOCAL_THREADS', 1))
+
+        if not event.contains(Session, 'after_commit', _release_local_jobs):
+            event.listen(Session, 'after_commit', _release_local_jobs)
+            event.listen(Session, 'after_transaction_end', _drop_local_jobs)
+
+        app.extensions['job_queue'] = self
+
+    def job(self, name, max_attempts=None):
+        """Register a function as a job; its keyword arguments must be JSON-serializable"""
+        def register(fn):
+            if name in self._jobs:
+                raise ValueError(f"A job named {name!r} is already registered")
+            self._jobs[name] = JobFunction(self, name, fn, max_attempts)
+            return self._jobs[name]
+        return register
+
+    @property
+    def names(self):
+        return sorted(self._jobs)
+
+    def enqueue(self, name, args=None, max_attempts=None, delay_seconds=0):
+        if name not in self._jobs:
+            raise LookupError(f"No job named {name!r}")
+        run_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
+        self.backend.enqueue(name, args or {}, max_attempts or self.max_attempts, run_at)
+
+    def retry_delay(self, attempts):
+        """Exponential backoff after `attempts` failures, jittered so retries do not arrive together"""
+        delay = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def execute(self, name, args, attempt, max_attempts, due_at):
+        """Run one attempt of a job in the current app context and commit its session.
+
+        Returns None on success, else the formatted error. Records the queue delay and
+        run time, labelled success, retry or failed.
+        """
+        JOB_QUEUE_DELAY.labels(name).observe(max(0.0, (datetime.utcnow() - due_at).total_seconds()))
+        started = time.perf_counter()
+        try:
+            job = self._jobs.get(name)
+            if job is None:
+                raise LookupError(f"No job named {name!r}")
+            job.fn(**args)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            error = traceback.format_exc()
+            outcome = 'retry' if attempt < max_attempts else 'failed'
+            JOB_DURATION.labels(name, outcome).observe(time.perf_counter() - started)
+            if outcome == 'retry':
+                logger.warning("Job %s failed (attempt %s of %s), will retry", name, attempt, max_attempts, exc_info=True)
+            else:
+                logger.error("Job %s failed after %s attempts", name, attempt, exc_info=True)
+            return error
+        JOB_DURATION.labels(name, 'success').observe(time.perf_counter() - started)
+        return None
+
+    def work(self, app, burst=False, poll_interval=1.0, stop=None):
+        """Claim and run jobs from the jobs table until `stop` is set; returns the number run.
+
+        With burst=True, returns as soon as no job is due. Each job runs in a fresh app
+        context, so it gets its own session.
+        """
+        if not isinstance(self.backend, DatabaseBackend):
+            raise RuntimeError("Workers need JOBS_BACKEND=database; local jobs run inside the app process")
+        stop = stop or threading.Event()
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        processed = 0
+        while not stop.is_set():
+            with app.app_context():
+                row = self.backend.claim(worker_id)
+                if row is not None:
+                    error = self.execute(row.name, row.args, row.attempts, row.max_attempts, row.run_at)
+                    self.backend.finish(row, worker_id, error)
+                    processed += 1
+                    continue
+                self.backend.fail_abandoned()
+            if burst:
+                break
+            stop.wait(poll_interval)
+        return processed
+
+
+def _release_local_jobs(session):
+    pending = session.info.pop(PENDING_LOCAL_JOBS, None)
+    if pending and isinstance(job_queue.backend, LocalBackend):
+        for entry in pending:
+            job_queue.backend.push(entry)
+
+
+def _drop_local_jobs(session, transaction):
+    # Runs after after_commit, so anything still pending belonged to a rolled back transaction
+    if transaction.parent is None:
+        session.info.pop(PENDING_LOCAL_JOBS, None)
+
+
+job_queue = JobQueue()
@@ -0,0 +1,184 @@
+import hmac
+import ipaddress
+import os
+import time
+from contextlib import contextmanager
+
+from flask import Response, current_app, g, jsonify, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by blueprint and endpoint',
+    ['blueprint', 'endpoint', 'method'],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_COUNT = Counter(
+    'http_requests_total',
+    'Requests by endpoint and status code',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'Requests currently being handled',
+    ['method'],
+    multiprocess_mode='livesum'
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent in SQL per request',
+    ['blueprint', 'endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'SQL statements executed per request',
+    ['blueprint', 'endpoint'],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100)
+)
+DB_POOL_OPEN = Gauge(
+    'db_pool_connections_open',
+    'Database connections currently open',
+    multiprocess_mode='livesum'
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_connections_checked_out',
+    'Database connections currently in use',
+    multiprocess_mode='livesum'
+)
+UPLOAD_LATENCY = Histogram(
+    'cloudinary_request_duration_seconds',
+    'Cloudinary API call latency',
+    ['operation', 'outcome'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+JOB_DURATION = Histogram(
+    'job_duration_seconds',
+    'Background job run time by outcome (success, retry or failed)',
+    ['job', 'outcome'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+)
+JOB_QUEUE_DELAY = Histogram(
+    'job_queue_delay_seconds',
+    'Time from a job becoming due to a worker starting it',
+    ['job'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+)
+
+
+@contextmanager
+def observe_upload(operation):
+    """Time a Cloudinary call, labelling it as a success or an error"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'success'
+    finally:
+        UPLOAD_LATENCY.labels(operation, outcome).observe(time.perf_counter() - started)
+
+
+def mark_worker_dead(pid):
+    """Drop a dead gunicorn worker's live gauges; call from the `child_exit` server hook"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+
+def _pool_connect(dbapi_connection, connection_record):
+    DB_POOL_OPEN.inc()
+
+
+def _pool_close(dbapi_connection, connection_record):
+    DB_POOL_OPEN.dec()
+
+
+def _pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+
+
+def _pool_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def parse_networks(value):
+    """'10.0.0.0/8, 127.0.0.1' -> networks; a bare address is a single-host network"""
+    return [ipaddress.ip_network(item.strip()) for item in (value or '').split(',') if item.strip()]
+
+
+def scraper_allowed():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode()):
+            return True
+    try:
+        address = ipaddress.ip_address(request.remote_addr or '')
+    except ValueError:
+        return False
+    address = getattr(address, 'ipv4_mapped', None) or address
+    return any(address in network for network in current_app.extensions['metrics_allowed_networks'])
+
+
+def metrics_view():
+    if not scraper_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        # Aggregate the samples every gunicorn worker wrote to the shared directory
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    if not event.contains(Pool, 'connect', _pool_connect):
+        event.listen(Pool, 'connect', _pool_connect)
+        event.listen(Pool, 'close', _pool_close)
+        event.listen(Pool, 'checkout', _pool_checkout)
+        event.listen(Pool, 'checkin', _pool_checkin)
+
+    app.extensions['metrics_allowed_networks'] = parse_networks(app.config.get('METRICS_ALLOWED_IPS'))
+    metrics_path = app.config.get('METRICS_PATH', '/metrics')
+    app.add_url_rule(metrics_path, 'metrics', metrics_view)
+
+    @app.before_request
+    def start_request_timer():
+        if request.endpoint == 'metrics':
+            return
+        g.metrics_started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.labels(request.method).inc()
+
+    @app.after_request
+    def remember_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def record_request(error=None):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+
+        blueprint = request.blueprint or ''
+        endpoint = request.endpoint or 'unmatched'
+        status = g.pop('metrics_status', 500)
+
+        REQUESTS_IN_PROGRESS.labels(request.method).dec()
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - started)
+        REQUEST_COUNT.labels(blueprint, endpoint, request.method, str(status)).inc()
+
+        stats = g.get('query_stats')
+        if stats is not None:
+            REQUEST_DB_TIME.labels(blueprint, endpoint).observe(stats.total_ms / 1000)
+            REQUEST_DB_QUERIES.labels(blueprint, endpoint).observe(stats.count)
@@ -0,0 +1,190 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+import bcrypt as bcrypt_lib
+from werkzeug.security import generate_password_hash, check_password_hash
+
+SUPPORTED_SCHEMES = ('bcrypt', 'argon2', 'pbkdf2')
+BCRYPT_MAX_BYTES = 72
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashing jobs are already waiting for a worker, or one timed out"""
+
+
+def identify_scheme(password_hash):
+    """Return the scheme a stored hash was produced with"""
+    if not password_hash:
+        return None
+    if password_hash.startswith(('$2a$', '$2b$', '$2y$')):
+        return 'bcrypt'
+    if password_hash.startswith('$argon2'):
+        return 'argon2'
+    if password_hash.startswith(('pbkdf2:', 'scrypt:')):
+        return 'pbkdf2'
+    return None
+
+
+def _bcrypt_secret(password):
+    # bcrypt only looks at the first 72 bytes; newer releases raise instead of truncating
+    return password.encode('utf-8')[:BCRYPT_MAX_BYTES]
+
+
+def _argon2_hasher(params):
+    try:
+        from argon2 import PasswordHasher
+    except ImportError:
+        raise RuntimeError("argon2 password hashing requires the 'argon2-cffi' package")
+    return PasswordHasher(
+        time_cost=params['argon2_time_cost'],
+        memory_cost=params['argon2_memory_cost'],
+        parallelism=params['argon2_parallelism']
+    )
+
+
+# Module-level workers so they can be sent to a process pool
+
+def _hash(scheme, password, params):
+    if scheme == 'bcrypt':
+        salt = bcrypt_lib.gensalt(rounds=params['bcrypt_rounds'])
+        return bcrypt_lib.hashpw(_bcrypt_secret(password), salt).decode('utf-8')
+    if scheme == 'argon2':
+        return _argon2_hasher(params).hash(password)
+    return generate_password_hash(password, method='pbkdf2:sha256')
+
+
+def _verify(password_hash, password, params):
+    scheme = identify_scheme(password_hash)
+    if scheme == 'bcrypt':
+        return bcrypt_lib.checkpw(_bcrypt_secret(password), password_hash.encode('utf-8'))
+    if scheme == 'argon2':
+        from argon2.exceptions import VerificationError, InvalidHashError
+        try:
+            return _argon2_hasher(params).verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    if scheme == 'pbkdf2':
+        return check_password_hash(password_hash, password)
+    return False
+
+
+def _gevent_patched():
+    """True inside a gevent worker, where threading has been monkey-patched to greenlets"""
+    if 'gevent' not in sys.modules:
+        return False
+    from gevent import monkey
+    return monkey.is_module_patched('threading')
+
+
+class PasswordHasher:
+    """Configurable password hashing with work offloaded to a bounded pool"""
+
+    def __init__(self):
+        self.scheme = 'bcrypt'
+        self.params = {
+            'bcrypt_rounds': 12,
+            'argon2_time_cost': 3,
+            'argon2_memory_cost': 65536,
+            'argon2_parallelism': 1
+        }
+        self.executor_type = 'thread'
+        self.max_workers = os.cpu_count() or 1
+        self.max_pending = self.max_workers * 4
+        self.timeout = 10
+        self._executor = None
+        self._executor_pid = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        scheme = app.config.get('PASSWORD_HASH_SCHEME', 'bcrypt')
+        if scheme not in SUPPORTED_SCHEMES:
+            raise ValueError(f"Unsupported PASSWORD_HASH_SCHEME '{scheme}'")
+
+        self.scheme = scheme
+        self.params = {
+            'bcrypt_rounds': app.config.get('BCRYPT_LOG_ROUNDS', 12),
+            'argon2_time_cost': app.config.get('ARGON2_TIME_COST', 3),
+            'argon2_memory_cost': app.config.get('ARGON2_MEMORY_COST', 65536),
+            'argon2_parallelism': app.config.get('ARGON2_PARALLELISM', 1)
+        }
+        self.executor_type = app.config.get('PASSWORD_HASH_EXECUTOR', 'thread')
+        self.max_workers = app.config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 1
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING') or self.max_workers * 4
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._shutdown_executor()
+
+        app.extensions['password_hasher'] = self
+
+    def _get_executor(self):
+        # Pools are created lazily, and again after a fork, so each worker owns its own
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                if self.executor_type == 'process':
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                elif self.executor_type == 'thread' and _gevent_patched():
+                    # Patched threads are greenlets; hashing there would block the whole worker
+                    from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+                    self._executor = NativeThreadPoolExecutor(max_workers=self.max_workers)
+                elif self.executor_type == 'thread':
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='password-hasher'
+                    )
+                else:
+                    self._executor = None
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _shutdown_executor(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._executor_pid = None
+
+    def _run(self, fn, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many password hashing requests in progress")
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the hash itself finishes, not just until we stop waiting,
+        # so timed-out jobs still count against max_pending
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy("Password hashing timed out")
+
+    def hash(self, password):
+        return self._run(_hash, self.scheme, password, self.params)
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            return False
+        return self._run(_verify, password_hash, password, self.params)
+
+    def needs_rehash(self, password_hash):
+        """Check whether a stored hash is from another scheme or weaker settings"""
+        scheme = identify_scheme(password_hash)
+        if scheme != self.scheme:
+            return True
+        if scheme == 'bcrypt':
+            return int(password_hash.split('$')[2]) < self.params['bcrypt_rounds']
+        if scheme == 'argon2':
+            return _argon2_hasher(self.params).check_needs_rehash(password_hash)
+        return False
+
+
+password_hasher = PasswordHasher()
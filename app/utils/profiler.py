@@ -0,0 +1,261 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+
+from flask import g, request
+
+# cProfile stats for pstats/snakeviz, collapsed stacks from the gevent sampler for flame graphs
+PROFILE_EXTENSIONS = ('.prof', '.folded')
+
+
+def _greenlet_workers():
+    """True under gevent workers, where every request greenlet shares one OS thread"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+class GreenletSampler:
+    """Wall-clock stack sampling of one greenlet, for gevent workers where cProfile cannot work.
+
+    cProfile hooks the OS thread every request greenlet shares. Instead, a native thread reads
+    the request greenlet's stack every `interval` seconds: its parked frame while it waits on
+    I/O, the thread's live frame while it runs. Time is split by samples, so only this request
+    is measured. The interface mirrors the parts of cProfile.Profile the profiler uses.
+    """
+
+    MAX_DEPTH = 128
+
+    def __init__(self, interval):
+        from gevent import getcurrent, monkey
+
+        self.interval = interval
+        self.samples = 0
+        self.self_counts = Counter()
+        self.cumulative_counts = Counter()
+        self.stacks = Counter()
+        self._greenlet = getcurrent()
+        self._thread_id = monkey.get_original('_thread', 'get_ident')()
+        self._start_thread = monkey.get_original('_thread', 'start_new_thread')
+        self._sleep = monkey.get_original('time', 'sleep')
+        self._lock = monkey.get_original('_thread', 'allocate_lock')()
+        self._stopped = False
+
+    def enable(self):
+        self._start_thread(self._run, ())
+
+    def disable(self):
+        # Taking the lock waits out a sample in progress; the thread exits on its next wake-up
+        with self._lock:
+            self._stopped = True
+
+    def _run(self):
+        while True:
+            self._sleep(self.interval)
+            with self._lock:
+                if self._stopped or self._greenlet.dead:
+                    return
+                frame = self._greenlet.gr_frame
+                if frame is None:
+                    # Running right now, so its frame is the thread's current one
+                    frame = sys._current_frames().get(self._thread_id)
+                if frame is not None:
+                    self._record(frame)
+
+    def _record(self, frame):
+        functions = []
+        while frame is not None and len(functions) < self.MAX_DEPTH:
+            code = frame.f_code
+            functions.append((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        self.samples += 1
+        self.self_counts[functions[0]] += 1
+        self.cumulative_counts.update(set(functions))
+        self.stacks[';'.join(f"{name} ({filename}:{line})" for filename, line, name in reversed(functions))] += 1
+
+    def rows(self, limit):
+        ms = self.interval * 1000
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "samples": samples,
+                "tottime_ms": round(self.self_counts[(filename, line, name)] * ms, 3),
+                "cumtime_ms": round(samples * ms, 3)
+            }
+            for (filename, line, name), samples in self.cumulative_counts.most_common(limit)
+        ]
+
+    def dump_stats(self, path):
+        """Write collapsed stacks ('a;b;c count' lines), the input of flamegraph.pl and speedscope"""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """Opt-in per-request profiling with a buffer of the slowest recent requests.
+
+    Sampled requests run under cProfile, or under a GreenletSampler in gevent workers.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.slow_ms = 500
+        self.directory = None
+        self.max_files = 500
+        self.token = None
+        self.header = 'X-Profile'
+        self.top_functions = 25
+        self.sampling_interval = 0.005
+        self._recent = deque(maxlen=200)
+        self._lock = threading.Lock()
+        # cProfile hooks the whole thread (and on Python 3.12+ the whole process), so
+        # profiles never overlap; a request sampled while another is profiled goes unprofiled
+        self._profile_lock = threading.Lock()
+        self._greenlets = None
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PROFILER_ENABLED', False)
+        self.sample_rate = app.config.get('PROFILER_SAMPLE_RATE', 0.01)
+        self.slow_ms = app.config.get('PROFILER_SLOW_MS', 500)
+        self.directory = app.config.get('PROFILER_DIR', '/tmp/recipe_room_profiles')
+        self.max_files = app.config.get('PROFILER_MAX_FILES', 500)
+        self.token = app.config.get('PROFILER_TOKEN')
+        self.top_functions = app.config.get('PROFILER_TOP_FUNCTIONS', 25)
+        self.sampling_interval = app.config.get('PROFILER_SAMPLING_INTERVAL_MS', 5) / 1000
+        self._recent = deque(maxlen=app.config.get('PROFILER_HISTORY', 200))
+        app.extensions['profiler'] = self
+
+        if not self.enabled:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._start)
+        app.after_request(self._remember_status)
+        app.teardown_request(self._finish)
+
+    def _requested_by_header(self):
+        # Header-triggered profiling needs the shared secret so clients cannot force it
+        value = request.headers.get(self.header)
+        return bool(value and self.token and hmac.compare_digest(value, self.token))
+
+    def mode(self):
+        """'sampling' in gevent workers, where cProfile would mix concurrent requests, else 'cprofile'"""
+        # Checked on the first sampled request: gunicorn patches a gevent worker after fork
+        if self._greenlets is None:
+            self._greenlets = _greenlet_workers()
+        return 'sampling' if self._greenlets else 'cprofile'
+
+    def _start(self):
+        g.profiler_started = time.perf_counter()
+        if self._requested_by_header() or random.random() < self.sample_rate:
+            if self._profile_lock.acquire(blocking=False):
+                if self.mode() == 'sampling':
+                    profile = GreenletSampler(self.sampling_interval)
+                else:
+                    profile = cProfile.Profile()
+                g.profiler = profile
+                profile.enable()
+
+    def _remember_status(self, response):
+        g.profiler_status = response.status_code
+        return response
+
+    def _finish(self, error=None):
+        started = g.pop('profiler_started', None)
+        if started is None:
+            return
+        profile = g.pop('profiler', None)
+        if profile is not None:
+            profile.disable()
+            self._profile_lock.release()
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        if profile is None and duration_ms < self.slow_ms:
+            return
+
+        entry = {
+            "id": uuid.uuid4().hex,
+            "method": request.method,
+            "path": request.full_path.rstrip('?'),
+            "endpoint": request.endpoint,
+            "status": g.pop('profiler_status', 500),
+            "duration_ms": round(duration_ms, 2),
+            "timestamp": time.time(),
+            "pid": os.getpid(),
+            "sql": self._sql_breakdown(),
+            "python": None,
+            "python_profiler": None,
+            "profile_file": None
+        }
+        if profile is not None:
+            entry["python"] = self._python_breakdown(profile)
+            entry["python_profiler"] = 'sampling' if isinstance(profile, GreenletSampler) else 'cprofile'
+            entry["profile_file"] = self._save(profile, entry)
+
+        with self._lock:
+            self._recent.append(entry)
+
+    def _sql_breakdown(self):
+        stats = g.get('query_stats')
+        if stats is None:
+            return None
+        return {
+            "queries": stats.count,
+            "db_ms": round(stats.total_ms, 2),
+            "statements": [
+                {"fingerprint": key, "count": count, "total_ms": round(stats.fingerprint_ms[key], 2)}
+                for key, count in stats.fingerprints.most_common(10)
+            ]
+        }
+
+    def _python_breakdown(self, profile):
+        if isinstance(profile, GreenletSampler):
+            return profile.rows(self.top_functions)
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        stats.sort_stats('cumulative')
+        rows = []
+        for func in stats.fcn_list[:self.top_functions]:
+            calls, primitive_calls, total_time, cumulative_time, _ = stats.stats[func]
+            filename, line, name = func
+            rows.append({
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "tottime_ms": round(total_time * 1000, 3),
+                "cumtime_ms": round(cumulative_time * 1000, 3)
+            })
+        return rows
+
+    def _save(self, profile, entry):
+        extension = 'folded' if isinstance(profile, GreenletSampler) else 'prof'
+        filename = f"{int(entry['timestamp'])}_{entry['endpoint'] or 'unmatched'}_{entry['id'][:8]}.{extension}"
+        profile.dump_stats(os.path.join(self.directory, filename))
+        self._rotate()
+        return filename
+
+    def _rotate(self):
+        files = sorted(f for f in os.listdir(self.directory) if f.endswith(PROFILE_EXTENSIONS))
+        for stale in files[:-self.max_files]:
+            try:
+                os.remove(os.path.join(self.directory, stale))
+            except OSError:
+                pass
+
+    def slowest(self, limit=10):
+        with self._lock:
+            entries = list(self._recent)
+        return sorted(entries, key=lambda entry: entry["duration_ms"], reverse=True)[:limit]
+
+
+profiler = RequestProfiler()
@@ -0,0 +1,155 @@
+import json
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.group import Group
+from app.models.group_member import GroupMember
+from app.models.rating import Rating
+from app.models.comment import Comment
+from app.models.bookmark import Bookmark
+from app.models.related_recipe import RelatedRecipe
+from app.models.feed_item import FeedItem
+from app.utils.cloudinary_upload import delete_image
+from app.utils.jobs import job_queue
+
+logger = logging.getLogger('app.purge')
+
+# Only images this app uploaded (see upload_recipe_image) are ours to delete
+_CLOUDINARY_PUBLIC_ID = re.compile(r'/image/upload/(?:v\d+/)?(recipe_room/[^?#]+?)(?:\.\w+)?(?:[?#].*)?$')
+
+# Foreign keys cascade every other child row with the recipe. These can number in the
+# millions, so they go first, batch_size rows per statement, to keep each lock short
+BATCHED_RECIPE_CHILDREN = (Rating, Comment, Bookmark)
+
+INCLUDE_DELETED = {'include_deleted': True}
+
+
+def public_id_from_url(image_url):
+    match = _CLOUDINARY_PUBLIC_ID.search(image_url or '')
+    return match.group(1) if match else None
+
+
+@job_queue.job('purge.delete_image')
+def delete_recipe_image(public_id):
+    """Delete a purged recipe's Cloudinary image; raises so the job is retried"""
+    ok, message = delete_image(public_id)
+    if not ok and 'not found' not in message:
+        raise RuntimeError(f"Could not delete image {public_id}: {message}")
+
+
+def _in_batches(statement, model, condition, batch_size):
+    """Run a DELETE or UPDATE of `model` over the rows matching `condition`, batch_size at a time.
+
+    Commits between full batches, so a recipe with a million ratings never holds its locks for
+    one huge statement; a short last batch is left to the caller's transaction.
+    """
+    while True:
+        ids = db.select(model.id).where(condition).limit(batch_size).scalar_subquery()
+        if db.session.execute(statement.where(model.id.in_(ids))).rowcount < batch_size:
+            return
+        db.session.commit()
+
+
+def _claim(model, columns, cutoff, batch_size):
+    """Lock a batch of soft-deleted rows older than cutoff; SKIP LOCKED keeps workers apart.
+
+    A commit between child batches releases the lock, so another worker may pick the same
+    rows up again; every step is idempotent, so that only repeats work.
+    """
+    return db.session.execute(
+        db.select(model.id, *columns).where(
+            model.deleted_at.isnot(None), model.deleted_at <= cutoff
+        ).order_by(model.id).limit(batch_size).with_for_update(skip_locked=True),
+        execution_options=INCLUDE_DELETED
+    ).all()
+
+
+def purge_recipes(cutoff, batch_size):
+    """Hard-delete soft-deleted recipes and their children, queue deleting their images; returns the count"""
+    purged = 0
+    while True:
+        rows = _claim(Recipe, (Recipe.image_url,), cutoff, batch_size)
+        if not rows:
+            return purged
+        recipe_ids = [row.id for row in rows]
+
+        for model in BATCHED_RECIPE_CHILDREN:
+            _in_batches(db.delete(model), model, model.recipe_id.in_(recipe_ids), batch_size)
+        # No foreign keys on these, they are rebuilt from the recipes
+        db.session.execute(db.delete(FeedItem).where(FeedItem.recipe_id.in_(recipe_ids)))
+        db.session.execute(db.delete(RelatedRecipe).where(db.or_(
+            RelatedRecipe.recipe_id.in_(recipe_ids), RelatedRecipe.related_recipe_id.in_(recipe_ids)
+        )))
+        db.session.execute(db.delete(Recipe).where(Recipe.id.in_(recipe_ids)))
+        # Queued in the same transaction, so images go only once their recipes are gone
+        for row in rows:
+            public_id = public_id_from_url(row.image_url)
+            if public_id:
+                delete_recipe_image.delay(public_id=public_id)
+        db.session.commit()
+        purged += len(recipe_ids)
+
+
+def purge_groups(cutoff, batch_size):
+    """Hard-delete soft-deleted groups; their recipes stay, no longer shared with a group"""
+    purged = 0
+    while True:
+        rows = _claim(Group, (), cutoff, batch_size)
+        if not rows:
+            return purged
+        group_ids = [row.id for row in rows]
+
+        _in_batches(db.delete(GroupMember), GroupMember, GroupMember.group_id.in_(group_ids), batch_size)
+        _in_batches(db.update(Recipe).values(group_id=None), Recipe, Recipe.group_id.in_(group_ids), batch_size)
+        db.session.execute(db.delete(FeedItem).where(FeedItem.group_id.in_(group_ids)))
+        db.session.execute(db.delete(Group).where(Group.id.in_(group_ids)))
+        db.session.commit()
+        purged += len(group_ids)
+
+
+@job_queue.job('purge.run')
+def purge_deleted(grace_seconds=0, batch_size=1000):
+    """Purge recipes and groups soft-deleted more than grace_seconds ago"""
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    return {
+        "recipes_purged": purge_recipes(cutoff, batch_size),
+        "groups_purged": purge_groups(cutoff, batch_size)
+    }
+
+
+def _purge_loop(app, interval):
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                stats = purge_deleted(app.config.get('PURGE_GRACE_SECONDS', 0), app.config.get('PURGE_BATCH_SIZE', 1000))
+                if stats["recipes_purged"] or stats["groups_purged"]:
+                    logger.info(json.dumps({"event": "purge", **stats}))
+            except Exception:
+                db.session.rollback()
+                logger.exception("Purge of soft-deleted rows failed")
+
+
+def init_purge(app):
+    """Purge soft-deleted rows every PURGE_INTERVAL seconds in the background of each worker"""
+    interval = app.config.get('PURGE_INTERVAL', 0)
+    if not interval:
+        return
+
+    state = {'started': False}
+    lock = threading.Lock()
+
+    # Started on the first request, like the feed refresher, so CLI commands never spawn it
+    @app.before_request
+    def start_purger():
+        if state['started']:
+            return
+        with lock:
+            if not state['started']:
+                threading.Thread(target=_purge_loop, args=(app, interval), name='purge', daemon=True).start()
+                state['started'] = True
@@ -0,0 +1,142 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request, jsonify
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('app.queries')
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_IN_LIST = re.compile(r"\(\s*" + _PLACEHOLDER + r"(?:\s*,\s*" + _PLACEHOLDER + r")+\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    """Normalize a SQL statement so repeats with different parameters compare equal"""
+    statement = _IN_LIST.sub("(?)", statement)
+    statement = _NUMBER.sub("?", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class QueryStats:
+    """SQL statements executed while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.fingerprints = Counter()
+        self.fingerprint_ms = Counter()
+
+    def record(self, statement, duration_ms):
+        key = fingerprint(statement)
+        self.count += 1
+        self.total_ms += duration_ms
+        self.fingerprints[key] += 1
+        self.fingerprint_ms[key] += duration_ms
+
+    def repeated(self, threshold):
+        """Fingerprints executed at least `threshold` times, the usual N+1 signature"""
+        return [(key, count) for key, count in self.fingerprints.most_common() if count >= threshold]
+
+
+def current_stats():
+    if has_request_context():
+        return g.get('query_stats')
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    stats = current_stats()
+    if stats is not None:
+        stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time so the
+    # stack stays aligned for the connection's next statement
+    conn = exception_context.connection
+    if conn is not None and exception_context.execution_context is not None:
+        starts = conn.info.get('query_start_time')
+        if starts:
+            starts.pop()
+
+
+def query_budget_for(app, endpoint):
+    view = app.view_functions.get(endpoint)
+    budget = getattr(view, 'query_budget', None)
+    if budget is None:
+        budget = app.config.get('QUERY_BUDGETS', {}).get(endpoint, app.config.get('QUERY_BUDGET_DEFAULT'))
+    return budget
+
+
+def init_query_stats(app):
+    if not app.config.get('QUERY_STATS_ENABLED', True):
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 5)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get('query_stats')
+        if stats is None:
+            return response
+
+        repeated = stats.repeated(threshold)
+        budget = query_budget_for(app, request.endpoint)
+        over_budget = budget is not None and stats.count > budget
+
+        # Off by default, the headers would show DB timings to anonymous clients
+        if app.config.get('QUERY_STATS_HEADERS', False):
+            response.headers.add('Server-Timing', f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries"')
+            response.headers['X-Query-Count'] = str(stats.count)
+            response.headers['X-Query-Time-Ms'] = f"{stats.total_ms:.2f}"
+            if repeated:
+                response.headers['X-Query-Repeated'] = str(sum(count for _, count in repeated))
+
+        record = {
+            "event": "request_queries",
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "queries": stats.count,
+            "db_ms": round(stats.total_ms, 2),
+            "budget": budget,
+            "repeated": [{"fingerprint": key, "count": count} for key, count in repeated]
+        }
+        if over_budget or repeated:
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+
+        # Strict mode (tests, CI) turns a blown budget into a hard failure
+        if over_budget and app.config.get('QUERY_BUDGET_STRICT'):
+            failure = jsonify({
+                "error": f"Query budget exceeded: {request.endpoint} ran {stats.count} queries, budget is {budget}",
+                "repeated": record["repeated"]
+            })
+            failure.status_code = 500
+            for header in ('Server-Timing', 'X-Query-Count', 'X-Query-Time-Ms', 'X-Query-Repeated'):
+                if header in response.headers:
+                    failure.headers[header] = response.headers[header]
+            return failure
+        return response
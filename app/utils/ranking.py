@@ -0,0 +1,332 @@
+import base64
+import itertools
+import json
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.rating import Rating
+from app.models.comment import Comment
+from app.models.bookmark import Bookmark
+from app.models.group import Group
+from app.models.group_member import GroupMember
+from app.models.recipe_score import RecipeScore, DirtyRecipeScore
+from app.utils.jobs import job_queue
+
+logger = logging.getLogger('app.ranking')
+
+FEED_SORTS = ('trending', 'top', 'new')
+
+# Trending scores are stored as log2(sum(weight * 2 ** (age_from_epoch / half_life))). Older
+# activity is worth exponentially less than newer activity, but the stored values never need
+# to be decayed, so a recipe only has to be rescored when something new happens to it.
+EPOCH = datetime(2024, 1, 1)
+
+# Activity folded into recipe_scores; adding, changing or deleting one marks its recipe dirty
+ACTIVITY_MODELS = (Rating, Comment, Bookmark)
+CHUNK_SIZE = 500
+
+# Advisory lock key shared by every worker, so only one rescores at a time
+REFRESH_LOCK_KEY = 5_032_037
+
+
+def log2_add(a, b):
+    """log2(2**a + 2**b) without overflowing"""
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def decayed_weight(weight, created_at, half_life_hours):
+    """One activity's contribution to the trending score, in log2 space"""
+    created_at = created_at or datetime.utcnow()
+    return math.log2(weight) + (created_at - EPOCH).total_seconds() / (half_life_hours * 3600)
+
+
+def bayesian_average(rating_sum, rating_count, prior_mean, prior_weight):
+    """Average rating pulled towards prior_mean until the recipe has enough ratings"""
+    return (rating_sum + prior_mean * prior_weight) / (rating_count + prior_weight)
+
+
+def _mark_dirty_recipes(session, flush_context):
+    """Queue the recipes of flushed activity for rescoring, in the flushing transaction"""
+    recipe_ids = {instance.id for instance in session.new if isinstance(instance, Recipe)}
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, ACTIVITY_MODELS) and instance.recipe_id is not None:
+            recipe_ids.add(instance.recipe_id)
+    if recipe_ids:
+        session.connection().execute(
+            DirtyRecipeScore.__table__.insert(), [{'recipe_id': recipe_id} for recipe_id in recipe_ids]
+        )
+
+
+def _dirty_recipe_ids(full):
+    """Recipe ids to rescore, and the dirty_recipe_scores rows that listed them.
+
+    Only the rows read here are deleted afterwards, so a mark committed meanwhile, even with
+    a lower id, waits for the next refresh instead of being lost.
+    """
+    marks = db.session.query(DirtyRecipeScore.id, DirtyRecipeScore.recipe_id).all()
+    if full:
+        dirty = {recipe_id for recipe_id, in db.session.query(Recipe.id)}
+    else:
+        dirty = {recipe_id for _, recipe_id in marks}
+    return dirty, [mark_id for mark_id, _ in marks]
+
+
+def _refresh_lock(wait):
+    """Hold the refresh lock until the transaction ends; False if wait=False and it is taken.
+
+    Only Postgres has advisory locks; elsewhere the single writer serializes refreshes.
+    """
+    if db.session.get_bind().dialect.name != 'postgresql':
+        return True
+    if wait:
+        db.session.execute(db.text('SELECT pg_advisory_xact_lock(:key)'), {'key': REFRESH_LOCK_KEY})
+        return True
+    return db.session.execute(db.text('SELECT pg_try_advisory_xact_lock(:key)'), {'key': REFRESH_LOCK_KEY}).scalar()
+
+
+def _score_chunk(recipe_ids, config):
+    half_life = config['FEED_HALF_LIFE_HOURS']
+    weights = {
+        'recipe': config['FEED_RECIPE_WEIGHT'],
+        'rating': config['FEED_RATING_WEIGHT'],
+        'comment': config['FEED_COMMENT_WEIGHT'],
+        'bookmark': config['FEED_BOOKMARK_WEIGHT']
+    }
+    totals = {}
+
+    for recipe_id, created_at in db.session.query(Recipe.id, Recipe.created_at).filter(Recipe.id.in_(recipe_ids)):
+        totals[recipe_id] = {
+            'rating_count': 0, 'rating_sum': 0, 'comment_count': 0, 'bookmark_count': 0,
+            'trending': decayed_weight(weights['recipe'], created_at, half_life)
+        }
+
+    for recipe_id, value, created_at in db.session.query(
+        Rating.recipe_id, Rating.value, Rating.created_at
+    ).filter(Rating.recipe_id.in_(recipe_ids)):
+        if recipe_id in totals:
+            row = totals[recipe_id]
+            row['rating_count'] += 1
+            row['rating_sum'] += value
+            # A 5-star rating counts fully, a 1-star rating a fifth as much
+            row['trending'] = log2_add(row['trending'], decayed_weight(weights['rating'] * value / 5, created_at, half_life))
+
+    for key, model in (('comment', Comment), ('bookmark', Bookmark)):
+        for recipe_id, created_at in db.session.query(model.recipe_id, model.created_at).filter(model.recipe_id.in_(recipe_ids)):
+            if recipe_id in totals:
+                row = totals[recipe_id]
+                row[f'{key}_count'] += 1
+                row['trending'] = log2_add(row['trending'], decayed_weight(weights[key], created_at, half_life))
+
+    existing = {score.recipe_id: score for score in RecipeScore.query.filter(RecipeScore.recipe_id.in_(recipe_ids))}
+    for recipe_id, row in totals.items():
+        score = existing.get(recipe_id)
+        if score is None:
+            score = RecipeScore(recipe_id=recipe_id)
+            db.session.add(score)
+        score.rating_count = row['rating_count']
+        score.rating_sum = row['rating_sum']
+        score.comment_count = row['comment_count']
+        score.bookmark_count = row['bookmark_count']
+        score.top_score = bayesian_average(
+            row['rating_sum'], row['rating_count'],
+            config['FEED_TOP_PRIOR_MEAN'], config['FEED_TOP_PRIOR_WEIGHT']
+        )
+        score.trending_score = row['trending']
+        score.refreshed_at = datetime.utcnow()
+    return len(totals)
+
+
+@job_queue.job('feed.refresh')
+def refresh_scores(full=False, wait=True):
+    """Rescore recipes whose ratings, comments or bookmarks were added, changed or deleted.
+
+    Rescoring recomputes a recipe from all of its activity, so running this twice is
+    harmless. Refreshes take turns on a lock; with wait=False this returns at once, marked
+    skipped, if another worker is already refreshing.
+    """
+    if not _refresh_lock(wait):
+        db.session.rollback()
+        return {"recipes_rescored": 0, "full": full, "skipped": True}
+
+    config = current_app.config
+    dirty, mark_ids = _dirty_recipe_ids(full)
+    dirty = sorted(dirty)
+
+    rescored = 0
+    for start in range(0, len(dirty), CHUNK_SIZE):
+        rescored += _score_chunk(dirty[start:start + CHUNK_SIZE], config)
+
+    for start in range(0, len(mark_ids), CHUNK_SIZE):
+        db.session.execute(db.delete(DirtyRecipeScore).where(
+            DirtyRecipeScore.id.in_(mark_ids[start:start + CHUNK_SIZE])
+        ), execution_options={'synchronize_session': False})
+
+    db.session.commit()
+    return {"recipes_rescored": rescored, "full": full}
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size=2):
+    """Decode a cursor from a previous page; raises ValueError if it was tampered with.
+
+    Cursors are lists of `size` sort key values ending with an integer id tiebreak.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size or not isinstance(values[-1], int):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def created_at_cursor(cursor):
+    value, last_id = cursor
+    try:
+        created_at = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    # SQLite keeps CURRENT_TIMESTAMP defaults as 'YYYY-MM-DD HH:MM:SS' text, which never
+    # compares equal to a bound datetime (rendered with microseconds); bind the same text
+    if created_at.microsecond == 0 and db.session.get_bind().dialect.name == 'sqlite':
+        created_at = db.literal(created_at.strftime('%Y-%m-%d %H:%M:%S'), db.String)
+    return created_at, last_id
+
+
+def feed_page(sort, limit, cursor=None):
+    """One page of (recipe, score) pairs in feed order and the cursor for the next page"""
+    query = db.session.query(Recipe, RecipeScore)
+    if sort == 'new':
+        query = query.outerjoin(RecipeScore, RecipeScore.recipe_id == Recipe.id)
+        key, tiebreak = Recipe.created_at, Recipe.id
+    else:
+        query = query.join(RecipeScore, RecipeScore.recipe_id == Recipe.id)
+        key = RecipeScore.trending_score if sort == 'trending' else RecipeScore.top_score
+        tiebreak = RecipeScore.recipe_id
+
+    if cursor is not None:
+        value, last_id = cursor
+        if sort == 'new':
+            value, last_id = created_at_cursor(cursor)
+        elif not isinstance(value, (int, float)):
+            raise ValueError("Invalid cursor")
+        query = query.filter(or_(key < value, and_(key == value, tiebreak < last_id)))
+
+    rows = query.order_by(key.desc(), tiebreak.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        recipe, score = rows[-1]
+        if sort == 'new':
+            last_value = recipe.created_at.isoformat()
+        else:
+            last_value = score.trending_score if sort == 'trending' else score.top_score
+        next_cursor = encode_cursor([last_value, recipe.id])
+    return rows, next_cursor
+
+
+def group_feed_page(user_id, group_id, limit, cursor=None):
+    """One page of recipe cards shared in a group, newest first, if user_id is a member.
+
+    Authorizes and fetches in one round trip: the user's membership row is outer-joined to
+    the group's recipes, so a non-member gets no rows at all and a member of an empty group
+    gets a single row without a recipe. Returns (None, None) for non-members.
+    """
+    recipe_filter = [Recipe.group_id == GroupMember.group_id]
+    if cursor is not None:
+        created_at, last_id = created_at_cursor(cursor)
+        recipe_filter.append(or_(
+            Recipe.created_at < created_at, and_(Recipe.created_at == created_at, Recipe.id < last_id)
+        ))
+
+    rows = db.session.query(
+        GroupMember.id.label('membership_id'), Recipe.id, Recipe.title, Recipe.description, Recipe.country,
+        Recipe.serving_size, Recipe.image_url, Recipe.created_at, Recipe.user_id
+    ).select_from(GroupMember).join(
+        Group, Group.id == GroupMember.group_id
+    ).outerjoin(
+        Recipe, and_(*recipe_filter)
+    ).filter(
+        GroupMember.group_id == group_id, GroupMember.user_id == user_id
+    ).order_by(Recipe.created_at.desc(), Recipe.id.desc()).limit(limit + 1).all()
+
+    if not rows:
+        return None, None
+    cards = [{
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "country": row.country,
+        "serving_size": row.serving_size,
+        "image_url": row.image_url,
+        "created_at": row.created_at,
+        "user_id": row.user_id
+    } for row in rows if row.id is not None]
+
+    next_cursor = None
+    if len(cards) > limit:
+        cards = cards[:limit]
+        next_cursor = encode_cursor([cards[-1]["created_at"].isoformat(), cards[-1]["id"]])
+    return cards, next_cursor
+
+
+def _refresh_loop(app, interval):
+    from app.utils.facets import rebuild_facet_counts
+
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                stats = refresh_scores(wait=False)
+                if stats.get("skipped"):
+                    continue
+                # Facet rating buckets come from recipe_scores, so recount after rescoring
+                stats["facet_combinations"] = rebuild_facet_counts(min_age_seconds=interval / 2)
+                logger.info(json.dumps({"event": "feed_refresh", **stats}))
+            except Exception:
+                db.session.rollback()
+                logger.exception("Feed score refresh failed")
+
+
+def init_ranking(app):
+    """Track recipes to rescore, and refresh them every FEED_REFRESH_INTERVAL seconds.
+
+    Every worker runs a refresher, but they take turns on the refresh lock, so each batch of
+    changes is rescored by one of them.
+    """
+    if not event.contains(Session, 'after_flush', _mark_dirty_recipes):
+        event.listen(Session, 'after_flush', _mark_dirty_recipes)
+
+    interval = app.config.get('FEED_REFRESH_INTERVAL', 0)
+    if not interval:
+        return
+
+    state = {'started': False}
+    lock = threading.Lock()
+
+    # Started on the first request so CLI commands and migrations never spawn the thread,
+    # and so each forked gunicorn worker gets its own
+    @app.before_request
+    def start_feed_refresher():
+        if state['started']:
+            return
+        with lock:
+            if not state['started']:
+                threading.Thread(target=_refresh_loop, args=(app, interval), name='feed-refresh', daemon=True).start()
+                state['started'] = True
@@ -0,0 +1,125 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400
+}
+
+
+def parse_limit(limit):
+    """Parse a limit like '10/minute' into (capacity, refill tokens per second)"""
+    count, _, period = limit.partition('/')
+    period = period.strip().rstrip('s')
+    if period not in PERIODS:
+        raise ValueError(f"Invalid rate limit '{limit}'")
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period]
+
+
+def take_token(tokens, updated_at, now, capacity, rate, cost=1):
+    """Refill a bucket and try to take tokens from it.
+
+    Returns (tokens left, seconds until allowed); 0 seconds means the call is allowed.
+    """
+    tokens = min(capacity, tokens + (now - updated_at) * rate)
+    if tokens >= cost:
+        return tokens - cost, 0
+    return tokens, (cost - tokens) / rate
+
+
+class MemoryBackend:
+    """Per-process token buckets, also the local stand-in for the shared backend"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, capacity, rate, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens, retry_after = take_token(tokens, updated_at, now, capacity, rate, cost)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBackend:
+    """Token buckets shared by every worker, updated atomically in Redis"""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local retry_after = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+    else
+        retry_after = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(retry_after)
+    """
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("A redis:// RATELIMIT_STORAGE_URL requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def hit(self, key, capacity, rate, cost=1):
+        retry_after = self._script(keys=[f"ratelimit:{key}"], args=[capacity, rate, time.time(), cost])
+        return float(retry_after)
+
+    def reset(self):
+        for key in self._client.scan_iter("ratelimit:*"):
+            self._client.delete(key)
+
+
+class RateLimiter:
+    """Token bucket rate limiter with a pluggable storage backend"""
+
+    def __init__(self):
+        self.enabled = True
+        self.backend = MemoryBackend()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        storage_url = app.config.get('RATELIMIT_STORAGE_URL', 'memory://')
+        if storage_url.startswith('redis'):
+            self.backend = RedisBackend(storage_url)
+        else:
+            self.backend = MemoryBackend(app.config.get('RATELIMIT_MAX_KEYS', 100000))
+        app.extensions['rate_limiter'] = self
+
+    def hit(self, scope, identity, config_key):
+        """Consume one token; returns the whole seconds to wait, or 0 when allowed"""
+        if not self.enabled:
+            return 0
+        capacity, rate = parse_limit(current_app.config[config_key])
+        retry_after = self.backend.hit(f"{scope}:{identity}", capacity, rate)
+        return math.ceil(retry_after)
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,127 @@
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.rating import Rating
+from app.models.rating_summary import RatingSummary
+from app.utils.ranking import bayesian_average
+
+STARS = range(1, 6)
+
+
+def valid_rating(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value in STARS
+
+
+def record_rating(recipe_id, value, delta=1):
+    """Add (delta=1) or remove (delta=-1) one rating in the recipe's rollup row.
+
+    Runs in the caller's transaction so the rollup commits or rolls back with the rating.
+    The increments happen in SQL, so concurrent raters never overwrite each other's counts.
+    """
+    star_column = getattr(RatingSummary, f'stars_{value}')
+    increment = db.update(RatingSummary).where(RatingSummary.recipe_id == recipe_id).values({
+        star_column: star_column + delta,
+        RatingSummary.rating_count: RatingSummary.rating_count + delta,
+        RatingSummary.rating_sum: RatingSummary.rating_sum + delta * value,
+        RatingSummary.updated_at: db.func.current_timestamp()
+    })
+    if db.session.execute(increment).rowcount:
+        return
+
+    # First rating of this recipe: create the row, or lose the race and increment the winner's
+    try:
+        with db.session.begin_nested():
+            summary = RatingSummary(recipe_id=recipe_id, rating_count=0, rating_sum=0,
+                                    **{f'stars_{stars}': 0 for stars in STARS})
+            setattr(summary, f'stars_{value}', max(delta, 0))
+            summary.rating_count = max(delta, 0)
+            summary.rating_sum = max(delta, 0) * value
+            db.session.add(summary)
+    except IntegrityError:
+        db.session.execute(increment)
+
+
+def distribution(recipe_id, summary):
+    """Histogram, count, average and Bayesian score for a recipe's rollup row (None if unrated)"""
+    config = current_app.config
+    count = summary.rating_count if summary else 0
+    total = summary.rating_sum if summary else 0
+    return {
+        "recipe_id": recipe_id,
+        "rating_count": count,
+        "average_rating": round(total / count, 2) if count else None,
+        # Pulled towards FEED_TOP_PRIOR_MEAN like the `top` feed, so few ratings can't dominate
+        "bayesian_score": round(bayesian_average(
+            total, count, config['FEED_TOP_PRIOR_MEAN'], config['FEED_TOP_PRIOR_WEIGHT']
+        ), 4),
+        "histogram": summary.histogram() if summary else {str(stars): 0 for stars in STARS}
+    }
+
+
+def check_rating_summaries(batch_size=1000, fix=False):
+    """Recount ratings for every recipe, one batch of recipe ids at a time, against the rollups.
+
+    Returns the recipe ids whose rollup was wrong; with fix=True they are rewritten.
+    """
+    mismatched = []
+    last_id = 0
+    while True:
+        recipe_ids = [recipe_id for recipe_id, in db.session.query(Recipe.id).filter(
+            Recipe.id > last_id
+        ).order_by(Recipe.id).limit(batch_size)]
+        if not recipe_ids:
+            return mismatched
+        last_id = recipe_ids[-1]
+
+        actual = {}
+        for recipe_id, value, count in db.session.query(
+            Rating.recipe_id, Rating.value, db.func.count()
+        ).filter(
+            Rating.recipe_id.in_(recipe_ids), Rating.value.between(1, 5)
+        ).group_by(Rating.recipe_id, Rating.value):
+            actual.setdefault(recipe_id, {})[value] = count
+        stored = {summary.recipe_id: summary for summary in RatingSummary.query.filter(RatingSummary.recipe_id.in_(recipe_ids))}
+
+        for recipe_id in recipe_ids:
+            counts = actual.get(recipe_id, {})
+            expected = {f'stars_{stars}': counts.get(stars, 0) for stars in STARS}
+            expected['rating_count'] = sum(counts.values())
+            expected['rating_sum'] = sum(stars * count for stars, count in counts.items())
+
+            summary = stored.get(recipe_id)
+            current = {key: getattr(summary, key) for key in expected} if summary else None
+            if current == expected or (summary is None and not expected['rating_count']):
+                continue
+            mismatched.append(recipe_id)
+            if fix:
+                if summary is None:
+                    summary = RatingSummary(recipe_id=recipe_id)
+                    db.session.add(summary)
+                for key, value in expected.items():
+                    setattr(summary, key, value)
+
+        if fix:
+            db.session.commit()
+        else:
+            db.session.rollback()
+
+
+def rebuild_rating_summaries():
+    """Recount every rollup row from the ratings table in one INSERT ... SELECT; for bulk loads.
+
+    Returns the number of rated recipes.
+    """
+    db.session.execute(db.delete(RatingSummary))
+    db.session.execute(db.insert(RatingSummary).from_select(
+        ['recipe_id', *(f'stars_{stars}' for stars in STARS), 'rating_count', 'rating_sum'],
+        db.select(
+            Rating.recipe_id,
+            *(db.func.sum(db.case((Rating.value == stars, 1), else_=0)) for stars in STARS),
+            db.func.count(),
+            db.func.sum(Rating.value)
+        ).where(Rating.value.between(1, 5)).group_by(Rating.recipe_id)
+    ))
+    db.session.commit()
+    return db.session.query(db.func.count()).select_from(RatingSummary).scalar()
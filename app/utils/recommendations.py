@@ -0,0 +1,232 @@
+from flask import current_app
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.rating import Rating
+from app.models.bookmark import Bookmark
+from app.models.related_recipe import RelatedRecipe
+from app.utils.cache import TTLCache
+from app.utils.similarity import get_numpy
+from app.utils.jobs import job_queue
+
+# Finished recommendation lists per user id; a user's own rating or bookmark invalidates theirs
+recommendation_cache = TTLCache(maxsize=10000, ttl=300)
+
+# Ratings below 3 stars are not a "like"; 3, 4 and 5 stars count 1, 2 and 3
+MIN_LIKED_RATING = 3
+MAX_RECOMMENDATIONS = 50
+# Most recent interactions used to seed a user's recommendations
+MAX_SEEDS = 200
+
+
+def get_sparse():
+    """Import scipy.sparse on first use; it is only needed by the batch job"""
+    try:
+        import scipy.sparse
+    except ImportError:
+        return None
+    return scipy.sparse
+
+
+def rating_weight(value):
+    return max(value - MIN_LIKED_RATING + 1, 0)
+
+
+def _stream(columns, id_column, chunk_size):
+    """Yield rows of an interaction table in id order, chunk_size rows at a time"""
+    last_id = 0
+    while True:
+        rows = db.session.query(id_column, *columns).filter(id_column > last_id).order_by(id_column).limit(chunk_size).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def load_interactions(chunk_size=10000):
+    """Sparse users x recipes matrix of like weights, read in chunks.
+
+    Each chunk is turned into compact NumPy arrays straight away, so memory grows with the
+    number of interactions (12 bytes each) rather than with ORM rows.
+    """
+    np, sparse = get_numpy(), get_sparse()
+    bookmark_weight = current_app.config.get('RECOMMENDATIONS_BOOKMARK_WEIGHT', 2.0)
+    users, recipes, weights = [], [], []
+
+    for rows in _stream((Rating.user_id, Rating.recipe_id, Rating.value), Rating.id, chunk_size):
+        chunk = np.array([row[1:] for row in rows], dtype=np.int64)
+        liked = chunk[:, 2] >= MIN_LIKED_RATING
+        users.append(chunk[liked, 0].astype(np.int32))
+        recipes.append(chunk[liked, 1].astype(np.int32))
+        weights.append((chunk[liked, 2] - MIN_LIKED_RATING + 1).astype(np.float32))
+
+    for rows in _stream((Bookmark.user_id, Bookmark.recipe_id), Bookmark.id, chunk_size):
+        chunk = np.array([row[1:] for row in rows], dtype=np.int32)
+        users.append(chunk[:, 0])
+        recipes.append(chunk[:, 1])
+        weights.append(np.full(len(chunk), bookmark_weight, dtype=np.float32))
+
+    if not users:
+        return sparse.csc_matrix((0, 0), dtype=np.float32)
+    users, recipes, weights = np.concatenate(users), np.concatenate(recipes), np.concatenate(weights)
+    # Duplicate (user, recipe) pairs, e.g. a rating plus a bookmark, are summed
+    return sparse.coo_matrix(
+        (weights, (users, recipes)), shape=(int(users.max()) + 1, int(recipes.max()) + 1)
+    ).tocsc()
+
+
+def top_neighbours(matrix, top_k=20, min_support=2, item_chunk=1000):
+    """Yield (recipe_id, related_ids, scores) with each recipe's top_k cosine neighbours.
+
+    Item-item similarity is computed for item_chunk columns at a time, so the dense-ish
+    product never holds more than item_chunk rows. Pairs liked together by fewer than
+    min_support users are dropped; one shared fan is not a signal.
+    """
+    np, sparse = get_numpy(), get_sparse()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    normalized = (matrix @ sparse.diags(inverse)).tocsc()
+    binary = matrix.copy()
+    binary.data[:] = 1
+
+    for start in range(0, matrix.shape[1], item_chunk):
+        block = normalized[:, start:start + item_chunk]
+        if block.nnz == 0:
+            continue
+        similarity = (block.T @ normalized).tocsr()
+        support = (binary[:, start:start + item_chunk].T @ binary).tocsr()
+        similarity.sort_indices()
+        support.sort_indices()
+
+        for row in range(block.shape[1]):
+            begin, end = similarity.indptr[row], similarity.indptr[row + 1]
+            if begin == end:
+                continue
+            recipe_id = start + row
+            related = similarity.indices[begin:end]
+            scores = similarity.data[begin:end]
+            # Weights are positive, so both products share one sparsity pattern
+            shared = support.data[support.indptr[row]:support.indptr[row + 1]]
+            keep = (related != recipe_id) & (shared >= min_support)
+            related, scores = related[keep], scores[keep]
+            if len(scores) > top_k:
+                best = np.argpartition(scores, -top_k)[-top_k:]
+                related, scores = related[best], scores[best]
+            if len(scores):
+                yield recipe_id, related, scores
+
+
+def _nonempty(matrix):
+    """Rows of a CSR matrix, or columns of a CSC one, with at least one stored value"""
+    return int((get_numpy().diff(matrix.indptr) > 0).sum())
+
+
+@job_queue.job('recommendations.build')
+def build_recommendations(chunk_size=10000, item_chunk=1000, insert_batch=10000):
+    """Recompute related_recipes from all ratings and bookmarks and swap it in one transaction"""
+    if get_numpy() is None or get_sparse() is None:
+        raise RuntimeError("NumPy and SciPy are required to build recommendations")
+    config = current_app.config
+    matrix = load_interactions(chunk_size)
+
+    db.session.execute(db.delete(RelatedRecipe))
+    pairs, buffer = 0, []
+    for recipe_id, related, scores in top_neighbours(
+        matrix, config.get('RECOMMENDATIONS_TOP_K', 20), config.get('RECOMMENDATIONS_MIN_SUPPORT', 2), item_chunk
+    ):
+        buffer.extend(
+            {"recipe_id": recipe_id, "related_recipe_id": int(related_id), "score": round(float(score), 6)}
+            for related_id, score in zip(related, scores)
+        )
+        if len(buffer) >= insert_batch:
+            db.session.execute(db.insert(RelatedRecipe), buffer)
+            pairs += len(buffer)
+            buffer = []
+    if buffer:
+        db.session.execute(db.insert(RelatedRecipe), buffer)
+        pairs += len(buffer)
+    db.session.commit()
+
+    recommendation_cache.clear()
+    return {
+        "interactions": int(matrix.nnz),
+        "users": _nonempty(matrix.tocsr()),
+        "recipes": _nonempty(matrix),
+        "pairs": pairs
+    }
+
+
+def _interactions(user_id):
+    """The user's most recent ratings and bookmarks as (recipe_id, weight) in one query"""
+    ratings = db.select(Rating.recipe_id, Rating.value.label('value'), Rating.created_at).where(Rating.user_id == user_id)
+    bookmarks = db.select(Bookmark.recipe_id, db.literal(None).label('value'), Bookmark.created_at).where(Bookmark.user_id == user_id)
+    both = db.union_all(ratings, bookmarks).subquery()
+    rows = db.session.execute(
+        db.select(both.c.recipe_id, both.c.value).order_by(both.c.created_at.desc()).limit(MAX_SEEDS)
+    ).all()
+
+    bookmark_weight = current_app.config.get('RECOMMENDATIONS_BOOKMARK_WEIGHT', 2.0)
+    weights = {}
+    for recipe_id, value in rows:
+        weight = bookmark_weight if value is None else rating_weight(value)
+        weights[recipe_id] = weights.get(recipe_id, 0) + weight
+    return weights
+
+
+def _summary(recipe):
+    return {
+        "id": recipe.id,
+        "title": recipe.title,
+        "description": recipe.description,
+        "country": recipe.country,
+        "serving_size": recipe.serving_size,
+        "image_url": recipe.image_url,
+        "user_id": recipe.user_id,
+        "group_id": recipe.group_id
+    }
+
+
+def _compute(user_id):
+    from app.utils.ranking import feed_page
+
+    seen = _interactions(user_id)
+    seeds = [recipe_id for recipe_id, weight in seen.items() if weight > 0]
+
+    totals, because = {}, {}
+    if seeds:
+        for seed_id, related_id, score in db.session.query(
+            RelatedRecipe.recipe_id, RelatedRecipe.related_recipe_id, RelatedRecipe.score
+        ).filter(RelatedRecipe.recipe_id.in_(seeds)):
+            if related_id in seen:
+                continue
+            contribution = score * seen[seed_id]
+            totals[related_id] = totals.get(related_id, 0) + contribution
+            if contribution > because.get(related_id, (0, None))[0]:
+                because[related_id] = (contribution, seed_id)
+
+    if totals:
+        ranked = sorted(totals, key=lambda recipe_id: (-totals[recipe_id], recipe_id))[:MAX_RECOMMENDATIONS]
+        recipes = {recipe.id: recipe for recipe in Recipe.query.filter(Recipe.id.in_(ranked))}
+        return {"source": "related", "recipes": [
+            {**_summary(recipes[recipe_id]), "score": round(totals[recipe_id], 4), "because_you_liked": because[recipe_id][1]}
+            for recipe_id in ranked if recipe_id in recipes
+        ]}
+
+    # Nothing to go on yet: fall back to the best rated recipes the user hasn't touched
+    rows, _ = feed_page('top', MAX_RECOMMENDATIONS + len(seen))
+    return {"source": "top", "recipes": [
+        {**_summary(recipe), "score": None, "because_you_liked": None}
+        for recipe, _ in rows if recipe.id not in seen
+    ][:MAX_RECOMMENDATIONS]}
+
+
+def recommend_for_user(user_id, limit=20):
+    """Recommendations for one user, served from the per-user cache when possible"""
+    result = recommendation_cache.get_or_load(user_id, lambda: _compute(user_id))
+    return {"source": result["source"], "recipes": result["recipes"][:limit]}
+
+
+def init_recommendations(app):
+    recommendation_cache.configure(
+        app.config.get('RECOMMENDATIONS_CACHE_SIZE', 10000), app.config.get('RECOMMENDATIONS_CACHE_TTL', 300)
+    )
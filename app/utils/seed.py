@@ -0,0 +1,319 @@
+"""Deterministic synthetic data for `flask seed` and the benchmarks.
+
+Every row gets an explicit primary key so related rows can be generated without reading
+anything back, and popularity is skewed (Zipf-like) so a few recipes and groups attract
+most of the activity, as in real traffic. Rows are generated lazily, table by table, each
+table from its own seeded random stream, so the output depends only on the counts, the seed
+and `now` (timestamps fall in the year before it), never on the batch size, and millions of
+rows never sit in memory at once.
+"""
+import csv
+import io
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models.user import User
+from app.models.recipe import Recipe
+from app.models.group import Group
+from app.models.group_member import GroupMember
+from app.models.rating import Rating
+from app.models.comment import Comment
+from app.models.bookmark import Bookmark
+from app.models.recipe_ingredient import RecipeIngredient
+from app.utils.ingredients import extract_ingredients
+from app.utils.ratings import rebuild_rating_summaries
+
+SEED_PASSWORD = "seed-password"
+
+INGREDIENTS = [
+    "chicken", "rice", "garlic", "onion", "tomato", "basil", "olive oil", "butter", "flour",
+    "eggs", "milk", "cheese", "parmesan", "pasta", "beef", "pork", "lamb", "salmon", "shrimp",
+    "tofu", "potato", "carrot", "celery", "ginger", "soy sauce", "coconut milk", "lime", "lemon",
+    "cilantro", "parsley", "cumin", "paprika", "chili", "black pepper", "salt", "sugar", "honey",
+    "yogurt", "spinach", "mushroom", "bell pepper", "zucchini", "beans", "lentils", "chickpeas",
+    "peanuts", "almonds", "cashews", "walnuts", "cream", "bread", "corn", "avocado", "cabbage",
+    "noodles", "vinegar", "mustard", "thyme", "rosemary", "oregano"
+]
+UNITS = ["cups", "tbsp", "tsp", "g", "ml", "cloves", "pinch", "cans"]
+COUNTRIES = [
+    "Italy", "Kenya", "Mexico", "India", "Japan", "France", "Thailand", "Nigeria", "Spain",
+    "China", "Greece", "Ethiopia", "Brazil", "Morocco", "Vietnam", "Turkey"
+]
+DISHES = ["stew", "curry", "salad", "soup", "pasta", "pie", "stir fry", "bake", "roast", "tacos", "bowl"]
+STYLES = ["Spicy", "Creamy", "Classic", "Smoky", "Quick", "Rustic", "Grandma's", "Weeknight", "Zesty"]
+WORDS = (
+    "simmer until tender then season generously and serve warm with fresh herbs on top "
+    "stir often so nothing sticks to the pan and add a splash of water if it looks dry "
+    "this family favourite comes together in under an hour and keeps well for days"
+).split()
+
+SCALES = {
+    'users': 200,
+    'groups': 20,
+    'recipes': 2000,
+    'ratings': 10000,
+    'comments': 5000,
+    'bookmarks': 4000,
+}
+MAX_GROUPS_PER_USER = 5
+GROUP_RECIPE_SHARE = 0.3
+
+
+def zipf_weights(n, s=1.1):
+    """Cumulative weights for rank-based Zipf popularity"""
+    return list(accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def sentence(rng, low, high):
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize() + "."
+
+
+def text(rng, median, low, high):
+    """Words with a long-tailed (log-normal) length, like real descriptions and comments"""
+    count = min(high, max(low, round(rng.lognormvariate(math.log(median), 0.6))))
+    return sentence(rng, count, count)
+
+
+def _rng(seed, stream):
+    # str seeds are hashed with SHA-512, so every stream is reproducible across runs
+    return random.Random(f"{seed}:{stream}")
+
+
+def _timestamp(rng, now):
+    return now - timedelta(seconds=rng.randint(0, 365 * 86400))
+
+
+class Dataset:
+    """Row generators for one seeded dataset; iterate tables() to load it"""
+
+    def __init__(self, counts, seed=42, password_hash=None, now=None):
+        self.counts = counts
+        self.seed = seed
+        self.now = now or datetime.utcnow()
+        # One shared hash keeps seeding fast; hashing cost is measured by the login scenario
+        self.password_hash = password_hash or generate_password_hash(SEED_PASSWORD, method='pbkdf2:sha256:1000')
+        self.group_weights = zipf_weights(counts['groups'])
+        self.recipe_weights = zipf_weights(counts['recipes'])
+        admins = _rng(seed, 'admins')
+        self.admin_groups = {}
+        for group_id in range(1, counts['groups'] + 1):
+            self.admin_groups.setdefault(admins.randint(1, counts['users']), []).append(group_id)
+
+    @classmethod
+    def scaled(cls, scale=1.0, seed=42, password_hash=None):
+        return cls({name: max(1, int(count * scale)) for name, count in SCALES.items()}, seed, password_hash)
+
+    def user_groups(self, user_id):
+        """Groups a user belongs to, with whether they administer each; popular groups draw more members"""
+        rng = _rng(self.seed, f'member:{user_id}')
+        joined = rng.choices(range(1, self.counts['groups'] + 1), cum_weights=self.group_weights,
+                             k=rng.randint(0, MAX_GROUPS_PER_USER))
+        groups = dict.fromkeys(joined, False)
+        groups.update(dict.fromkeys(self.admin_groups.get(user_id, ()), True))
+        return sorted(groups.items())
+
+    def users(self):
+        rng = _rng(self.seed, 'users')
+        for i in range(1, self.counts['users'] + 1):
+            yield {
+                "id": i,
+                "username": f"seed_user_{i}",
+                "email": f"seed_user_{i}@example.com",
+                "password_hash": self.password_hash,
+                "created_at": _timestamp(rng, self.now)
+            }
+
+    def groups(self):
+        rng = _rng(self.seed, 'groups')
+        for i in range(1, self.counts['groups'] + 1):
+            yield {
+                "id": i,
+                "name": f"{rng.choice(COUNTRIES)} Cooks {i}",
+                "description": text(rng, 14, 5, 60),
+                "created_at": _timestamp(rng, self.now)
+            }
+
+    def group_members(self):
+        rng = _rng(self.seed, 'group_members')
+        member_id = 0
+        for user_id in range(1, self.counts['users'] + 1):
+            for group_id, is_admin in self.user_groups(user_id):
+                member_id += 1
+                yield {
+                    "id": member_id,
+                    "user_id": user_id,
+                    "group_id": group_id,
+                    "is_admin": is_admin,
+                    "joined_at": _timestamp(rng, self.now)
+                }
+
+    def recipes(self):
+        rng = _rng(self.seed, 'recipes')
+        for i in range(1, self.counts['recipes'] + 1):
+            user_id = rng.randint(1, self.counts['users'])
+            created_at = _timestamp(rng, self.now)
+            ingredients = rng.sample(INGREDIENTS, rng.randint(4, 12))
+            shared = rng.random() < GROUP_RECIPE_SHARE
+            user_groups = self.user_groups(user_id) if shared else None
+            yield {
+                "id": i,
+                "title": f"{rng.choice(STYLES)} {rng.choice(ingredients).title()} {rng.choice(DISHES).title()}",
+                "description": text(rng, 30, 8, 150),
+                "ingredients": "\n".join(f"{rng.randint(1, 4)} {rng.choice(UNITS)} {name}" for name in ingredients),
+                "instructions": " ".join(sentence(rng, 8, 20) for _ in range(rng.randint(3, 12))),
+                "country": rng.choice(COUNTRIES),
+                "serving_size": rng.randint(1, 8),
+                "image_url": None,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "user_id": user_id,
+                "group_id": rng.choice(user_groups)[0] if user_groups else None
+            }
+
+    def _popular_recipe(self, rng):
+        return rng.choices(range(1, self.counts['recipes'] + 1), cum_weights=self.recipe_weights)[0]
+
+    def _user_recipe_pairs(self, rng, total):
+        """Up to `total` distinct (user, recipe) pairs; a few heavy users, most recipes rarely touched"""
+        mean = total / self.counts['users']
+        produced = 0
+        for user_id in range(1, self.counts['users'] + 1):
+            wanted = min(round(rng.expovariate(1 / mean)), total - produced, self.counts['recipes'])
+            recipe_ids = set()
+            for _ in range(wanted * 10):
+                if len(recipe_ids) == wanted:
+                    break
+                recipe_ids.add(self._popular_recipe(rng))
+            for recipe_id in sorted(recipe_ids):
+                yield user_id, recipe_id
+            produced += len(recipe_ids)
+
+    def ratings(self):
+        rng = _rng(self.seed, 'ratings')
+        for i, (user_id, recipe_id) in enumerate(self._user_recipe_pairs(rng, self.counts['ratings']), 1):
+            yield {
+                "id": i,
+                "user_id": user_id,
+                "recipe_id": recipe_id,
+                "value": rng.choices([1, 2, 3, 4, 5], cum_weights=[1, 3, 7, 15, 21])[0],
+                "created_at": _timestamp(rng, self.now)
+            }
+
+    def comments(self):
+        rng = _rng(self.seed, 'comments')
+        for i in range(1, self.counts['comments'] + 1):
+            yield {
+                "id": i,
+                "user_id": rng.randint(1, self.counts['users']),
+                "recipe_id": self._popular_recipe(rng),
+                "text": text(rng, 12, 1, 120),
+                "created_at": _timestamp(rng, self.now)
+            }
+
+    def bookmarks(self):
+        rng = _rng(self.seed, 'bookmarks')
+        for i, (user_id, recipe_id) in enumerate(self._user_recipe_pairs(rng, self.counts['bookmarks']), 1):
+            yield {"id": i, "user_id": user_id, "recipe_id": recipe_id, "created_at": _timestamp(rng, self.now)}
+
+    def tables(self):
+        """(model, rows) in dependency order"""
+        return [
+            (User, self.users()),
+            (Group, self.groups()),
+            (GroupMember, self.group_members()),
+            (Recipe, self.recipes()),
+            (Rating, self.ratings()),
+            (Comment, self.comments()),
+            (Bookmark, self.bookmarks()),
+        ]
+
+
+def generate(scale=1.0, seed=42, password_hash=None):
+    """Generate every row in memory, keyed by model; for the small benchmark datasets"""
+    return {model: list(rows) for model, rows in Dataset.scaled(scale, seed, password_hash).tables()}
+
+
+def _copy(model, rows):
+    """COPY a batch into Postgres, several times faster than INSERT; False if the driver can't"""
+    cursor = db.session.connection().connection.dbapi_connection.cursor()
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # An unquoted empty field is NULL in COPY's CSV format
+        writer.writerow(['' if row[column] is None else row[column] for column in columns])
+    preparer = db.engine.dialect.identifier_preparer
+    statement = (f"COPY {preparer.format_table(model.__table__)} ({', '.join(map(preparer.quote, columns))}) "
+                 "FROM STDIN WITH (FORMAT csv)")
+    try:
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+        elif hasattr(cursor, 'copy'):  # psycopg 3
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            return False
+    finally:
+        cursor.close()
+    return True
+
+
+def _insert(model, rows, use_copy):
+    if not (use_copy and _copy(model, rows)):
+        db.session.execute(db.insert(model), rows)
+
+
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def load(data, batch_size=5000, progress=None):
+    """Bulk insert generated rows in dependency order and derive what the app keeps alongside.
+
+    `data` maps models to rows, or is a list of (model, rows) pairs such as Dataset.tables().
+    Each batch is committed; Postgres gets COPY. Recipes also get their ingredient index,
+    ratings their rollups. Returns the number of rows written per table; `progress`, if
+    given, is called with (table, rows so far, seconds) after every batch.
+    """
+    use_copy = db.engine.dialect.name == 'postgresql'
+    started = time.perf_counter()
+    written = {}
+    for model, rows in (data.items() if isinstance(data, dict) else data):
+        table = model.__tablename__
+        written.setdefault(table, 0)
+        for batch in _batches(rows, batch_size):
+            _insert(model, batch, use_copy)
+            written[table] += len(batch)
+            if model is Recipe:
+                names = [{"recipe_id": recipe["id"], "name": name}
+                         for recipe in batch for name in sorted(extract_ingredients(recipe["ingredients"]))]
+                if names:
+                    _insert(RecipeIngredient, names, use_copy)
+                written[RecipeIngredient.__tablename__] = written.get(RecipeIngredient.__tablename__, 0) + len(names)
+            db.session.commit()
+            if progress:
+                progress(table, written[table], time.perf_counter() - started)
+
+    if written.get(Rating.__tablename__):
+        written['rating_summaries'] = rebuild_rating_summaries()
+
+    # Postgres sequences do not advance for explicit ids
+    if db.engine.dialect.name == 'postgresql':
+        for model, _ in (data.items() if isinstance(data, dict) else data):
+            if 'id' not in model.__table__.columns:
+                continue
+            table = model.__tablename__
+            db.session.execute(db.text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+            ))
+        db.session.commit()
+    return written
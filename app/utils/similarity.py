@@ -0,0 +1,286 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.utils.ingredients import DESCRIPTORS, UNITS, extract_ingredients, singularize
+
+logger = logging.getLogger('app.similarity')
+
+_np = None
+
+def get_numpy():
+    """Import NumPy on first use so it stays off the startup path; None when not installed"""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        _np = numpy
+    return _np
+
+_TOKEN = re.compile(r"[a-z]+")
+STOPWORDS = DESCRIPTORS | UNITS | {
+    'with', 'and', 'but', 'in', 'on', 'at', 'by', 'it', 'is', 'this', 'that', 'until', 'then',
+    'so', 'if', 'be', 'are', 'as', 'from', 'your', 'you', 'my', 'our', 'into', 'over', 'serve',
+    'add', 'stir', 'cook', 'recipe', 'easy', 'best', 'make', 'keeps', 'well', 'days', 'under'
+}
+# Title words say the most about a dish; whole ingredient names ('olive oil') are features too
+TITLE_WEIGHT = 2.0
+INGREDIENT_WEIGHT = 1.5
+DESCRIPTION_WEIGHT = 1.0
+
+VECTORS_FILE = 'vectors.f32'
+IDF_FILE = 'idf.npy'
+META_FILE = 'meta.json'
+
+
+@lru_cache(maxsize=65536)
+def _term(word):
+    """Canonical form of one word, or None for stop words; recipes reuse a small vocabulary"""
+    if len(word) <= 2 or word in STOPWORDS:
+        return None
+    return singularize(word)
+
+
+def _words(text):
+    return [term for term in map(_term, _TOKEN.findall((text or '').lower())) if term]
+
+
+def recipe_features(title, description, ingredients):
+    """Weighted term frequencies for one recipe, keyed by feature string"""
+    features = Counter()
+    for word in _words(title):
+        features['w:' + word] += TITLE_WEIGHT
+    for word in _words(description):
+        features['w:' + word] += DESCRIPTION_WEIGHT
+    for name in extract_ingredients(ingredients):
+        features['i:' + name] += INGREDIENT_WEIGHT
+        for word in name.split():
+            features['w:' + word] += INGREDIENT_WEIGHT / 2
+    return features
+
+
+@lru_cache(maxsize=65536)
+def _bucket(feature, dimensions):
+    # crc32 rather than hash() so every process and every run agrees on the buckets
+    h = zlib.crc32(feature.encode())
+    return h % dimensions, (1.0 if h & 0x80000000 else -1.0)
+
+
+def hashed_features(features, dimensions):
+    """Map features onto `dimensions` buckets as {bucket: sublinear tf}.
+
+    The sign bit keeps colliding features from only ever adding up.
+    """
+    buckets = {}
+    for feature, weight in features.items():
+        bucket, sign = _bucket(feature, dimensions)
+        buckets[bucket] = buckets.get(bucket, 0.0) + sign * (1.0 + math.log(weight))
+    return buckets
+
+
+@contextmanager
+def _exclusive_lock(f):
+    """flock an open file against other worker processes; a no-op without fcntl (Windows)"""
+    try:
+        import fcntl
+    except ImportError:
+        # No forking gunicorn workers there, so no other process grows the file
+        yield
+        return
+    fcntl.flock(f, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SimilarityIndex:
+    """Hashed TF-IDF vectors for every recipe in a memory-mapped float32 matrix.
+
+    Row N holds recipe N, so incremental updates write one row in place and every gunicorn
+    worker mapping the same file sees them. Deleted or never-indexed recipes are zero rows.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.dimensions = 256
+        self.block_rows = 65536
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._idf = None
+        self._stamp = None
+
+    def init_app(self, app):
+        self.directory = app.config.get('SIMILARITY_DIR', '/tmp/recipe_room_similarity')
+        self.dimensions = app.config.get('SIMILARITY_DIMENSIONS', 256)
+        self.block_rows = app.config.get('SIMILARITY_BLOCK_ROWS', 65536)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        """Map the current index files, remapping when a build or a resize replaced them"""
+        np = get_numpy()
+        if np is None or self.directory is None:
+            return False
+        try:
+            stat = os.stat(self._path(VECTORS_FILE))
+        except FileNotFoundError:
+            return False
+
+        stamp = (stat.st_ino, stat.st_size)
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    idf = np.load(self._path(IDF_FILE))
+                    rows = stat.st_size // (4 * len(idf))
+                    self._vectors = np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode='r+', shape=(rows, len(idf)))
+                    self._idf = idf
+                    self._stamp = stamp
+        return True
+
+    def available(self):
+        return self._load()
+
+    def vectorize(self, rows, idf):
+        """L2-normalized TF-IDF vectors for (title, description, ingredients) rows"""
+        np = get_numpy()
+        row_index, columns, values = [], [], []
+        for i, (title, description, ingredients) in enumerate(rows):
+            buckets = hashed_features(recipe_features(title, description, ingredients), len(idf))
+            row_index.extend([i] * len(buckets))
+            columns.extend(buckets)
+            values.extend(buckets.values())
+        matrix = np.zeros((len(rows), len(idf)), dtype=np.float32)
+        matrix[row_index, columns] = values
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def build(self, batch_size=5000):
+        """Rebuild the index from every recipe in the database; returns the number indexed"""
+        max_id = db.session.query(db.func.max(Recipe.id)).scalar() or 0
+
+        def batches():
+            last_id = 0
+            while True:
+                batch = db.session.query(
+                    Recipe.id, Recipe.title, Recipe.description, Recipe.ingredients
+                ).filter(Recipe.id > last_id, Recipe.id <= max_id).order_by(Recipe.id).limit(batch_size).all()
+                if not batch:
+                    return
+                yield [tuple(row) for row in batch]
+                last_id = batch[-1][0]
+
+        return self.build_from(batches, max_id)
+
+    def build_from(self, batches, max_id):
+        """Write a fresh index from `batches()`, an iterable of [(id, title, description, ingredients)].
+
+        `batches` is called twice: once to count document frequencies, once to write vectors.
+        The files are swapped in with os.replace, so readers never see a half-built index.
+        """
+        np = get_numpy()
+        if np is None:
+            raise RuntimeError("NumPy is required to build the similarity index")
+        os.makedirs(self.directory, exist_ok=True)
+
+        document_frequency = np.zeros(self.dimensions, dtype=np.int64)
+        documents = 0
+        for batch in batches():
+            for _, title, description, ingredients in batch:
+                buckets = hashed_features(recipe_features(title, description, ingredients), self.dimensions)
+                document_frequency[list(buckets)] += 1
+            documents += len(batch)
+        idf = (np.log((1 + documents) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        tmp_vectors = self._path(VECTORS_FILE + '.tmp')
+        vectors = np.memmap(tmp_vectors, dtype=np.float32, mode='w+', shape=(max_id + 1, self.dimensions))
+        for batch in batches():
+            ids = [row[0] for row in batch]
+            vectors[ids] = self.vectorize([row[1:] for row in batch], idf)
+        vectors.flush()
+        del vectors
+
+        with open(self._path(IDF_FILE + '.tmp'), 'wb') as f:
+            np.save(f, idf)
+        os.replace(self._path(IDF_FILE + '.tmp'), self._path(IDF_FILE))
+        with open(self._path(META_FILE), 'w') as f:
+            json.dump({"recipes": documents, "dimensions": self.dimensions, "built_at": datetime.utcnow().isoformat()}, f)
+        os.replace(tmp_vectors, self._path(VECTORS_FILE))
+        return documents
+
+    def _ensure_rows(self, rows):
+        """Grow the vectors file to at least `rows` rows; the flock keeps two workers from racing"""
+        path = self._path(VECTORS_FILE)
+        needed = rows * 4 * len(self._idf)
+        with open(path, 'r+b') as f, _exclusive_lock(f):
+            size = os.fstat(f.fileno()).st_size
+            if size < needed:
+                # Leave headroom so a run of new recipes doesn't remap on every insert
+                os.ftruncate(f.fileno(), max(needed, int(size * 1.25)) // (4 * len(self._idf)) * 4 * len(self._idf))
+        self._load()
+
+    def update(self, recipe):
+        """Re-vectorize one recipe after it was created or edited; a no-op until the index is built"""
+        try:
+            if not self._load():
+                return
+            if recipe.id >= len(self._vectors):
+                self._ensure_rows(recipe.id + 1)
+            self._vectors[recipe.id] = self.vectorize([(recipe.title, recipe.description, recipe.ingredients)], self._idf)[0]
+        except OSError:
+            logger.exception("Could not update similarity vector for recipe %s", recipe.id)
+
+    def remove(self, recipe_id):
+        try:
+            if self._load() and recipe_id < len(self._vectors):
+                self._vectors[recipe_id] = 0
+        except OSError:
+            logger.exception("Could not remove similarity vector for recipe %s", recipe_id)
+
+    def similar(self, recipe, k=10):
+        """Top-k (recipe_id, cosine similarity) pairs, scored one block of rows at a time.
+
+        The query vector is computed from the recipe itself, so recipes created before the
+        last build still get results.
+        """
+        np = get_numpy()
+        self._load()
+        vectors, idf = self._vectors, self._idf
+        query = self.vectorize([(recipe.title, recipe.description, recipe.ingredients)], idf)[0]
+
+        candidate_scores, candidate_ids = [], []
+        for start in range(0, len(vectors), self.block_rows):
+            scores = vectors[start:start + self.block_rows] @ query
+            if start <= recipe.id < start + len(scores):
+                scores[recipe.id - start] = -1.0
+            if len(scores) > k:
+                top = np.argpartition(scores, -k)[-k:]
+            else:
+                top = np.arange(len(scores))
+            candidate_scores.append(scores[top])
+            candidate_ids.append(top + start)
+
+        if not candidate_scores:
+            return []
+        scores = np.concatenate(candidate_scores)
+        ids = np.concatenate(candidate_ids)
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [(int(ids[i]), float(scores[i])) for i in order if scores[i] > 0]
+
+
+similarity_index = SimilarityIndex()
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from app.models.recipe import Recipe
+from app.models.group import Group
+
+SOFT_DELETE_MODELS = (Recipe, Group)
+
+
+def soft_delete(row):
+    """Hide a recipe or group from every query now; app.utils.purge removes it and its children later"""
+    row.deleted_at = datetime.utcnow()
+
+
+def hide_deleted_rows(execute_state):
+    """Add `deleted_at IS NULL` wherever a soft-deletable model appears in an ORM SELECT.
+
+    Covers joins, subqueries and relationship loads too. Column refreshes are left alone so
+    an object can still be read back after it was soft-deleted; pass the execution option
+    include_deleted=True to see deleted rows (the purge job does).
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get('include_deleted', False)
+    ):
+        execute_state.statement = execute_state.statement.options(*(
+            with_loader_criteria(model, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+            for model in SOFT_DELETE_MODELS
+        ))
+
+
+def init_soft_delete(app):
+    if not event.contains(Session, 'do_orm_execute', hide_deleted_rows):
+        event.listen(Session, 'do_orm_execute', hide_deleted_rows)
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""Offline load test: seed a local database, drive every endpoint concurrently, report latency.
+
+Usage:
+    python benchmarks/bench_endpoints.py [--scale 1.0] [--requests 200] [--concurrency 8]
+                                         [--database-url sqlite:///...] [--output results.json]
+                                         [--compare previous.json] [--yes]
+
+Without --database-url a throwaway SQLite file is used. A database given with --database-url
+has every table dropped and recreated, after a confirmation prompt unless --yes is passed. Results are written as JSON
+(default: benchmarks/results/<git sha>.json) so runs can be diffed across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import click
+from flask_jwt_extended import create_access_token
+from sqlalchemy.engine import make_url
+
+from app.config import Config
+from app.main import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.recipe import Recipe
+from app.models.group import Group
+from app.models.group_member import GroupMember
+from app.models.comment import Comment
+from app.models.bookmark import Bookmark
+from app.utils.passwords import password_hasher
+from app.utils import seed as dataset
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def confirm_reset(database_url, yes):
+    """Ask before a benchmark drops every table of a database passed with --database-url"""
+    if yes:
+        return
+    url = make_url(database_url).render_as_string(hide_password=True)
+    if not click.confirm(f"Drop every table in {url}?"):
+        sys.exit("Aborted, the database was left untouched")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Context:
+    """Seeded ids and tokens the scenarios draw from"""
+
+    def __init__(self, data, app, seed):
+        self.app = app
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.user_ids = [row["id"] for row in data[User]]
+        self.recipe_ids = [row["id"] for row in data[Recipe]]
+        self.group_ids = [row["id"] for row in data[Group]]
+        self.countries = sorted({row["country"] for row in data[Recipe]})
+        self.recipes_by_user = {}
+        for row in data[Recipe]:
+            self.recipes_by_user.setdefault(row["user_id"], []).append(row["id"])
+        self.memberships = [(row["user_id"], row["group_id"]) for row in data[GroupMember]]
+        # Joins need a user outside the group: pairs that never were members are used first,
+        # then regular members, who leave before their join is timed
+        members = set(self.memberships)
+        strangers = [(u, g) for u in self.user_ids for g in self.group_ids if (u, g) not in members]
+        regulars = [(row["user_id"], row["group_id"]) for row in data[GroupMember] if not row["is_admin"]]
+        self.rng.shuffle(strangers)
+        self.rng.shuffle(regulars)
+        self.joinable = deque(regulars + strangers)
+        self.comments = [(row["user_id"], row["id"]) for row in data[Comment]]
+        self.bookmarks = [(row["user_id"], row["id"]) for row in data[Bookmark]]
+        self.deletable_recipes = [(row["user_id"], row["id"]) for row in data[Recipe][-len(data[Recipe]) // 10:]]
+        with app.app_context():
+            self.tokens = {user_id: create_access_token(identity=str(user_id)) for user_id in self.user_ids}
+
+    def pick(self, values):
+        with self.lock:
+            return self.rng.choice(values)
+
+    def take(self, values):
+        with self.lock:
+            return values.pop() if values else None
+
+    def start_join(self):
+        """A (user, group) pair to join, the user leaving first if a member; None while all are in use"""
+        pair = self.take(self.joinable)
+        if pair is None:
+            return None
+        with self.app.app_context():
+            db.session.execute(db.delete(GroupMember).where(
+                GroupMember.user_id == pair[0], GroupMember.group_id == pair[1]
+            ))
+            db.session.commit()
+        return pair
+
+    def finish_join(self, pair):
+        # Back of the queue, to be left and joined again once the others have had a turn
+        with self.lock:
+            self.joinable.appendleft(pair)
+
+    def auth(self, user_id):
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+    def any_user(self):
+        user_id = self.pick(self.user_ids)
+        return user_id, self.auth(user_id)
+
+
+def recipe_payload(ctx, title="Benchmark Recipe"):
+    return {
+        "title": title,
+        "description": dataset.sentence(ctx.rng, 15, 60),
+        "ingredients": "2 cups rice\n1 cup chicken\n3 cloves garlic",
+        "instructions": dataset.sentence(ctx.rng, 30, 80),
+        "country": ctx.pick(ctx.countries),
+        "serving_size": 4
+    }
+
+
+# Each scenario returns (method, url, request kwargs) for one request, optionally followed
+# by a callback run once the response is in, outside the timing
+def scenarios(ctx):
+    def owned_recipe():
+        user_id = ctx.pick([u for u in ctx.user_ids if u in ctx.recipes_by_user])
+        return user_id, ctx.pick(ctx.recipes_by_user[user_id])
+
+    def update_recipe():
+        user_id, recipe_id = owned_recipe()
+        return 'PUT', f'/api/recipes/{recipe_id}', {"headers": ctx.auth(user_id), "json": {"serving_size": 6}}
+
+    def delete_recipe():
+        user_id, recipe_id = ctx.take(ctx.deletable_recipes) or owned_recipe()
+        return 'DELETE', f'/api/recipes/{recipe_id}', {"headers": ctx.auth(user_id)}
+
+    def rate_recipe():
+        user_id, headers = ctx.any_user()
+        return 'POST', f'/api/recipes/{ctx.pick(ctx.recipe_ids)}/rate', {"headers": headers, "json": {"value": 4}}
+
+    def create_comment():
+        user_id, headers = ctx.any_user()
+        return 'POST', '/api/comments/', {"headers": headers, "json": {"text": "Lovely!", "recipe_id": ctx.pick(ctx.recipe_ids)}}
+
+    def update_comment():
+        user_id, comment_id = ctx.pick(ctx.comments)
+        return 'PUT', f'/api/comments/{comment_id}', {"headers": ctx.auth(user_id), "json": {"text": "Edited comment"}}
+
+    def delete_comment():
+        user_id, comment_id = ctx.take(ctx.comments) or (ctx.user_ids[0], 0)
+        return 'DELETE', f'/api/comments/{comment_id}', {"headers": ctx.auth(user_id)}
+
+    def create_bookmark():
+        user_id, headers = ctx.any_user()
+        return 'POST', '/api/bookmarks', {"headers": headers, "json": {"recipe_id": ctx.pick(ctx.recipe_ids)}}
+
+    def delete_bookmark():
+        user_id, bookmark_id = ctx.take(ctx.bookmarks) or (ctx.user_ids[0], 0)
+        return 'DELETE', f'/api/bookmarks/{bookmark_id}', {"headers": ctx.auth(user_id)}
+
+    def group_recipes():
+        user_id, group_id = ctx.pick(ctx.memberships)
+        return 'GET', f'/api/groups/{group_id}/recipes', {"headers": ctx.auth(user_id)}
+
+    def create_group():
+        user_id, headers = ctx.any_user()
+        return 'POST', '/api/groups', {"headers": headers, "json": {"name": "Benchmark Group"}}
+
+    def join_group():
+        pair = ctx.start_join()
+        if pair is None:
+            # More joins in flight than pairs to join; this one is expected to fail
+            user_id, group_id = ctx.pick(ctx.memberships)
+            return 'POST', f'/api/groups/{group_id}/join', {"headers": ctx.auth(user_id)}
+        user_id, group_id = pair
+        return 'POST', f'/api/groups/{group_id}/join', {"headers": ctx.auth(user_id)}, lambda: ctx.finish_join(pair)
+
+    def login():
+        return 'POST', '/api/auth/login', {"json": {
+            "username": f"seed_user_{ctx.pick(ctx.user_ids)}",
+            "password": dataset.SEED_PASSWORD
+        }}
+
+    return {
+        "auth.login": login,
+        "auth.get_profile": lambda: ('GET', '/api/auth/profile', {"headers": ctx.any_user()[1]}),
+        "auth.update_profile": lambda: ('PUT', '/api/auth/profile', {
+            "headers": ctx.any_user()[1], "json": {"profile_image": "https://example.com/avatar.png"}
+        }),
+        "recipe.get_recipes": lambda: ('GET', '/api/recipes', {}),
+        "recipe.get_recipes_filtered": lambda: ('GET', f'/api/recipes?country={ctx.pick(ctx.countries)}&min_rating=3', {}),
+        "recipe.get_recipes_faceted": lambda: ('GET', '/api/recipes', {"query_string": {
+            "country": f"in:{ctx.pick(ctx.countries)},{ctx.pick(ctx.countries)}",
+            "serving_size": "2..6",
+            "facets": "country,serving_size,rating_bucket",
+            "limit": 20
+        }}),
+        "recipe.get_single_recipe": lambda: ('GET', f'/api/recipes/{ctx.pick(ctx.recipe_ids)}', {}),
+        "recipe.get_recipes_batch": lambda: ('GET', '/api/recipes/batch', {"headers": ctx.any_user()[1], "query_string": {
+            "ids": ",".join(str(ctx.pick(ctx.recipe_ids)) for _ in range(20))
+        }}),
+        "recipe.get_rating_distribution": lambda: ('GET', f'/api/recipes/{ctx.pick(ctx.recipe_ids)}/ratings/distribution', {}),
+        "recipe.search_recipes": lambda: ('GET', f'/api/recipes/search?query={ctx.pick(dataset.INGREDIENTS)}', {}),
+        "recipe.get_recipes_by_ingredients": lambda: ('GET', '/api/recipes/by-ingredients', {"query_string": {
+            "include": f"{ctx.pick(dataset.INGREDIENTS)},{ctx.pick(dataset.INGREDIENTS)},{ctx.pick(dataset.INGREDIENTS)}",
+            "exclude": ctx.pick(dataset.INGREDIENTS),
+            "max_missing": 1
+        }}),
+        "recipe.create_recipe": lambda: ('POST', '/api/recipes', {"headers": ctx.any_user()[1], "json": recipe_payload(ctx)}),
+        "recipe.update_recipe": update_recipe,
+        "recipe.delete_recipe": delete_recipe,
+        "recipe.rate_recipe": rate_recipe,
+        "recipe.get_group_recipes": group_recipes,
+        "comments.get_comments_for_recipe": lambda: ('GET', f'/api/comments/{ctx.pick(ctx.recipe_ids)}', {}),
+        "comments.create_comment": create_comment,
+        "comments.update_comment": update_comment,
+        "comments.delete_comment": delete_comment,
+        "bookmarks.get_user_bookmarks": lambda: ('GET', '/api/bookmarks', {"headers": ctx.any_user()[1]}),
+        "bookmarks.create_bookmark": create_bookmark,
+        "bookmarks.delete_bookmark": delete_bookmark,
+        "group.get_groups": lambda: ('GET', '/api/groups', {}),
+        "group.get_single_group": lambda: ('GET', f'/api/groups/{ctx.pick(ctx.group_ids)}', {}),
+        "group.get_my_groups": lambda: ('GET', '/api/my-groups', {"headers": ctx.any_user()[1]}),
+        "group.get_my_feed": lambda: ('GET', '/api/my-feed', {"headers": ctx.any_user()[1], "query_string": {"include": "comments"}}),
+        "group.create_group": create_group,
+        "group.join_group": join_group,
+    }
+
+
+def run_scenario(app, build_request, requests_count, concurrency):
+    samples = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker(_):
+        client = app.test_client()
+        method, url, kwargs, *after = build_request()
+        start = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        elapsed = time.perf_counter() - start
+        for callback in after:
+            callback()
+        queries = int(response.headers.get('X-Query-Count', 0))
+        with lock:
+            samples.append((elapsed, queries))
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(requests_count)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    failed = sum(count for code, count in statuses.items() if not 200 <= code < 300)
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / wall, 2),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "queries_per_request": round(sum(sample[1] for sample in samples) / len(samples), 2),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "server_errors": sum(count for code, count in statuses.items() if code >= 500),
+        "non_2xx_rate": round(failed / len(samples), 3)
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def compare(results, previous_path):
+    with open(previous_path) as f:
+        previous = json.load(f)["scenarios"]
+    print(f"\nComparison with {previous_path} (p95 ms, queries/request):")
+    for name, result in results.items():
+        if name not in previous:
+            continue
+        old = previous[name]
+        change = (result["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0
+        print(f"  {name:<36} {old['p95_ms']:>9.2f} -> {result['p95_ms']:>9.2f} ({change:+6.1f}%)  "
+              f"{old['queries_per_request']:>6.1f} -> {result['queries_per_request']:>6.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0, help="dataset size multiplier")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=200, help="requests per scenario")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--database-url', help="defaults to a temporary SQLite file; its tables are dropped")
+    parser.add_argument('--yes', action='store_true', help="do not ask before dropping the --database-url tables")
+    parser.add_argument('--only', help="comma separated scenario names")
+    parser.add_argument('--output')
+    parser.add_argument('--compare', help="previous results JSON to diff against")
+    args = parser.parse_args()
+    if args.database_url:
+        confirm_reset(args.database_url, args.yes)
+
+    tmp = tempfile.TemporaryDirectory()
+    database_url = args.database_url or f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 30}} if database_url.startswith('sqlite') else {}
+        RATELIMIT_ENABLED = False
+        QUERY_STATS_HEADERS = True
+        QUERY_BUDGET_STRICT = False
+
+    app = create_app(BenchConfig)
+
+    print("🏋️  Recipe Room Endpoint Benchmark")
+    print("=" * 50)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        start = time.perf_counter()
+        data = dataset.generate(args.scale, args.seed, password_hasher.hash(dataset.SEED_PASSWORD))
+        rows = dataset.load(data)
+        print(f"Seeded {sum(rows.values())} rows in {time.perf_counter() - start:.1f}s: {rows}")
+
+    ctx = Context(data, app, args.seed)
+    all_scenarios = scenarios(ctx)
+    selected = args.only.split(',') if args.only else list(all_scenarios)
+
+    results = {}
+    for name in selected:
+        # Logins are dominated by password hashing, so fewer samples are enough
+        count = max(1, args.requests // 10) if name == 'auth.login' else args.requests
+        results[name] = run_scenario(app, all_scenarios[name], count, args.concurrency)
+        r = results[name]
+        print(f"{name:<36} {r['throughput_rps']:>8.1f} req/s  p50 {r['p50_ms']:>8.2f}ms  "
+              f"p95 {r['p95_ms']:>8.2f}ms  p99 {r['p99_ms']:>8.2f}ms  "
+              f"{r['queries_per_request']:>6.1f} q/req  non-2xx {r['non_2xx_rate']:>5.0%}  {r['statuses']}")
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "python": platform.python_version(),
+        "database": database_url.split(':', 1)[0],
+        "scale": args.scale,
+        "seed": args.seed,
+        "concurrency": args.concurrency,
+        "rows": rows,
+        "scenarios": results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Time GET /api/my-feed pages for users in many groups, merged at read time vs fanned out.
+
+Usage:
+    python benchmarks/bench_my_feed.py [--groups 500] [--recipes-per-group 200] [--members 50]
+                                       [--pages 5] [--database-url sqlite:///...] [--yes]
+
+Seeds --groups groups that one reader belongs to, each with --members other members,
+--recipes-per-group recipes and about as many comments, then pages through the reader's
+feed both ways: the default pull query over group_members -> recipes, and the feed_items
+inbox used with MY_FEED_FANOUT=true. Also times the extra write cost of fanning out.
+A database given with --database-url has its tables dropped and recreated, after a
+confirmation prompt unless --yes is passed.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+from app.main import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.group import Group
+from app.models.group_member import GroupMember
+from app.models.recipe import Recipe
+from app.models.comment import Comment
+from app.utils.activity_feed import my_feed_page, rebuild_inbox, fan_out_recipe
+from app.utils.ranking import decode_cursor
+from app.utils import seed as dataset
+
+from bench_endpoints import confirm_reset, percentile
+
+
+def seed(args, rng):
+    """Bulk insert groups, members, recipes and comments; the reader is user 1"""
+    now = datetime.utcnow()
+    users = [{"id": i, "username": f"feed_user_{i}", "email": f"feed_user_{i}@example.com",
+              "password_hash": "x"} for i in range(1, args.users + 1)]
+    groups = [{"id": i, "name": f"Feed Group {i}"} for i in range(1, args.groups + 1)]
+    members, recipes, comments = [], [], []
+    for group_id in range(1, args.groups + 1):
+        for user_id in [1] + rng.sample(range(2, args.users + 1), args.members):
+            members.append({"id": len(members) + 1, "user_id": user_id, "group_id": group_id})
+    # Zipf-skewed activity: a few groups hold most of the recipes
+    weights = dataset.zipf_weights(args.groups)
+    for recipe_id in range(1, args.groups * args.recipes_per_group + 1):
+        created_at = now - timedelta(seconds=rng.randint(0, 90 * 86400))
+        recipes.append({
+            "id": recipe_id, "title": f"Recipe {recipe_id}", "description": dataset.sentence(rng, 5, 20),
+            "ingredients": "1 cup rice", "instructions": "Cook.", "created_at": created_at, "updated_at": created_at,
+            "user_id": rng.randint(1, args.users),
+            "group_id": rng.choices(range(1, args.groups + 1), cum_weights=weights)[0]
+        })
+        if rng.random() < 0.5:
+            for _ in range(rng.randint(1, 3)):
+                comments.append({"id": len(comments) + 1, "text": dataset.sentence(rng, 3, 15),
+                                 "user_id": rng.randint(1, args.users), "recipe_id": recipe_id,
+                                 "created_at": created_at + timedelta(seconds=rng.randint(0, 86400))})
+    dataset.load({User: users, Group: groups, GroupMember: members, Recipe: recipes, Comment: comments})
+    return len(recipes), len(comments)
+
+
+def time_pages(args, include_comments):
+    """Latency of each of the first --pages pages, repeated --runs times"""
+    latencies = {page: [] for page in range(1, args.pages + 1)}
+    for _ in range(args.runs):
+        cursor = None
+        for page in range(1, args.pages + 1):
+            started = time.perf_counter()
+            _, next_cursor = my_feed_page(1, args.limit, cursor, include_comments)
+            latencies[page].append((time.perf_counter() - started) * 1000)
+            db.session.rollback()
+            cursor = decode_cursor(next_cursor, size=3) if next_cursor else None
+    return {page: sorted(values) for page, values in latencies.items()}
+
+
+def report(label, latencies):
+    first, last = latencies[1], latencies[max(latencies)]
+    print(f"{label:<28} page 1 p50 {percentile(first, 0.5):>8.2f}ms  p95 {percentile(first, 0.95):>8.2f}ms  "
+          f"page {max(latencies)} p50 {percentile(last, 0.5):>8.2f}ms")
+    return {"page1_p50_ms": round(percentile(first, 0.5), 2), "page1_p95_ms": round(percentile(first, 0.95), 2),
+            f"page{max(latencies)}_p50_ms": round(percentile(last, 0.5), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--groups', type=int, default=500)
+    parser.add_argument('--recipes-per-group', type=int, default=200)
+    parser.add_argument('--members', type=int, default=50, help="other members per group")
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--database-url', help="defaults to a temporary SQLite file; its tables are dropped")
+    parser.add_argument('--yes', action='store_true', help="do not ask before dropping the --database-url tables")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write the results as JSON")
+    args = parser.parse_args()
+    if args.database_url:
+        confirm_reset(args.database_url, args.yes)
+
+    tmp = tempfile.TemporaryDirectory()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.database_url or f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        FEED_REFRESH_INTERVAL = 0
+        QUERY_STATS_ENABLED = False
+        METRICS_ENABLED = False
+        MY_FEED_FANOUT = False
+
+    app = create_app(BenchConfig)
+    rng = random.Random(args.seed)
+    results = {"groups": args.groups, "members_per_group": args.members + 1}
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        recipes, comments = seed(args, rng)
+        results.update(recipes=recipes, comments=comments)
+        print(f"🏋️  My feed benchmark: reader in {args.groups} groups, {recipes} recipes, {comments} comments "
+              f"(seeded in {time.perf_counter() - started:.1f}s)")
+        print("=" * 50)
+
+        results["pull"] = report("pull, recipes", time_pages(args, False))
+        results["pull_comments"] = report("pull, recipes + comments", time_pages(args, True))
+
+        started = time.perf_counter()
+        items = rebuild_inbox()
+        results["inbox_rows"] = items
+        results["inbox_build_seconds"] = round(time.perf_counter() - started, 2)
+        print(f"{'inbox build':<28} {results['inbox_build_seconds']:>8.1f}s  {items} rows")
+
+        app.config['MY_FEED_FANOUT'] = True
+        results["inbox"] = report("inbox, recipes", time_pages(args, False))
+        results["inbox_comments"] = report("inbox, recipes + comments", time_pages(args, True))
+
+        # Write cost of fan-out: deliver an existing recipe again to its group's members
+        writes = []
+        for _ in range(args.runs):
+            recipe_id = rng.randint(1, recipes)
+            started = time.perf_counter()
+            fan_out_recipe(recipe_id)
+            db.session.commit()
+            writes.append((time.perf_counter() - started) * 1000)
+        writes.sort()
+        results["fanout_write_p50_ms"] = round(percentile(writes, 0.5), 2)
+        print(f"{'fan-out write':<28} p50 {percentile(writes, 0.5):>8.2f}ms  p95 {percentile(writes, 0.95):>8.2f}ms  "
+              f"({args.members + 1} members, recipe plus its comments)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Measure login throughput (logins per second per core) for each hashing scheme.
+
+Usage:
+    python benchmarks/bench_password_hashing.py [--logins 200] [--concurrency 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+from app.main import create_app
+from app.extensions import db
+
+SCHEMES = [
+    ('pbkdf2', {}),
+    ('bcrypt', {'BCRYPT_LOG_ROUNDS': 10}),
+    ('bcrypt', {'BCRYPT_LOG_ROUNDS': 12}),
+    ('argon2', {}),
+]
+
+def build_app(scheme, overrides, database_path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database_path}"
+        PASSWORD_HASH_SCHEME = scheme
+        RATELIMIT_ENABLED = False
+
+    for key, value in overrides.items():
+        setattr(BenchConfig, key, value)
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+def run_scheme(scheme, overrides, logins, concurrency):
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            app = build_app(scheme, overrides, os.path.join(tmp, 'bench.db'))
+        except RuntimeError as e:
+            return None, str(e)
+
+        client = app.test_client()
+        credentials = {"username": "bench_user", "password": "correct horse battery staple"}
+        response = client.post('/api/auth/register', json=dict(credentials, email="bench@example.com"))
+        if response.status_code != 201:
+            return None, response.get_json().get('error')
+
+        def login(_):
+            return app.test_client().post('/api/auth/login', json=credentials).status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            statuses = list(pool.map(login, range(logins)))
+        elapsed = time.perf_counter() - start
+
+    failures = sum(1 for status in statuses if status != 200)
+    return {
+        "logins_per_second": logins / elapsed,
+        "logins_per_second_per_core": logins / elapsed / (os.cpu_count() or 1),
+        "failures": failures
+    }, None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    print("🔐 Password Hashing Login Benchmark")
+    print("=" * 50)
+    print(f"Cores: {os.cpu_count()}  Logins: {args.logins}  Concurrency: {args.concurrency}\n")
+
+    for scheme, overrides in SCHEMES:
+        label = scheme + ''.join(f" {k}={v}" for k, v in overrides.items())
+        result, error = run_scheme(scheme, overrides, args.logins, args.concurrency)
+        if error:
+            print(f"{label:<32} skipped ({error})")
+            continue
+        print(f"{label:<32} {result['logins_per_second']:>8.1f} logins/s  "
+              f"{result['logins_per_second_per_core']:>8.1f} logins/s/core  "
+              f"failures={result['failures']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Compare gunicorn worker classes under many concurrent keep-alive connections.
+
+Usage:
+    python benchmarks/bench_serving.py [--connections 500] [--duration 15]
+                                       [--worker-classes gevent,gthread,sync] [--workers 2]
+                                       [--database-url postgresql://...] [--yes]
+
+For each worker class this starts gunicorn with gunicorn.conf.py against the same seeded
+database. An asyncio client then holds --connections open connections, and each one loops
+over the public read endpoints. Point --database-url at Postgres to include real network
+I/O; the default throwaway SQLite file only measures connection handling. Its tables are
+dropped and recreated, after a confirmation prompt unless --yes is passed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.config import Config
+from app.main import create_app
+from app.extensions import db
+from app.utils.passwords import password_hasher
+from app.utils import seed as dataset
+
+from bench_endpoints import confirm_reset, percentile
+
+
+def seed(database_url, scale, seed_value):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        data = dataset.generate(scale, seed_value, password_hasher.hash(dataset.SEED_PASSWORD))
+        dataset.load(data)
+    return [row['id'] for row in data[dataset.Recipe]]
+
+
+def start_server(worker_class, workers, port, database_url, metrics_dir):
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKER_CONNECTIONS='2000',
+        PROMETHEUS_MULTIPROC_DIR=metrics_dir,
+        RATELIMIT_ENABLED='false',
+        QUERY_BUDGET_STRICT='false'
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/recipes/search?query=rice", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"gunicorn ({worker_class}) did not start on port {port}")
+
+
+def stop_server(server):
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+async def fetch(reader, writer, path):
+    """Send one GET on a persistent connection; returns (status, keep_alive)"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\nConnection: keep-alive\r\n\r\n".encode())
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length, keep_alive = 0, True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection' and value == 'close':
+            keep_alive = False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def client(port, paths, stop_at, latencies, errors, rng):
+    reader = writer = None
+    while time.perf_counter() < stop_at:
+        path = rng.choice(paths)
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            status, keep_alive = await asyncio.wait_for(fetch(reader, writer, path), timeout=60)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError, IndexError):
+            errors['connection'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+            continue
+
+        if status == 200:
+            latencies.append((time.perf_counter() - started) * 1000)
+        else:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def drive(port, paths, connections, duration, seed_value):
+    latencies, errors = [], {'connection': 0}
+    stop_at = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, paths, stop_at, latencies, errors, random.Random(seed_value + i))
+        for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) or 0, 2),
+        "p95_ms": round(percentile(latencies, 0.95) or 0, 2),
+        "p99_ms": round(percentile(latencies, 0.99) or 0, 2),
+        "errors": {key: value for key, value in errors.items() if value}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=15, help="seconds of load per worker class")
+    parser.add_argument('--worker-classes', default='gevent,gthread,sync')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--scale', type=float, default=0.1, help="dataset size multiplier")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--database-url', help="defaults to a temporary SQLite file; its tables are dropped")
+    parser.add_argument('--yes', action='store_true', help="do not ask before dropping the --database-url tables")
+    parser.add_argument('--output', help="write the results as JSON")
+    args = parser.parse_args()
+    if args.database_url:
+        confirm_reset(args.database_url, args.yes)
+
+    tmp = tempfile.TemporaryDirectory()
+    database_url = args.database_url or f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    recipe_ids = seed(database_url, args.scale, args.seed)
+    rng = random.Random(args.seed)
+    paths = [f"/api/recipes/{rng.choice(recipe_ids)}" for _ in range(50)]
+    paths += [f"/api/recipes/search?query={rng.choice(dataset.INGREDIENTS)}" for _ in range(10)]
+
+    print(f"🏋️  Serving benchmark: {args.connections} connections, {args.workers} workers, "
+          f"{args.duration:.0f}s per worker class, {database_url.split(':', 1)[0]}")
+    print("=" * 50)
+
+    results = {}
+    for worker_class in args.worker_classes.split(','):
+        metrics_dir = os.path.join(tmp.name, f"metrics-{worker_class}")
+        server = start_server(worker_class, args.workers, args.port, database_url, metrics_dir)
+        try:
+            results[worker_class] = asyncio.run(drive(args.port, paths, args.connections, args.duration, args.seed))
+        finally:
+            stop_server(server)
+        r = results[worker_class]
+        print(f"{worker_class:<8} {r['throughput_rps']:>8.1f} req/s  p50 {r['p50_ms']:>8.2f}ms  "
+              f"p95 {r['p95_ms']:>8.2f}ms  p99 {r['p99_ms']:>8.2f}ms  errors {r['errors']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"connections": args.connections, "workers": args.workers, "results": results}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
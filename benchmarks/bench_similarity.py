@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Build the "more like this" index for synthetic recipes and time top-k queries.
+
+Usage:
+    python benchmarks/bench_similarity.py [--recipes 1000000] [--queries 200] [--k 10]
+                                          [--dimensions 256] [--block-rows 65536]
+
+Recipes are generated in the same style as app.utils.seed but never touch a database, so the
+numbers cover vectorizing, the memory-mapped matrix and the blocked matrix products only.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.utils.similarity import SimilarityIndex, VECTORS_FILE
+from app.utils import seed as dataset
+
+from bench_endpoints import percentile
+
+
+def synthetic_recipe(recipe_id, seed):
+    """(id, title, description, ingredients) for one recipe, reproducible from its id alone"""
+    rng = random.Random(seed * 1_000_003 + recipe_id)
+    ingredients = rng.sample(dataset.INGREDIENTS, rng.randint(4, 12))
+    return (
+        recipe_id,
+        f"{rng.choice(dataset.STYLES)} {rng.choice(ingredients).title()} {rng.choice(dataset.DISHES).title()}",
+        dataset.sentence(rng, 15, 60),
+        "\n".join(f"{rng.randint(1, 4)} cups {name}" for name in ingredients)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--recipes', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--dimensions', type=int, default=256)
+    parser.add_argument('--block-rows', type=int, default=65536)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write the results as JSON")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    index = SimilarityIndex()
+    index.directory = tmp.name
+    index.dimensions = args.dimensions
+    index.block_rows = args.block_rows
+
+    def batches():
+        for start in range(1, args.recipes + 1, args.batch_size):
+            yield [synthetic_recipe(i, args.seed) for i in range(start, min(start + args.batch_size, args.recipes + 1))]
+
+    print(f"🏋️  Similarity benchmark: {args.recipes} recipes, {args.dimensions} dimensions, k={args.k}")
+    print("=" * 50)
+
+    started = time.perf_counter()
+    index.build_from(batches, args.recipes)
+    build_seconds = time.perf_counter() - started
+    size_mb = os.path.getsize(os.path.join(tmp.name, VECTORS_FILE)) / 2 ** 20
+    print(f"build    {build_seconds:>8.1f}s  {args.recipes / build_seconds:>8.0f} recipes/s  {size_mb:.0f} MB matrix")
+
+    rng = random.Random(args.seed)
+    index.available()
+    latencies = []
+    for _ in range(args.queries):
+        _, title, description, ingredients = synthetic_recipe(rng.randint(1, args.recipes), args.seed)
+        recipe = SimpleNamespace(id=rng.randint(1, args.recipes), title=title, description=description, ingredients=ingredients)
+        started = time.perf_counter()
+        index.similar(recipe, args.k)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    print(f"query    p50 {percentile(latencies, 0.50):>8.2f}ms  p95 {percentile(latencies, 0.95):>8.2f}ms  "
+          f"p99 {percentile(latencies, 0.99):>8.2f}ms")
+
+    updates = []
+    for i in range(args.queries):
+        recipe_id, title, description, ingredients = synthetic_recipe(args.recipes + 1 + i, args.seed)
+        started = time.perf_counter()
+        index.update(SimpleNamespace(id=recipe_id, title=title, description=description, ingredients=ingredients))
+        updates.append((time.perf_counter() - started) * 1000)
+    updates.sort()
+    print(f"update   p50 {percentile(updates, 0.50):>8.2f}ms  p95 {percentile(updates, 0.95):>8.2f}ms  "
+          f"(new recipes, growing the file)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                "recipes": args.recipes,
+                "dimensions": args.dimensions,
+                "build_seconds": round(build_seconds, 2),
+                "matrix_mb": round(size_mb, 1),
+                "query_p50_ms": round(percentile(latencies, 0.50), 2),
+                "query_p95_ms": round(percentile(latencies, 0.95), 2),
+                "update_p50_ms": round(percentile(updates, 0.50), 2)
+            }, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
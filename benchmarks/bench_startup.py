@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Measure cold-start time: importing `app.main` and running `create_app()` in a fresh interpreter.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--top 25]
+
+Every run is a new `python -X importtime` process, so nothing is cached in sys.modules.
+Besides timings, the report shows which modules cost the most to import (cumulative).
+Modules pulled in by `create_app()` itself, not by the import of app.main, are included too.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+from app.main import create_app
+imported = time.perf_counter()
+create_app()
+finished = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "create_app_ms": (finished - imported) * 1000}))
+"""
+
+def run_once(env):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(result.stderr)
+
+def parse_importtime(stderr):
+    """Map module name -> cumulative import time in ms from `-X importtime` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative_us) / 1000
+    return modules
+
+def top_level(modules):
+    """Collapse submodules onto their top-level package, keeping the largest cumulative time"""
+    packages = {}
+    for name, cumulative_ms in modules.items():
+        package = name.split('.')[0] if not name.startswith('app.') else '.'.join(name.split('.')[:3])
+        packages[package] = max(packages.get(package, 0), cumulative_ms)
+    return packages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=25, help="Modules to list in the import-time report")
+    parser.add_argument('--database-url', default='sqlite:///:memory:')
+    parser.add_argument('--json', action='store_true', help="Print the raw results as JSON")
+    args = parser.parse_args()
+
+    env = dict(os.environ, DATABASE_URL=args.database_url)
+    samples = []
+    modules = {}
+    for _ in range(args.runs):
+        timings, run_modules = run_once(env)
+        samples.append(timings)
+        for name, cumulative_ms in run_modules.items():
+            modules.setdefault(name, []).append(cumulative_ms)
+
+    medians = {name: statistics.median(values) for name, values in modules.items()}
+    report = {
+        "runs": args.runs,
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "create_app_ms": round(statistics.median(s["create_app_ms"] for s in samples), 1),
+        "total_ms": round(statistics.median(s["import_ms"] + s["create_app_ms"] for s in samples), 1),
+        "modules_imported": len(medians),
+        "slowest_imports": sorted(
+            ({"module": name, "cumulative_ms": round(ms, 1)} for name, ms in top_level(medians).items()),
+            key=lambda row: row["cumulative_ms"], reverse=True
+        )[:args.top]
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Median of {args.runs} cold starts")
+    print(f"  import app.main : {report['import_ms']:8.1f} ms")
+    print(f"  create_app()    : {report['create_app_ms']:8.1f} ms")
+    print(f"  total           : {report['total_ms']:8.1f} ms ({report['modules_imported']} modules)")
+    print("\nSlowest imports (cumulative, top-level package)")
+    for row in report["slowest_imports"]:
+        print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Measure what request-body validation adds to a request.
+
+For each validated payload, times the @validate_json wrapper around a view that does
+nothing, against the same view undecorated, inside a request context: that is the cost
+of checking the body (Flask parses the JSON once per request either way). Also times
+building the schema on every request instead of once, and a full POST /api/recipes
+through the test client for scale.
+
+Usage:
+    python benchmarks/bench_validation.py [--iterations 20000] [--requests 500]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from marshmallow import ValidationError
+
+from app.config import Config
+from app.main import create_app
+from app.extensions import db
+from app.schemas.comment_schema import CommentSchema
+from app.schemas.rating_schema import RatingSchema
+from app.schemas.recipe_schema import RecipeSchema
+from app.utils.decorators import compile_schema, validate_json
+
+RECIPE_FIELDS = (
+    'title', 'description', 'ingredients', 'instructions', 'country', 'image_url', 'serving_size', 'group_id'
+)
+RECIPE = {
+    "title": "Weeknight Dal",
+    "description": "A quick red lentil dal with a tempered spice oil. " * 4,
+    "ingredients": "200g red lentils, 1 onion, 2 garlic cloves, 1 tsp cumin seeds, 1 tsp turmeric, "
+                   "400ml water, 2 tbsp ghee, salt",
+    "instructions": "Rinse the lentils. Simmer with turmeric and water until soft. " * 12,
+    "country": "India",
+    "serving_size": 4,
+    "group_id": 0,
+}
+
+CASES = [
+    ("rating", RatingSchema, ('value',), {"value": 4}),
+    ("comment", CommentSchema, ('text', 'recipe_id'), {"recipe_id": 17, "text": "Made this twice already. " * 8}),
+    ("recipe", RecipeSchema, RECIPE_FIELDS, RECIPE),
+    ("recipe, 3 bad fields", RecipeSchema, RECIPE_FIELDS,
+     dict(RECIPE, title="x" * 101, serving_size="four", group_id=-1)),
+]
+
+def noop(data=None):
+    return None
+
+def time_per_call(fn, iterations):
+    """Median of five runs, in microseconds per call"""
+    runs = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        runs.append((time.perf_counter() - start) / iterations * 1e6)
+    return statistics.median(runs)
+
+def validation_costs(app, iterations):
+    rows = []
+    for name, schema_class, only, payload in CASES:
+        validated = validate_json(schema_class, only=only)(noop)
+
+        def rebuilt():
+            try:
+                compile_schema(schema_class, only).load(payload)
+            except ValidationError:
+                pass
+
+        with app.test_request_context('/', method='POST', json=payload):
+            bare = time_per_call(noop, iterations)
+            decorated = time_per_call(validated, iterations)
+            per_request_schema = time_per_call(rebuilt, max(iterations // 20, 100))
+        rows.append((name, decorated - bare, per_request_schema))
+    return rows
+
+def create_recipe_latency(app, requests):
+    client = app.test_client()
+    credentials = {"username": "bench_user", "password": "correct horse battery staple"}
+    client.post('/api/auth/register', json=dict(credentials, email="bench@example.com"))
+    token = client.post('/api/auth/login', json=credentials).get_json()['token']
+    headers = {"Authorization": f"Bearer {token}"}
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.post('/api/recipes', json=RECIPE, headers=headers)
+        timings.append((time.perf_counter() - start) * 1e6)
+        assert response.status_code == 201, response.get_json()
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    print("🧾 Request Validation Benchmark")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            RATELIMIT_ENABLED = False
+            PASSWORD_HASH_SCHEME = 'pbkdf2'
+            METRICS_ENABLED = False
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+
+        rows = validation_costs(app, args.iterations)
+        full_request = create_recipe_latency(app, args.requests)
+
+    print(f"{'payload':<22} {'validation':>12} {'schema per request':>20}")
+    for name, overhead, per_request_schema in rows:
+        print(f"{name:<22} {overhead:>10.1f}µs {per_request_schema:>18.1f}µs")
+    print(f"\nPOST /api/recipes end to end (median of {args.requests}): {full_request:.0f}µs")
+    recipe_overhead = next(overhead for name, overhead, _ in rows if name == "recipe")
+    print(f"Validation share of that request: {recipe_overhead / full_request:.1%}")
+
+if __name__ == "__main__":
+    main()
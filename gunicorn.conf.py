@@ -0,0 +1,53 @@
+# Gunicorn settings, loaded automatically from the working directory
+import multiprocessing
+import os
+import shutil
+
+# sync: one request per worker process. gthread: a thread pool per worker.
+# gevent: cooperative greenlets, so requests waiting on Postgres, Cloudinary or an SSE
+# stream no longer pin a worker. Views stay synchronous in every mode.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# Async workers multiplex connections, so one per core is enough; blocking workers need spares
+_default_workers = multiprocessing.cpu_count() if worker_class == 'gevent' else multiprocessing.cpu_count() * 2 + 1
+workers = int(os.getenv('GUNICORN_WORKERS', _default_workers))
+threads = int(os.getenv('GUNICORN_THREADS', 8))  # gthread only
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))  # gevent only
+
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers periodically; the jitter keeps them from all restarting at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG')  # '-' for stdout
+
+# prometheus_client writes per-worker samples here so /metrics can aggregate every worker
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/recipe_room_metrics')
+
+
+def on_starting(server):
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        # psycopg2 is a C extension that gevent cannot monkey-patch; make it yield while
+        # waiting on the server so one slow query does not stall every greenlet in the worker
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            server.log.warning("psycogreen is not installed; Postgres queries will block gevent workers")
+        else:
+            patch_psycopg()
+
+
+def child_exit(server, worker):
+    from app.utils.metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
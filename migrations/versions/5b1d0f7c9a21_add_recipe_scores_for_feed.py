@@ -0,0 +1,60 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1d0f7c9a21'
+down_revision = 'ca02473953e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    
+    op.create_table('recipe_scores',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('comment_count', sa.Integer(), nullable=False),
+    sa.Column('bookmark_count', sa.Integer(), nullable=False),
+    sa.Column('top_score', sa.Float(), nullable=False),
+    sa.Column('trending_score', sa.Float(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ),
+    sa.PrimaryKeyConstraint('recipe_id')
+    )
+    with op.batch_alter_table('recipe_scores', schema=None) as batch_op:
+        batch_op.create_index('ix_recipe_scores_trending', ['trending_score', 'recipe_id'], unique=False)
+        batch_op.create_index('ix_recipe_scores_top', ['top_score', 'recipe_id'], unique=False)
+
+    op.create_table('score_watermarks',
+    sa.Column('source', sa.String(length=50), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+    with op.batch_alter_table('bookmarks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True))
+
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.create_index('ix_recipes_created_at_id', ['created_at', 'id'], unique=False)
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipes_created_at_id')
+
+    with op.batch_alter_table('bookmarks', schema=None) as batch_op:
+        batch_op.drop_column('created_at')
+
+    op.drop_table('score_watermarks')
+    with op.batch_alter_table('recipe_scores', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipe_scores_top')
+        batch_op.drop_index('ix_recipe_scores_trending')
+
+    op.drop_table('recipe_scores')
+    # ### end Alembic commands ###
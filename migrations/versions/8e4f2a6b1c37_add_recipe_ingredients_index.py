@@ -0,0 +1,32 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4f2a6b1c37'
+down_revision = '5b1d0f7c9a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Populate with `flask ingredients backfill` after upgrading
+    op.create_table('recipe_ingredients',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ),
+    sa.PrimaryKeyConstraint('recipe_id', 'name')
+    )
+    with op.batch_alter_table('recipe_ingredients', schema=None) as batch_op:
+        batch_op.create_index('ix_recipe_ingredients_name_recipe', ['name', 'recipe_id'], unique=False)
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    
+    with op.batch_alter_table('recipe_ingredients', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipe_ingredients_name_recipe')
+
+    op.drop_table('recipe_ingredients')
+    # ### end Alembic commands ###
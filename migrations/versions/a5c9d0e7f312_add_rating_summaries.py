@@ -0,0 +1,48 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c9d0e7f312'
+down_revision = 'f1b6e2d84a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    
+    op.create_table('rating_summaries',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('stars_1', sa.Integer(), nullable=False),
+    sa.Column('stars_2', sa.Integer(), nullable=False),
+    sa.Column('stars_3', sa.Integer(), nullable=False),
+    sa.Column('stars_4', sa.Integer(), nullable=False),
+    sa.Column('stars_5', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ),
+    sa.PrimaryKeyConstraint('recipe_id')
+    )
+
+    # Backfill from existing ratings; `flask ratings check` verifies the result
+    op.execute("""
+        INSERT INTO rating_summaries (recipe_id, stars_1, stars_2, stars_3, stars_4, stars_5, rating_count, rating_sum, updated_at)
+        SELECT recipe_id,
+               SUM(CASE WHEN value = 1 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN value = 2 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN value = 3 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN value = 4 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN value = 5 THEN 1 ELSE 0 END),
+               COUNT(*), SUM(value), CURRENT_TIMESTAMP
+        FROM ratings
+        WHERE value BETWEEN 1 AND 5
+        GROUP BY recipe_id
+    """)
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    
+    op.drop_table('rating_summaries')
+    # ### end Alembic commands ###
@@ -0,0 +1,27 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4f9e2c7d816'
+down_revision = 'a8e3c6f1d250'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Replaces the per-table max(id) watermarks; run `flask feed refresh --full` once afterwards
+    op.create_table('dirty_recipe_scores',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('marked_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("DELETE FROM score_watermarks WHERE source IN ('recipes', 'ratings', 'comments', 'bookmarks')")
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    
+    op.drop_table('dirty_recipe_scores')
+    # ### end Alembic commands ###
@@ -0,0 +1,25 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3f9a1c465'
+down_revision = 'a5c9d0e7f312'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.create_index('ix_recipes_group_created_at', ['group_id', 'created_at', 'id'], unique=False)
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipes_group_created_at')
+
+    # ### end Alembic commands ###
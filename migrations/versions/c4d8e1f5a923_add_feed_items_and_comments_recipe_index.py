@@ -0,0 +1,37 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8e1f5a923'
+down_revision = 'b7e3f9a1c465'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only used with MY_FEED_FANOUT=true; fill it with `flask feed inbox` before turning that on
+    op.create_table('feed_items',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'kind', 'item_id')
+    )
+    op.create_index('ix_feed_items_user_created_at', 'feed_items', ['user_id', 'created_at', 'kind', 'item_id'], unique=False)
+    op.create_index('ix_feed_items_group_user', 'feed_items', ['group_id', 'user_id'], unique=False)
+    op.create_index('ix_feed_items_recipe_id', 'feed_items', ['recipe_id'], unique=False)
+    op.create_index('ix_comments_recipe_created_at', 'comments', ['recipe_id', 'created_at', 'id'], unique=False)
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    
+    op.drop_index('ix_comments_recipe_created_at', table_name='comments')
+    op.drop_index('ix_feed_items_recipe_id', table_name='feed_items')
+    op.drop_index('ix_feed_items_group_user', table_name='feed_items')
+    op.drop_index('ix_feed_items_user_created_at', table_name='feed_items')
+    op.drop_table('feed_items')
+    # ### end Alembic commands ###
@@ -0,0 +1,38 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a7c51e9b04'
+down_revision = '8e4f2a6b1c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Populate with `flask feed facets` after upgrading; until then facets are counted live
+    op.create_table('recipe_facet_counts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('country', sa.String(length=50), nullable=True),
+    sa.Column('serving_size', sa.Integer(), nullable=True),
+    sa.Column('group_id', sa.Integer(), nullable=True),
+    sa.Column('rating_bucket', sa.Integer(), nullable=True),
+    sa.Column('recipe_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.create_index('ix_recipes_country', ['country'], unique=False)
+        batch_op.create_index('ix_recipes_serving_size', ['serving_size'], unique=False)
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipes_serving_size')
+        batch_op.drop_index('ix_recipes_country')
+
+    op.drop_table('recipe_facet_counts')
+    # ### end Alembic commands ###
@@ -0,0 +1,54 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9c7f40b18'
+down_revision = 'c4d8e1f5a923'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_recipes_deleted_at', ['deleted_at'], unique=False)
+
+    with op.batch_alter_table('groups', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_groups_deleted_at', ['deleted_at'], unique=False)
+
+    # The purge job deletes children by parent id
+    with op.batch_alter_table('ratings', schema=None) as batch_op:
+        batch_op.create_index('ix_ratings_recipe_id', ['recipe_id'], unique=False)
+
+    with op.batch_alter_table('bookmarks', schema=None) as batch_op:
+        batch_op.create_index('ix_bookmarks_recipe_id', ['recipe_id'], unique=False)
+
+    with op.batch_alter_table('group_members', schema=None) as batch_op:
+        batch_op.create_index('ix_group_members_group_id', ['group_id'], unique=False)
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    
+    with op.batch_alter_table('group_members', schema=None) as batch_op:
+        batch_op.drop_index('ix_group_members_group_id')
+
+    with op.batch_alter_table('bookmarks', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookmarks_recipe_id')
+
+    with op.batch_alter_table('ratings', schema=None) as batch_op:
+        batch_op.drop_index('ix_ratings_recipe_id')
+
+    with op.batch_alter_table('groups', schema=None) as batch_op:
+        batch_op.drop_index('ix_groups_deleted_at')
+        batch_op.drop_column('deleted_at')
+
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipes_deleted_at')
+        batch_op.drop_column('deleted_at')
+
+    # ### end Alembic commands ###
@@ -0,0 +1,26 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b6e2d84a57'
+down_revision = 'd3a7c51e9b04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Populate with `flask recommendations build` after upgrading
+    op.create_table('related_recipes',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('related_recipe_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('recipe_id', 'related_recipe_id')
+    )
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    
+    op.drop_table('related_recipes')
+    # ### end Alembic commands ###
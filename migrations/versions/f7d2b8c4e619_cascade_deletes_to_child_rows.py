@@ -0,0 +1,48 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7d2b8c4e619'
+down_revision = 'e2a9c7f40b18'
+branch_labels = None
+depends_on = None
+
+# The foreign keys were created unnamed; this matches the names Postgres gave them
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+# (table, column, referenced table, ON DELETE action)
+CASCADES = (
+    ('ratings', 'recipe_id', 'recipes', 'CASCADE'),
+    ('comments', 'recipe_id', 'recipes', 'CASCADE'),
+    ('bookmarks', 'recipe_id', 'recipes', 'CASCADE'),
+    ('recipe_ingredients', 'recipe_id', 'recipes', 'CASCADE'),
+    ('recipe_scores', 'recipe_id', 'recipes', 'CASCADE'),
+    ('rating_summaries', 'recipe_id', 'recipes', 'CASCADE'),
+    ('group_members', 'group_id', 'groups', 'CASCADE'),
+    ('recipes', 'group_id', 'groups', 'SET NULL'),
+)
+
+
+def _replace_foreign_key(table, column, referent, ondelete):
+    name = f'{table}_{column}_fkey'
+    with op.batch_alter_table(table, schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_='foreignkey')
+        batch_op.create_foreign_key(name, referent, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    
+    # Deleting a recipe or group becomes one statement: the database removes its children
+    for table, column, referent, ondelete in CASCADES:
+        _replace_foreign_key(table, column, referent, ondelete)
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    
+    for table, column, referent, _ in reversed(CASCADES):
+        _replace_foreign_key(table, column, referent, None)
+
+    # ### end Alembic commands ###
@@ -18,7 +18,29 @@ def run_tests():
         "test_all_endpoints.py",
         "test_image_uploads.py",
         "test_comments.py",
-        "test_bookmarks.py"
+        "test_bookmarks.py",
+        "test_events.py",
+        "test_rate_limit.py",
+        "test_auth.py",
+        "test_group_permissions.py",
+        "test_query_stats.py",
+        "test_metrics.py",
+        "test_profiler.py",
+        "test_feed.py",
+        "test_ingredient_search.py",
+        "test_recipe_facets.py",
+        "test_similar_recipes.py",
+        "test_recommendations.py",
+        "test_rating_distribution.py",
+        "test_recipe_batch.py",
+        "test_group_feed.py",
+        "test_my_feed.py",
+        "test_soft_delete.py",
+        "test_delete_queries.py",
+        "test_request_validation.py",
+        "test_feed_jobs.py",
+        "test_password_hasher.py",
+        "test_purge_queries.py"
     ]
     
     print(f"\nFound {len(test_files)} test files:")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def test_profile_reflects_updates():
+    """Test that the cached current user is refreshed after a profile update"""
+    print("=== Testing Profile Cache Invalidation ===")
+
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"profile_user_{suffix}",
+        "email": f"profile_{suffix}@example.com",
+        "password": "password123"
+    }
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+    response = requests.get(f"{BASE_URL}/auth/profile", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == user_data["username"]
+    print("✓ Get profile: PASS")
+
+    new_username = f"renamed_{suffix}"
+    response = requests.put(f"{BASE_URL}/auth/profile", headers=headers, json={"username": new_username})
+    assert response.status_code == 200
+    assert response.json()["user"]["username"] == new_username
+    print("✓ Update profile: PASS")
+
+    response = requests.get(f"{BASE_URL}/auth/profile", headers=headers)
+    assert response.json()["username"] == new_username
+    print("✓ Profile reflects update: PASS")
+
+def main():
+    test_profile_reflects_updates()
+
+if __name__ == "__main__":
+    main()
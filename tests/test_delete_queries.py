@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def register_and_login_user(prefix):
+    """Register a throwaway user and return auth headers"""
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"{prefix}_{suffix}",
+        "email": f"{prefix}_{suffix}@example.com",
+        "password": "password123"
+    }
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def create_recipe(headers, title):
+    response = requests.post(f"{BASE_URL}/recipes", headers=headers, json={
+        "title": title,
+        "description": "Deleted by the test",
+        "ingredients": "lentils",
+        "instructions": "Simmer"
+    })
+    assert response.status_code == 201
+    return response.json()["recipe_id"]
+
+def create_group(headers, name):
+    response = requests.post(f"{BASE_URL}/groups", headers=headers, json={
+        "name": f"{name} {os.urandom(3).hex()}",
+        "description": "Deleted by the test"
+    })
+    assert response.status_code == 201
+    return response.json()["group_id"]
+
+def delete_query_count(url, headers):
+    response = requests.delete(url, headers=headers)
+    assert response.status_code == 200
+    return int(response.headers["X-Query-Count"])
+
+def test_recipe_delete_ignores_children():
+    """Test that deleting a recipe costs the same with or without ratings, comments and bookmarks"""
+    print("=== Testing Recipe Delete Query Count ===")
+
+    headers = register_and_login_user("delqueries")
+    empty_id = create_recipe(headers, "Lonely Lentils")
+    busy_id = create_recipe(headers, "Popular Lentils")
+    for _ in range(3):
+        fan_headers = register_and_login_user("delfan")
+        assert requests.post(f"{BASE_URL}/recipes/{busy_id}/rate", headers=fan_headers, json={"value": 5}).status_code in (200, 201)
+        assert requests.post(f"{BASE_URL}/bookmarks", headers=fan_headers, json={"recipe_id": busy_id}).status_code == 201
+        for text in ("Lovely", "Again please"):
+            response = requests.post(f"{BASE_URL}/comments/", headers=fan_headers, json={"text": text, "recipe_id": busy_id})
+            assert response.status_code == 201
+
+    empty_count = delete_query_count(f"{BASE_URL}/recipes/{empty_id}", headers)
+    busy_count = delete_query_count(f"{BASE_URL}/recipes/{busy_id}", headers)
+    print(f"Deleting a recipe ran {empty_count} queries without children, {busy_count} with 12")
+    assert busy_count == empty_count
+    print("✓ Recipe delete independent of fan-out: PASS")
+
+def test_group_delete_ignores_members():
+    """Test that deleting a group costs the same with one member or many"""
+    print("=== Testing Group Delete Query Count ===")
+
+    headers = register_and_login_user("delgroup")
+    empty_id = create_group(headers, "Quiet Group")
+    busy_id = create_group(headers, "Busy Group")
+    for _ in range(3):
+        member_headers = register_and_login_user("delmember")
+        assert requests.post(f"{BASE_URL}/groups/{busy_id}/join", headers=member_headers).status_code in (200, 201)
+
+    empty_count = delete_query_count(f"{BASE_URL}/groups/{empty_id}", headers)
+    busy_count = delete_query_count(f"{BASE_URL}/groups/{busy_id}", headers)
+    print(f"Deleting a group ran {empty_count} queries with 1 member, {busy_count} with 4")
+    assert busy_count == empty_count
+    print("✓ Group delete independent of members: PASS")
+
+def main():
+    test_recipe_delete_ignores_children()
+    test_group_delete_ignores_members()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+import time
+import requests
+from sqlalchemy.engine import make_url
+
+from app.utils.events import PG_NOTIFY_MAX_BYTES, Subscription, libpq_url, notify_payload
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def register_and_login_user():
+    """Register a throwaway user and return its JWT token"""
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"sse_user_{suffix}",
+        "email": f"sse_{suffix}@example.com",
+        "password": "password123"
+    }
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    return response.json()["token"]
+
+def read_events(response, events, expected):
+    """Collect SSE events from a streaming response"""
+    event = {}
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event["event"] = line[len("event: "):]
+        elif line.startswith("data: "):
+            event["data"] = json.loads(line[len("data: "):])
+        elif line == "" and event:
+            events.append(event)
+            event = {}
+            if len(events) >= expected:
+                return
+
+def test_recipe_event_stream():
+    """Test that comments and ratings are pushed to recipe stream subscribers"""
+    print("=== Testing Recipe Event Stream ===")
+
+    token = register_and_login_user()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = requests.post(f"{BASE_URL}/recipes", headers=headers, json={
+        "title": "Streamed Recipe",
+        "description": "Recipe used to test live events",
+        "ingredients": "Flour, water",
+        "instructions": "Mix and bake"
+    })
+    recipe_id = response.json()["recipe_id"]
+
+    stream = requests.get(f"{BASE_URL}/recipes/{recipe_id}/stream", stream=True, timeout=10)
+    assert stream.status_code == 200
+    assert stream.headers["Content-Type"].startswith("text/event-stream")
+
+    events = []
+    reader = threading.Thread(target=read_events, args=(stream, events, 2), daemon=True)
+    reader.start()
+    time.sleep(0.5)
+
+    requests.post(f"{BASE_URL}/comments/", headers=headers, json={
+        "text": "Live comment",
+        "recipe_id": recipe_id
+    })
+    requests.post(f"{BASE_URL}/recipes/{recipe_id}/rate", headers=headers, json={"value": 4})
+
+    reader.join(timeout=5)
+    stream.close()
+
+    names = [event["event"] for event in events]
+    print(f"Received events: {names}")
+    assert names == ["comment_created", "rating_created"]
+    assert events[0]["data"]["text"] == "Live comment"
+    assert events[1]["data"]["average_rating"] == 4.0
+    print("✓ Recipe event stream: PASS")
+
+    # Unknown recipes are rejected before a stream is opened
+    response = requests.get(f"{BASE_URL}/recipes/999999/stream")
+    assert response.status_code == 404
+    print("✓ Unknown recipe stream: PASS")
+
+def test_notify_payload_fits():
+    """Test that Postgres notifications stay under the NOTIFY limit and connect through libpq"""
+    print("=== Testing Postgres Event Payloads ===")
+
+    comment = {"id": 7, "recipe_id": 3, "text": "é" * 2000, "user": {"id": 1, "username": "chef"}}
+    payload = notify_payload({"channel": "recipe:3", "event": "comment_created", "data": comment})
+    assert len(payload.encode('utf-8')) < PG_NOTIFY_MAX_BYTES
+    assert json.loads(payload)["data"] == comment
+    print("✓ Longest non-ASCII comment sent whole: PASS")
+
+    comment["text"] = "字" * 4000
+    payload = notify_payload({"channel": "recipe:3", "event": "comment_created", "data": comment})
+    assert len(payload.encode('utf-8')) < PG_NOTIFY_MAX_BYTES
+    assert json.loads(payload)["data"] == {"id": 7, "recipe_id": 3, "truncated": True}
+    print("✓ Oversized event reduced to its ids: PASS")
+
+    url = make_url("postgresql+psycopg2://chef:s3cret@db:5432/recipes")
+    assert libpq_url(url) == "postgresql://chef:s3cret@db:5432/recipes"
+    print("✓ SQLAlchemy URL converted for psycopg2: PASS")
+
+def test_concurrent_puts_on_full_queue():
+    """Test that publishers racing on a slow client's full queue never raise"""
+    print("=== Testing Concurrent Event Delivery ===")
+
+    subscription = Subscription("recipe:1", maxsize=1)
+    errors = []
+
+    def publish(n):
+        try:
+            for i in range(5000):
+                subscription.put({"n": n, "i": i})
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=publish, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+    assert subscription.get(timeout=0) is not None
+    print("✓ Oldest message dropped without errors: PASS")
+
+def main():
+    test_recipe_event_stream()
+    test_notify_payload_fits()
+    test_concurrent_puts_on_full_queue()
+
+if __name__ == "__main__":
+    main()
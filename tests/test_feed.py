@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def test_feed_pagination():
+    """Test that the newest-first feed pages with a cursor and never repeats a recipe"""
+    print("=== Testing Recipe Feed ===")
+
+    first = requests.get(f"{BASE_URL}/recipes/feed", params={"sort": "new", "limit": 2})
+    assert first.status_code == 200
+    page = first.json()
+    print(f"First page: {[recipe['id'] for recipe in page['recipes']]}")
+    assert len(page["recipes"]) <= 2
+
+    if page["next_cursor"]:
+        second = requests.get(f"{BASE_URL}/recipes/feed", params={"sort": "new", "limit": 2, "cursor": page["next_cursor"]})
+        assert second.status_code == 200
+        first_ids = {recipe["id"] for recipe in page["recipes"]}
+        assert not first_ids & {recipe["id"] for recipe in second.json()["recipes"]}
+    print("✓ Keyset pagination: PASS")
+
+    for sort in ("trending", "top"):
+        response = requests.get(f"{BASE_URL}/recipes/feed", params={"sort": sort})
+        assert response.status_code == 200
+        assert "recipes" in response.json()
+    print("✓ Ranked feeds: PASS")
+
+def test_feed_rejects_bad_input():
+    """Test that unknown sorts and tampered cursors are client errors"""
+    response = requests.get(f"{BASE_URL}/recipes/feed", params={"sort": "random"})
+    assert response.status_code == 400
+
+    response = requests.get(f"{BASE_URL}/recipes/feed", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    print("✓ Invalid sort and cursor rejected: PASS")
+
+def main():
+    test_feed_pagination()
+    test_feed_rejects_bad_input()
+
+if __name__ == "__main__":
+    main()
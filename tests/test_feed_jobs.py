@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+
+from app.config import Config
+from app.main import create_app
+from app.extensions import db
+from app.models.comment import Comment
+from app.models.feed_item import FeedItem
+from app.models.group import Group
+from app.models.group_member import GroupMember
+from app.models.rating import Rating
+from app.models.recipe import Recipe
+from app.models.recipe_score import RecipeScore
+from app.models.user import User
+from app.utils import activity_feed
+from app.utils.ranking import refresh_scores
+
+def build_app(database_path):
+    class FeedJobsConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database_path}"
+        MY_FEED_FANOUT = True
+        METRICS_ENABLED = False
+
+    app = create_app(FeedJobsConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+def join_then_comment(suffix):
+    """A group with a recipe, a member who just joined, and a comment made right after"""
+    owner = User(username=f"owner_{suffix}", email=f"owner_{suffix}@example.com")
+    joiner = User(username=f"joiner_{suffix}", email=f"joiner_{suffix}@example.com")
+    group = Group(name=f"Feed Jobs {suffix}")
+    db.session.add_all([owner, joiner, group])
+    db.session.flush()
+    recipe = Recipe(title="Shared Stew", description="Fanned out", ingredients="beans",
+                    instructions="Simmer", user_id=owner.id, group_id=group.id)
+    db.session.add_all([
+        recipe,
+        GroupMember(user_id=owner.id, group_id=group.id, is_admin=True),
+        GroupMember(user_id=joiner.id, group_id=group.id)
+    ])
+    db.session.flush()
+    comment = Comment(text="Welcome!", user_id=owner.id, recipe_id=recipe.id)
+    db.session.add(comment)
+    db.session.commit()
+    return joiner.id, group.id, comment.id
+
+def inbox(user_id):
+    return sorted(db.session.execute(
+        db.select(FeedItem.kind, FeedItem.item_id).where(FeedItem.user_id == user_id)
+    ).all())
+
+def run(job, **kwargs):
+    job(**kwargs)
+    db.session.commit()
+
+def test_fan_out_jobs_overlap_in_either_order():
+    """Test that a join backfill and a comment fan-out both succeed whichever runs first"""
+    print("=== Testing Overlapping Feed Jobs ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'feed_jobs.db'))
+        with app.app_context():
+            for order in ("backfill first", "comment first"):
+                user_id, group_id, comment_id = join_then_comment(order.split()[0])
+                jobs = [
+                    (activity_feed.member_joined, {"user_id": user_id, "group_id": group_id}),
+                    (activity_feed.fan_out_comment, {"comment_id": comment_id})
+                ]
+                if order == "comment first":
+                    jobs.reverse()
+                for job, kwargs in jobs:
+                    run(job, **kwargs)
+                items = inbox(user_id)
+                assert ('comment', comment_id) in items, items
+
+                # A retry or a job re-claimed after its lease runs again
+                for job, kwargs in jobs:
+                    run(job, **kwargs)
+                assert inbox(user_id) == items
+                print(f"✓ {order.capitalize()}, then both again: PASS")
+            db.session.remove()
+
+def test_refresh_sees_late_commits_and_deletes():
+    """Test that incremental refreshes pick up a rating committed with a lower id, and a removal"""
+    print("=== Testing Incremental Score Refresh ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'refresh.db'))
+        with app.app_context():
+            users = [User(username=f"rater_{n}", email=f"rater_{n}@example.com") for n in range(3)]
+            db.session.add_all(users)
+            db.session.flush()
+            recipe = Recipe(title="Rescored Risotto", description="Scored", ingredients="rice",
+                            instructions="Stir", user_id=users[0].id)
+            db.session.add(recipe)
+            db.session.flush()
+            # A later transaction commits the higher id first, as Postgres sequences allow
+            db.session.add(Rating(id=100, user_id=users[1].id, recipe_id=recipe.id, value=5))
+            db.session.commit()
+            refresh_scores()
+            assert db.session.get(RecipeScore, recipe.id).rating_count == 1
+
+            db.session.add(Rating(id=50, user_id=users[2].id, recipe_id=recipe.id, value=3))
+            db.session.commit()
+            refresh_scores()
+            assert db.session.get(RecipeScore, recipe.id).rating_sum == 8
+            print("✓ Rating committed below the highest id: PASS")
+
+            db.session.delete(db.session.get(Rating, 100))
+            db.session.commit()
+            refresh_scores()
+            score = db.session.get(RecipeScore, recipe.id)
+            assert (score.rating_count, score.rating_sum) == (1, 3)
+            print("✓ Removed rating lowers the score: PASS")
+            db.session.remove()
+
+def main():
+    test_fan_out_jobs_overlap_in_either_order()
+    test_refresh_sees_late_commits_and_deletes()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def register_and_login_user(prefix):
+    """Register a throwaway user and return auth headers"""
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"{prefix}_{suffix}",
+        "email": f"{prefix}_{suffix}@example.com",
+        "password": "password123"
+    }
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def test_group_feed_pagination():
+    """Test that a group's recipes page newest first as cards without repeating"""
+    print("=== Testing Group Recipe Feed ===")
+
+    headers = register_and_login_user("groupcook")
+    response = requests.post(f"{BASE_URL}/groups", headers=headers, json={
+        "name": f"Feed Group {os.urandom(3).hex()}",
+        "description": "Paging test"
+    })
+    assert response.status_code == 201
+    group_id = response.json()["group_id"]
+
+    empty = requests.get(f"{BASE_URL}/groups/{group_id}/recipes", headers=headers)
+    assert empty.status_code == 200
+    assert empty.json()["recipes"] == [] and empty.json()["next_cursor"] is None
+    print("✓ Empty group: PASS")
+
+    created = []
+    for i in range(3):
+        response = requests.post(f"{BASE_URL}/recipes", headers=headers, json={
+            "title": f"Group Dish {i}",
+            "description": "Shared with the group",
+            "ingredients": "rice",
+            "instructions": "Cook",
+            "group_id": group_id
+        })
+        assert response.status_code == 201
+        created.append(response.json()["recipe_id"])
+
+    first = requests.get(f"{BASE_URL}/groups/{group_id}/recipes", headers=headers, params={"limit": 2}).json()
+    assert len(first["recipes"]) == 2 and first["next_cursor"]
+    assert "instructions" not in first["recipes"][0]
+    second = requests.get(f"{BASE_URL}/groups/{group_id}/recipes", headers=headers, params={
+        "limit": 2, "cursor": first["next_cursor"]
+    }).json()
+    paged = [recipe["id"] for recipe in first["recipes"] + second["recipes"]]
+    print(f"Paged ids: {paged}")
+    assert sorted(paged) == sorted(created) and len(set(paged)) == 3
+    assert second["next_cursor"] is None
+    print("✓ Keyset pages of recipe cards: PASS")
+
+def main():
+    test_group_feed_pagination()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def register_and_login_user(prefix):
+    """Register a throwaway user and return (user_id, auth headers)"""
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"{prefix}_{suffix}",
+        "email": f"{prefix}_{suffix}@example.com",
+        "password": "password123"
+    }
+    user_id = requests.post(f"{BASE_URL}/auth/register", json=user_data).json()["id"]
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    return user_id, {"Authorization": f"Bearer {response.json()['token']}"}
+
+def test_membership_changes_apply_immediately():
+    """Test that cached group roles are invalidated by membership changes"""
+    print("=== Testing Group Role Cache Invalidation ===")
+
+    _, admin_headers = register_and_login_user("group_admin")
+    member_id, member_headers = register_and_login_user("group_member")
+
+    response = requests.post(f"{BASE_URL}/groups", headers=admin_headers, json={"name": "Cache Test Group"})
+    group_id = response.json()["group_id"]
+    recipes_url = f"{BASE_URL}/groups/{group_id}/recipes"
+
+    # Non-members are rejected (and the negative answer is cached)
+    assert requests.get(recipes_url, headers=member_headers).status_code == 403
+    print("✓ Non-member rejected: PASS")
+
+    requests.post(f"{BASE_URL}/groups/{group_id}/join", headers=member_headers)
+    assert requests.get(recipes_url, headers=member_headers).status_code == 200
+    print("✓ Access granted right after joining: PASS")
+
+    update_url = f"{BASE_URL}/groups/{group_id}"
+    assert requests.put(update_url, headers=member_headers, json={"name": "Renamed"}).status_code == 403
+
+    admin_url = f"{BASE_URL}/groups/{group_id}/members/{member_id}/admin"
+    requests.put(admin_url, headers=admin_headers, json={"is_admin": True})
+    assert requests.put(update_url, headers=member_headers, json={"name": "Renamed"}).status_code == 200
+    print("✓ Promotion applies immediately: PASS")
+
+    requests.put(admin_url, headers=admin_headers, json={"is_admin": False})
+    assert requests.put(update_url, headers=member_headers, json={"name": "Renamed again"}).status_code == 403
+    print("✓ Demotion applies immediately: PASS")
+
+    requests.delete(f"{BASE_URL}/groups/{group_id}/leave", headers=member_headers)
+    assert requests.get(recipes_url, headers=member_headers).status_code == 403
+    print("✓ Access revoked right after leaving: PASS")
+
+def main():
+    test_membership_changes_apply_immediately()
+
+if __name__ == "__main__":
+    main()
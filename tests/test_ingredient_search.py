@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def register_and_login_user(prefix):
+    """Register a throwaway user and return auth headers"""
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"{prefix}_{suffix}",
+        "email": f"{prefix}_{suffix}@example.com",
+        "password": "password123"
+    }
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def test_search_by_ingredients():
+    """Test include, exclude and max_missing over the normalized ingredient index"""
+    print("=== Testing Search By Ingredients ===")
+
+    headers = register_and_login_user("pantry")
+    marker = f"zaatar{os.urandom(3).hex()}"
+    response = requests.post(f"{BASE_URL}/recipes", headers=headers, json={
+        "title": "Pantry Chicken Rice",
+        "description": "Weeknight dinner",
+        "ingredients": f"2 Chicken Breasts, diced\n1 cup rice\n1 tbsp {marker}\n3 cloves garlic",
+        "instructions": "Cook everything together"
+    })
+    assert response.status_code == 201
+    recipe_id = response.json()["recipe_id"]
+
+    def search(**params):
+        response = requests.get(f"{BASE_URL}/recipes/by-ingredients", params=params)
+        assert response.status_code == 200
+        return {recipe["id"]: recipe for recipe in response.json()["recipes"]}
+
+    found = search(include=f"chicken,{marker}")
+    assert recipe_id in found
+    assert found[recipe_id]["missing_ingredients"] == []
+    print("✓ Include (normalized names): PASS")
+
+    assert recipe_id not in search(include=marker, exclude="garlic")
+    print("✓ Exclude: PASS")
+
+    assert recipe_id not in search(include=f"{marker},saffron")
+    found = search(include=f"{marker},saffron", max_missing=1)
+    assert found[recipe_id]["missing_ingredients"] == ["saffron"]
+    print("✓ Max missing: PASS")
+
+    # Updating the ingredients re-indexes the recipe
+    requests.put(f"{BASE_URL}/recipes/{recipe_id}", headers=headers, json={"ingredients": f"{marker}\nsaffron"})
+    assert recipe_id in search(include=f"{marker},saffron")
+    print("✓ Index kept in sync on update: PASS")
+
+    response = requests.get(f"{BASE_URL}/recipes/by-ingredients")
+    assert response.status_code == 400
+
+def main():
+    test_search_by_ingredients()
+
+if __name__ == "__main__":
+    main()
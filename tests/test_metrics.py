@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+
+import requests
+
+from app.config import Config
+from app.main import create_app
+
+# Configuration
+BASE_URL = "http://localhost:5003"
+
+def test_metrics_endpoint():
+    """Test that request latency and counters are exported for scraping"""
+    print("=== Testing Metrics Endpoint ===")
+
+    requests.get(f"{BASE_URL}/api/recipes/search", params={"query": "soup"})
+
+    response = requests.get(f"{BASE_URL}/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain")
+
+    body = response.text
+    assert 'http_request_duration_seconds_bucket{blueprint="recipe",endpoint="recipe.search_recipes"' in body
+    assert 'http_requests_total{blueprint="recipe",endpoint="recipe.search_recipes",method="GET",status="200"}' in body
+    assert 'http_request_db_queries_bucket' in body
+    assert 'db_pool_connections_checked_out' in body
+    print("✓ Metrics exposition: PASS")
+
+def test_metrics_needs_allowed_ip_or_token():
+    """Test that scrapers outside METRICS_ALLOWED_IPS need the bearer token"""
+    print("=== Testing Metrics Access ===")
+
+    class MetricsConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'metrics.db')}"
+        METRICS_ALLOWED_IPS = "127.0.0.1, 10.20.0.0/16"
+        METRICS_TOKEN = "scrape-secret"
+
+    client = create_app(MetricsConfig).test_client()
+    remote = lambda address: {"REMOTE_ADDR": address}
+    assert client.get("/metrics", environ_base=remote("127.0.0.1")).status_code == 200
+    assert client.get("/metrics", environ_base=remote("10.20.3.4")).status_code == 200
+    assert client.get("/metrics", environ_base=remote("203.0.113.9")).status_code == 403
+    print("✓ Allowlisted networks only: PASS")
+
+    wrong = {"Authorization": "Bearer guess"}
+    right = {"Authorization": "Bearer scrape-secret"}
+    assert client.get("/metrics", headers=wrong, environ_base=remote("203.0.113.9")).status_code == 403
+    assert client.get("/metrics", headers=right, environ_base=remote("203.0.113.9")).status_code == 200
+    print("✓ Bearer token from anywhere: PASS")
+
+def main():
+    test_metrics_endpoint()
+    test_metrics_needs_allowed_ip_or_token()
+
+if __name__ == "__main__":
+    main()
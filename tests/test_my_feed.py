@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def register_and_login_user(prefix):
+    """Register a throwaway user and return auth headers"""
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"{prefix}_{suffix}",
+        "email": f"{prefix}_{suffix}@example.com",
+        "password": "password123"
+    }
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def create_group_with_recipe(headers, title):
+    response = requests.post(f"{BASE_URL}/groups", headers=headers, json={
+        "name": f"My Feed Group {os.urandom(3).hex()}",
+        "description": "Cross-group feed test"
+    })
+    assert response.status_code == 201
+    group_id = response.json()["group_id"]
+    response = requests.post(f"{BASE_URL}/recipes", headers=headers, json={
+        "title": title,
+        "description": "Shared with the group",
+        "ingredients": "rice",
+        "instructions": "Cook",
+        "group_id": group_id
+    })
+    assert response.status_code == 201
+    return group_id, response.json()["recipe_id"]
+
+def test_my_feed():
+    """Test that /my-feed merges every group the user belongs to and nothing else"""
+    print("=== Testing Cross-Group Feed ===")
+
+    headers = register_and_login_user("feedreader")
+    outsider = register_and_login_user("feedoutsider")
+
+    empty = requests.get(f"{BASE_URL}/my-feed", headers=headers)
+    assert empty.status_code == 200
+    assert empty.json()["items"] == [] and empty.json()["next_cursor"] is None
+    print("✓ No groups, empty feed: PASS")
+
+    _, first_recipe = create_group_with_recipe(headers, "First Group Dish")
+    _, second_recipe = create_group_with_recipe(headers, "Second Group Dish")
+    _, hidden_recipe = create_group_with_recipe(outsider, "Someone Else's Dish")
+    response = requests.post(f"{BASE_URL}/comments/", headers=headers, json={
+        "text": "Made this twice", "recipe_id": first_recipe
+    })
+    assert response.status_code == 201
+    comment_id = response.json()["id"]
+
+    first = requests.get(f"{BASE_URL}/my-feed", headers=headers, params={"limit": 1}).json()
+    assert len(first["items"]) == 1 and first["next_cursor"]
+    second = requests.get(f"{BASE_URL}/my-feed", headers=headers, params={
+        "limit": 1, "cursor": first["next_cursor"]
+    }).json()
+    paged = [(item["type"], item["id"]) for item in first["items"] + second["items"]]
+    print(f"Paged items: {paged}")
+    assert sorted(paged) == sorted([("recipe", first_recipe), ("recipe", second_recipe)])
+    assert second["next_cursor"] is None
+    assert ("recipe", hidden_recipe) not in paged
+    print("✓ Recipes from both groups, keyset pages: PASS")
+
+    with_comments = requests.get(f"{BASE_URL}/my-feed", headers=headers, params={"include": "comments"}).json()
+    comments = [item for item in with_comments["items"] if item["type"] == "comment"]
+    assert [(item["id"], item["recipe_id"], item["text"]) for item in comments] == [(comment_id, first_recipe, "Made this twice")]
+    assert comments[0]["title"] == "First Group Dish"
+    print("✓ include=comments: PASS")
+
+    assert requests.get(f"{BASE_URL}/my-feed", headers=headers, params={"include": "ratings"}).status_code == 400
+    assert requests.get(f"{BASE_URL}/my-feed", headers=headers, params={"cursor": "not-a-cursor"}).status_code == 400
+    print("✓ Bad include and cursor rejected: PASS")
+
+def main():
+    test_my_feed()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import threading
+
+from app.utils import passwords
+from app.utils.passwords import PasswordHasher, PasswordHasherBusy
+
+def blocked_hasher(release):
+    """A hasher with one worker and one pending slot whose jobs wait on `release`"""
+    hasher = PasswordHasher()
+    hasher.max_workers = 1
+    hasher.max_pending = 1
+    hasher.timeout = 0.1
+    hasher.params['bcrypt_rounds'] = 4
+    hasher._slots = threading.BoundedSemaphore(hasher.max_pending)
+    original = passwords._hash
+
+    def slow_hash(*args):
+        release.wait(5)
+        return original(*args)
+
+    return hasher, slow_hash
+
+def test_timeout_is_busy_and_keeps_its_slot():
+    """Test that a hash over the timeout raises PasswordHasherBusy and holds its slot until it finishes"""
+    print("=== Testing Password Hashing Timeout ===")
+
+    release = threading.Event()
+    hasher, slow_hash = blocked_hasher(release)
+    try:
+        try:
+            hasher._run(slow_hash, 'bcrypt', 'secret', hasher.params)
+            assert False, "expected PasswordHasherBusy"
+        except PasswordHasherBusy:
+            print("✓ Timed-out hash raises PasswordHasherBusy: PASS")
+
+        # The first hash is still running, so the only slot is still taken
+        try:
+            hasher.hash('another')
+            assert False, "expected PasswordHasherBusy"
+        except PasswordHasherBusy:
+            print("✓ Running hash still counts against max_pending: PASS")
+
+        release.set()
+        hasher._get_executor().shutdown(wait=True)
+        assert hasher._slots.acquire(blocking=False)
+        hasher._slots.release()
+        print("✓ Slot is released once the hash finishes: PASS")
+    finally:
+        release.set()
+        hasher._shutdown_executor()
+
+def main():
+    test_timeout_is_busy_and_keeps_its_slot()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import time
+
+import greenlet
+import requests
+
+from app.utils.profiler import GreenletSampler
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def test_profiles_require_admin():
+    """Test that the slow-request report is not public"""
+    print("=== Testing Profiler Admin Endpoint ===")
+
+    response = requests.get(f"{BASE_URL}/admin/profiles")
+    assert response.status_code == 401
+    print("✓ Anonymous access rejected: PASS")
+
+    response = requests.get(f"{BASE_URL}/admin/profiles/../../etc/passwd")
+    assert response.status_code in (401, 404)
+    print("✓ Profile download rejected: PASS")
+
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+def parked_request():
+    greenlet.getcurrent().parent.switch()
+
+def sample(target, run, seconds=0.2):
+    sampler = GreenletSampler(0.002)
+    sampler._greenlet = target
+    sampler.enable()
+    run(seconds)
+    sampler.disable()
+    return {row["function"].rsplit('(', 1)[1].rstrip(')'): row for row in sampler.rows(50)}
+
+def test_greenlet_sampler():
+    """Test that the gevent stack sampler sees a request greenlet both running and parked"""
+    print("=== Testing Greenlet Stack Sampler ===")
+
+    rows = sample(greenlet.getcurrent(), spin)
+    assert rows["spin"]["samples"] > 10, rows
+    assert rows["spin"]["tottime_ms"] > 0
+    print("✓ Running greenlet sampled from its thread: PASS")
+
+    request = greenlet.greenlet(parked_request)
+    request.switch()
+    rows = sample(request, spin)
+    assert "parked_request" in rows and "spin" not in rows, rows
+    print("✓ Parked greenlet sampled from its own frame, not the thread's: PASS")
+
+def main():
+    test_profiles_require_admin()
+    test_greenlet_sampler()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.config import Config
+from app.main import create_app
+from app.extensions import db
+from app.models.bookmark import Bookmark
+from app.models.comment import Comment
+from app.models.rating import Rating
+from app.models.recipe import Recipe
+from app.models.user import User
+from app.utils.purge import purge_deleted
+from app.utils.soft_delete import soft_delete
+
+def build_app(database_path):
+    class PurgeQueriesConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database_path}"
+        METRICS_ENABLED = False
+
+    app = create_app(PurgeQueriesConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+@contextmanager
+def counted_queries():
+    """Count the SQL statements run on the engine inside the block"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+def make_recipe(owner, fans, title):
+    """A recipe with a rating, a bookmark and two comments from each fan"""
+    recipe = Recipe(title=title, description="Purged by the test", ingredients="lentils",
+                    instructions="Simmer", user_id=owner.id)
+    db.session.add(recipe)
+    db.session.flush()
+    for fan in fans:
+        db.session.add_all([
+            Rating(user_id=fan.id, recipe_id=recipe.id, value=5),
+            Bookmark(user_id=fan.id, recipe_id=recipe.id),
+            Comment(text="Lovely", user_id=fan.id, recipe_id=recipe.id),
+            Comment(text="Again please", user_id=fan.id, recipe_id=recipe.id)
+        ])
+    db.session.commit()
+    return recipe
+
+def children_of(recipe_id):
+    return sum(
+        db.session.scalar(db.select(db.func.count()).select_from(model).where(model.recipe_id == recipe_id))
+        for model in (Rating, Bookmark, Comment)
+    )
+
+def create_users(count):
+    users = [User(username=f"purge_{n}", email=f"purge_{n}@example.com") for n in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return users[0], users[1:]
+
+def orm_delete(recipe):
+    recipe_id = recipe.id
+    with counted_queries() as statements:
+        db.session.delete(recipe)
+        db.session.commit()
+    assert children_of(recipe_id) == 0
+    return len(statements)
+
+def purge(recipe):
+    recipe_id = recipe.id
+    soft_delete(recipe)
+    db.session.commit()
+    with counted_queries() as statements:
+        assert purge_deleted(grace_seconds=0)["recipes_purged"] == 1
+    assert children_of(recipe_id) == 0
+    return len(statements)
+
+def test_hard_delete_ignores_children():
+    """Test that hard-deleting a recipe costs the same with or without ratings, comments and bookmarks"""
+    print("=== Testing Hard Delete Query Count ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'purge_queries.db'))
+        with app.app_context():
+            owner, fans = create_users(4)
+            for name, delete in (("db.session.delete", orm_delete), ("purge_deleted", purge)):
+                empty_count = delete(make_recipe(owner, [], "Lonely Lentils"))
+                busy_count = delete(make_recipe(owner, fans, "Popular Lentils"))
+                print(f"{name} ran {empty_count} queries without children, {busy_count} with 12")
+                assert busy_count == empty_count
+                print(f"✓ {name} independent of fan-out: PASS")
+            db.session.remove()
+
+def main():
+    test_hard_delete_ignores_children()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+
+import requests
+
+from app.config import Config
+from app.main import create_app
+from app.extensions import db
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def test_query_stats_headers():
+    """Test that responses report per-request SQL statistics"""
+    print("=== Testing Query Statistics Headers ===")
+
+    response = requests.get(f"{BASE_URL}/recipes/search", params={"query": "pasta"})
+    assert response.status_code == 200
+
+    query_count = int(response.headers["X-Query-Count"])
+    print(f"Search ran {query_count} queries in {response.headers['X-Query-Time-Ms']}ms")
+    assert query_count <= 1
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    print("✓ Query statistics headers: PASS")
+
+def test_failed_statement_leaves_no_start_time():
+    """Test that a statement that raises does not leave its start time on the connection"""
+    print("=== Testing Failed Statement Timing ===")
+
+    class QueryStatsConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'query_stats.db')}"
+        METRICS_ENABLED = False
+
+    app = create_app(QueryStatsConfig)
+    with app.app_context(), db.engine.connect() as connection:
+        for _ in range(3):
+            try:
+                connection.exec_driver_sql("SELECT * FROM no_such_table")
+                assert False, "expected the statement to fail"
+            except db.exc.OperationalError:
+                pass
+        assert connection.info.get('query_start_time') == []
+        connection.exec_driver_sql("SELECT 1")
+        assert connection.info['query_start_time'] == []
+    print("✓ Failed statements pop their start time: PASS")
+
+def main():
+    test_query_stats_headers()
+    test_failed_statement_leaves_no_start_time()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def test_login_rate_limit_per_username():
+    """Test that repeated logins for one username are throttled with 429"""
+    print("=== Testing Login Rate Limiting ===")
+
+    login_url = f"{BASE_URL}/auth/login"
+    login_data = {
+        "username": f"stuffed_{os.urandom(4).hex()}",
+        "password": "wrong-password"
+    }
+
+    statuses = []
+    for _ in range(11):
+        response = requests.post(login_url, json=login_data)
+        statuses.append(response.status_code)
+
+    print(f"Login statuses: {statuses}")
+    assert statuses[:10] == [401] * 10
+    assert statuses[10] == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    print("✓ Per-username login throttling: PASS")
+
+    # Other usernames are unaffected by the exhausted bucket
+    response = requests.post(login_url, json={
+        "username": f"other_{os.urandom(4).hex()}",
+        "password": "wrong-password"
+    })
+    assert response.status_code == 401
+    print("✓ Independent username buckets: PASS")
+
+def main():
+    test_login_rate_limit_per_username()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def register_and_login_user(prefix):
+    """Register a throwaway user and return auth headers"""
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"{prefix}_{suffix}",
+        "email": f"{prefix}_{suffix}@example.com",
+        "password": "password123"
+    }
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def test_rating_distribution():
+    """Test that rating and un-rating keep the histogram rollup in step"""
+    print("=== Testing Rating Distribution ===")
+
+    headers = register_and_login_user("critic")
+    response = requests.post(f"{BASE_URL}/recipes", headers=headers, json={
+        "title": "Histogram Stew",
+        "description": "Rated once",
+        "ingredients": "beans\nonion",
+        "instructions": "Simmer"
+    })
+    assert response.status_code == 201
+    recipe_id = response.json()["recipe_id"]
+
+    def distribution():
+        response = requests.get(f"{BASE_URL}/recipes/{recipe_id}/ratings/distribution")
+        assert response.status_code == 200
+        return response.json()
+
+    empty = distribution()
+    assert empty["rating_count"] == 0 and empty["average_rating"] is None
+    print("✓ Unrated recipe: PASS")
+
+    assert requests.post(f"{BASE_URL}/recipes/{recipe_id}/rate", headers=headers, json={"value": 7}).status_code == 400
+    assert requests.post(f"{BASE_URL}/recipes/{recipe_id}/rate", headers=headers, json={"value": 4}).status_code == 201
+    rated = distribution()
+    print(f"After one 4-star rating: {rated}")
+    assert rated["rating_count"] == 1
+    assert rated["histogram"]["4"] == 1
+    assert rated["average_rating"] == 4
+    # One rating barely moves the Bayesian score off the prior
+    assert rated["bayesian_score"] < 4
+    print("✓ Histogram, average and Bayesian score: PASS")
+
+    assert requests.delete(f"{BASE_URL}/recipes/{recipe_id}/rate", headers=headers).status_code == 200
+    assert distribution()["histogram"]["4"] == 0
+    print("✓ Removing a rating updates the rollup: PASS")
+
+    assert requests.get(f"{BASE_URL}/recipes/999999999/ratings/distribution").status_code == 404
+    print("✓ Unknown recipe: PASS")
+
+def main():
+    test_rating_distribution()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import requests
+
+from app.config import Config
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def test_recipe_batch():
+    """Test that a batch keeps the requested order and reports ids that don't exist"""
+    print("=== Testing Recipe Batch ===")
+
+    recipes = requests.get(f"{BASE_URL}/recipes", params={"limit": 3}).json()
+    if not recipes:
+        print("No recipes yet, skipping")
+        return
+    wanted = [recipe["id"] for recipe in reversed(recipes)] + [999999999]
+
+    response = requests.get(f"{BASE_URL}/recipes/batch", params={"ids": ",".join(map(str, wanted))})
+    assert response.status_code == 200
+    body = response.json()
+    print(f"Requested {wanted}, got {[recipe['id'] for recipe in body['recipes']]}, missing {body['missing_ids']}")
+    assert [recipe["id"] for recipe in body["recipes"]] == wanted[:-1]
+    assert body["missing_ids"] == [999999999]
+    print("✓ GET keeps order and reports missing ids: PASS")
+
+    response = requests.post(f"{BASE_URL}/recipes/batch", json={"ids": wanted[:-1]})
+    assert response.status_code == 200
+    assert [recipe["id"] for recipe in response.json()["recipes"]] == wanted[:-1]
+    print("✓ POST body: PASS")
+
+def test_recipe_batch_rejects_bad_input():
+    assert requests.get(f"{BASE_URL}/recipes/batch", params={"ids": "1,two"}).status_code == 400
+    assert requests.post(f"{BASE_URL}/recipes/batch", json={"ids": list(range(1, 102))}).status_code == 400
+    print("✓ Invalid and oversized batches rejected: PASS")
+
+def test_public_reads_ignore_bad_tokens():
+    """Test that an expired or malformed token on a public read is treated as anonymous"""
+    print("=== Testing Public Reads With Bad Tokens ===")
+
+    recipes = requests.get(f"{BASE_URL}/recipes", params={"limit": 1}).json()
+    if not recipes:
+        print("No recipes yet, skipping")
+        return
+    recipe_id = recipes[0]["id"]
+
+    expired = jwt.encode({
+        "sub": "1", "type": "access", "fresh": False, "jti": "expired",
+        "iat": datetime.now(timezone.utc) - timedelta(hours=2),
+        "exp": datetime.now(timezone.utc) - timedelta(hours=1)
+    }, Config.JWT_SECRET_KEY, algorithm="HS256")
+    for name, token in (("expired", expired), ("malformed", "not-a-token")):
+        headers = {"Authorization": f"Bearer {token}"}
+        response = requests.get(f"{BASE_URL}/recipes/{recipe_id}", headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["user_rating"] is None
+        response = requests.get(f"{BASE_URL}/recipes/batch", params={"ids": str(recipe_id)}, headers=headers)
+        assert response.status_code == 200, response.text
+        print(f"✓ {name.capitalize()} token reads as anonymous: PASS")
+
+def main():
+    test_recipe_batch()
+    test_recipe_batch_rejects_bad_input()
+    test_public_reads_ignore_bad_tokens()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def test_facet_counts():
+    """Test that facet counts come back next to the page and match the unfiltered totals"""
+    print("=== Testing Recipe Facets ===")
+
+    everything = requests.get(f"{BASE_URL}/recipes")
+    assert everything.status_code == 200
+    assert isinstance(everything.json(), list)
+    total = len(everything.json())
+
+    response = requests.get(f"{BASE_URL}/recipes", params={"facets": "country,serving_size,rating_bucket", "limit": 5})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["recipes"]) <= 5
+    for name in ("country", "serving_size", "rating_bucket"):
+        counted = sum(item["count"] for item in body["facets"][name])
+        print(f"{name}: {body['facets'][name][:3]}")
+        # Counts may trail recipes created since the last facet refresh
+        assert counted <= total
+    print("✓ Facet counts returned with a page: PASS")
+
+    response = requests.get(f"{BASE_URL}/recipes", params={"facets": "country", "limit": 0})
+    assert response.status_code == 200
+    assert response.json()["recipes"] == []
+    print("✓ Facets only with limit=0: PASS")
+
+def test_multi_select_filters():
+    """Test IN and range filters on the list endpoint"""
+    response = requests.get(f"{BASE_URL}/recipes", params={"serving_size": "2..6"})
+    assert response.status_code == 200
+    assert all(2 <= recipe["serving_size"] <= 6 for recipe in response.json())
+
+    countries = requests.get(f"{BASE_URL}/recipes", params={"country": "in:Italy,Japan"})
+    assert countries.status_code == 200
+    assert all(recipe["country"] in ("Italy", "Japan") for recipe in countries.json())
+    print("✓ IN and range filters: PASS")
+
+def test_facets_reject_bad_input():
+    """Test that unknown facets and malformed filters are client errors"""
+    assert requests.get(f"{BASE_URL}/recipes", params={"facets": "colour"}).status_code == 400
+    assert requests.get(f"{BASE_URL}/recipes", params={"serving_size": "two..six"}).status_code == 400
+    print("✓ Invalid facets and filters rejected: PASS")
+
+def main():
+    test_facet_counts()
+    test_multi_select_filters()
+    test_facets_reject_bad_input()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def register_and_login_user(prefix):
+    """Register a throwaway user and return auth headers"""
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"{prefix}_{suffix}",
+        "email": f"{prefix}_{suffix}@example.com",
+        "password": "password123"
+    }
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def test_recommendations():
+    """Test that a user gets recommendations (top rated until they have history) and never their own likes"""
+    print("=== Testing Recommendations ===")
+
+    headers = register_and_login_user("foodie")
+    response = requests.get(f"{BASE_URL}/users/me/recommendations", headers=headers, params={"limit": 5})
+    assert response.status_code == 200
+    body = response.json()
+    print(f"Source: {body['source']}, recipes: {[recipe['id'] for recipe in body['recipes']]}")
+    assert body["source"] in ("related", "top")
+    assert len(body["recipes"]) <= 5
+    print("✓ Recommendations for a new user: PASS")
+
+    if body["recipes"]:
+        liked = body["recipes"][0]["id"]
+        assert requests.post(f"{BASE_URL}/recipes/{liked}/rate", headers=headers, json={"value": 5}).status_code == 201
+        # Rating invalidates the cached list, so the liked recipe drops out straight away
+        response = requests.get(f"{BASE_URL}/users/me/recommendations", headers=headers)
+        assert response.status_code == 200
+        assert liked not in [recipe["id"] for recipe in response.json()["recipes"]]
+        print("✓ Liked recipes are not recommended back: PASS")
+
+def test_recommendations_require_login():
+    response = requests.get(f"{BASE_URL}/users/me/recommendations")
+    assert response.status_code == 401
+    print("✓ Login required: PASS")
+
+def main():
+    test_recommendations()
+    test_recommendations_require_login()
+
+if __name__ == "__main__":
+    main()
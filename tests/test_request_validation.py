@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def register_and_login_user(prefix):
+    """Register a throwaway user and return auth headers"""
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"{prefix}_{suffix}",
+        "email": f"{prefix}_{suffix}@example.com",
+        "password": "password123"
+    }
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+_headers = {}
+
+def shared_headers():
+    """One user for the whole file; the suite shares a per-IP login rate limit"""
+    if not _headers:
+        _headers.update(register_and_login_user("validation"))
+    return _headers
+
+def create_recipe(headers):
+    response = requests.post(f"{BASE_URL}/recipes", headers=headers, json={
+        "title": "Validated Vindaloo",
+        "description": "Checked before it reaches the database",
+        "ingredients": "pork, chilli, vinegar",
+        "instructions": "Marinate and simmer"
+    })
+    assert response.status_code == 201
+    return response.json()["recipe_id"]
+
+def assert_rejected(response, field=None):
+    """A 400 that named the bad field and ran no SQL"""
+    assert response.status_code == 400, (response.status_code, response.text)
+    if field is not None:
+        assert field in response.json()["fields"], response.json()
+    assert response.headers["X-Query-Count"] == "0"
+
+def test_missing_and_malformed_bodies():
+    """Test that a missing body, non-JSON or a JSON array is a 400 rather than a 500"""
+    print("=== Testing Missing and Malformed Bodies ===")
+
+    headers = shared_headers()
+    recipe_id = create_recipe(headers)
+
+    assert_rejected(requests.post(f"{BASE_URL}/recipes/{recipe_id}/rate", headers=headers))
+    assert_rejected(requests.post(f"{BASE_URL}/recipes/{recipe_id}/rate", headers=headers, data="value=5"))
+    assert_rejected(requests.post(f"{BASE_URL}/comments/", headers=headers, json=["Lovely"]))
+    assert_rejected(requests.put(f"{BASE_URL}/recipes/{recipe_id}", headers=headers, json="Renamed"))
+    response = requests.post(f"{BASE_URL}/auth/register", json=None)
+    assert response.status_code == 400
+    assert response.json()["error"] == "Request body must be a JSON object"
+    print("✓ Missing and malformed bodies rejected: PASS")
+
+def test_types_ranges_and_lengths():
+    """Test that wrong types, out-of-range numbers and overlong strings never reach the database"""
+    print("=== Testing Types, Ranges and Lengths ===")
+
+    headers = shared_headers()
+    recipe_id = create_recipe(headers)
+    # Warm the user cache so rejected requests run no SQL at all
+    requests.get(f"{BASE_URL}/auth/profile", headers=headers)
+
+    for value in (0, 6, "5", 4.5, True, None):
+        response = requests.post(f"{BASE_URL}/recipes/{recipe_id}/rate", headers=headers, json={"value": value})
+        assert_rejected(response, "value")
+
+    response = requests.post(f"{BASE_URL}/recipes", headers=headers, json={
+        "title": "x" * 101,
+        "description": "Too long a title",
+        "ingredients": "salt",
+        "instructions": "None",
+        "group_id": "not-a-group",
+        "serving_size": -2
+    })
+    assert_rejected(response)
+    assert set(response.json()["fields"]) == {"title", "group_id", "serving_size"}
+
+    assert_rejected(requests.post(f"{BASE_URL}/recipes", headers=headers, json={"title": "Only a title"}), "description")
+    assert_rejected(requests.put(f"{BASE_URL}/recipes/{recipe_id}", headers=headers, json={"title": None}), "title")
+    assert_rejected(requests.post(f"{BASE_URL}/comments/", headers=headers, json={"recipe_id": recipe_id, "text": "x" * 2001}), "text")
+    assert_rejected(requests.post(f"{BASE_URL}/comments/", headers=headers, json={"recipe_id": recipe_id, "text": ""}), "text")
+    assert_rejected(requests.post(f"{BASE_URL}/bookmarks", headers=headers, json={"recipe_id": 2 ** 40}), "recipe_id")
+    assert_rejected(requests.post(f"{BASE_URL}/groups", headers=headers, json={"name": ["Chefs"]}), "name")
+    assert_rejected(requests.put(f"{BASE_URL}/auth/profile", headers=headers, json={"email": "not-an-email"}), "email")
+    print("✓ Types, ranges and lengths enforced up front: PASS")
+
+def test_valid_payloads_still_accepted():
+    """Test that valid payloads, with unknown fields ignored, go through as before"""
+    print("=== Testing Valid Payloads ===")
+
+    headers = shared_headers()
+    recipe_id = create_recipe(headers)
+
+    response = requests.post(f"{BASE_URL}/recipes/{recipe_id}/rate", headers=headers, json={"value": 4, "note": "ignored"})
+    assert response.status_code == 201
+    response = requests.put(f"{BASE_URL}/recipes/{recipe_id}", headers=headers, json={
+        "id": recipe_id, "title": "Validated Vindaloo, Hotter", "serving_size": 4
+    })
+    assert response.status_code == 200
+    recipe = requests.get(f"{BASE_URL}/recipes/{recipe_id}", headers=headers).json()
+    assert recipe["title"] == "Validated Vindaloo, Hotter"
+    assert recipe["serving_size"] == 4
+    assert recipe["user_rating"] == 4 and recipe["rating_count"] == 1
+    print("✓ Valid payloads accepted: PASS")
+
+def main():
+    test_missing_and_malformed_bodies()
+    test_types_ranges_and_lengths()
+    test_valid_payloads_still_accepted()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def test_similar_recipes():
+    """Test "more like this" once the index is built, or its 503 before then"""
+    print("=== Testing Similar Recipes ===")
+
+    recipes = requests.get(f"{BASE_URL}/recipes", params={"limit": 1}).json()
+    if not recipes:
+        print("No recipes yet, skipping")
+        return
+    recipe_id = recipes[0]["id"]
+
+    response = requests.get(f"{BASE_URL}/recipes/{recipe_id}/similar", params={"limit": 5})
+    if response.status_code == 503:
+        print("✓ Index not built (run `flask similarity build`): PASS")
+        return
+
+    assert response.status_code == 200
+    similar = response.json()["recipes"]
+    print(f"Similar to {recipe_id}: {[(recipe['id'], recipe['similarity']) for recipe in similar]}")
+    assert len(similar) <= 5
+    assert recipe_id not in [recipe["id"] for recipe in similar]
+    scores = [recipe["similarity"] for recipe in similar]
+    assert scores == sorted(scores, reverse=True)
+    print("✓ Ranked by similarity, excluding the recipe itself: PASS")
+
+def test_similar_recipes_missing_recipe():
+    """Test that an unknown recipe is a 404"""
+    response = requests.get(f"{BASE_URL}/recipes/999999999/similar")
+    assert response.status_code == 404
+    print("✓ Unknown recipe: PASS")
+
+def main():
+    test_similar_recipes()
+    test_similar_recipes_missing_recipe()
+
+if __name__ == "__main__":
+    main()
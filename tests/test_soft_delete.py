@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import os
+import requests
+
+# Configuration
+BASE_URL = "http://localhost:5003/api"
+
+def register_and_login_user(prefix):
+    """Register a throwaway user and return auth headers"""
+    suffix = os.urandom(4).hex()
+    user_data = {
+        "username": f"{prefix}_{suffix}",
+        "email": f"{prefix}_{suffix}@example.com",
+        "password": "password123"
+    }
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(f"{BASE_URL}/auth/login", json={
+        "username": user_data["username"],
+        "password": user_data["password"]
+    })
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+def test_deleted_recipe_is_hidden():
+    """Test that a deleted recipe disappears at once, along with bookmarks of it"""
+    print("=== Testing Recipe Soft Delete ===")
+
+    headers = register_and_login_user("softdelete")
+    response = requests.post(f"{BASE_URL}/recipes", headers=headers, json={
+        "title": "Soon Gone Stew",
+        "description": "Deleted by the test",
+        "ingredients": "beans",
+        "instructions": "Simmer"
+    })
+    assert response.status_code == 201
+    recipe_id = response.json()["recipe_id"]
+    assert requests.post(f"{BASE_URL}/bookmarks", headers=headers, json={"recipe_id": recipe_id}).status_code == 201
+    response = requests.post(f"{BASE_URL}/comments/", headers=headers, json={"text": "Before", "recipe_id": recipe_id})
+    assert response.status_code == 201
+
+    assert requests.delete(f"{BASE_URL}/recipes/{recipe_id}", headers=headers).status_code == 200
+    assert requests.get(f"{BASE_URL}/recipes/{recipe_id}").status_code == 404
+    batch = requests.get(f"{BASE_URL}/recipes/batch", params={"ids": recipe_id}).json()
+    assert batch["missing_ids"] == [recipe_id]
+    bookmarks = requests.get(f"{BASE_URL}/bookmarks", headers=headers).json()
+    assert recipe_id not in [bookmark["recipe_id"] for bookmark in bookmarks]
+    response = requests.post(f"{BASE_URL}/comments/", headers=headers, json={"text": "Too late", "recipe_id": recipe_id})
+    assert response.status_code == 404
+    assert requests.get(f"{BASE_URL}/comments/{recipe_id}").json() == []
+    assert requests.delete(f"{BASE_URL}/recipes/{recipe_id}", headers=headers).status_code == 404
+    print("✓ Deleted recipe hidden everywhere: PASS")
+
+def test_comment_on_missing_recipe():
+    """Test that commenting on a recipe that never existed is a 404"""
+    headers = register_and_login_user("softcomment")
+    response = requests.post(f"{BASE_URL}/comments/", headers=headers, json={"text": "Hello?", "recipe_id": 999999999})
+    assert response.status_code == 404
+    print("✓ Comment on missing recipe rejected: PASS")
+
+def test_deleted_group_is_hidden():
+    """Test that a deleted group disappears at once and its members lose access"""
+    print("=== Testing Group Soft Delete ===")
+
+    headers = register_and_login_user("softgroup")
+    response = requests.post(f"{BASE_URL}/groups", headers=headers, json={
+        "name": f"Soon Gone Group {os.urandom(3).hex()}",
+        "description": "Deleted by the test"
+    })
+    assert response.status_code == 201
+    group_id = response.json()["group_id"]
+
+    assert requests.delete(f"{BASE_URL}/groups/{group_id}", headers=headers).status_code == 200
+    assert requests.get(f"{BASE_URL}/groups/{group_id}").status_code == 404
+    assert group_id not in [group["id"] for group in requests.get(f"{BASE_URL}/my-groups", headers=headers).json()]
+    assert requests.get(f"{BASE_URL}/groups/{group_id}/recipes", headers=headers).status_code == 403
+    response = requests.post(f"{BASE_URL}/recipes", headers=headers, json={
+        "title": "Orphan Dish",
+        "description": "Shared with a deleted group",
+        "ingredients": "rice",
+        "instructions": "Cook",
+        "group_id": group_id
+    })
+    assert response.status_code == 403
+    print("✓ Deleted group hidden, members locked out: PASS")
+
+def main():
+    test_deleted_recipe_is_hidden()
+    test_comment_on_missing_recipe()
+    test_deleted_group_is_hidden()
+
+if __name__ == "__main__":
+    main()